@@ -2,13 +2,17 @@
 Image captioning API endpoints.
 """
 
+import json
+import time
 import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
 from fastapi import APIRouter, File, HTTPException, UploadFile, Form
+from fastapi.responses import StreamingResponse
 
-from api.models.requests import CaptionResponse
+from api.models.requests import BatchCaptionItem, BatchCaptionResponse, CaptionResponse
 from core.generator import caption_generator
 from core.validation import validator
-from config.constants import TEMPERATURE, DO_SAMPLE, MAX_NEW_TOKENS
+from config.constants import TEMPERATURE, DO_SAMPLE, MAX_NEW_TOKENS, MODEL_NAME
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +21,9 @@ router = APIRouter(prefix="/api/v1", tags=["caption"])
 @router.post("/caption", response_model=CaptionResponse)
 async def generate_caption(
     file: UploadFile = File(..., description="Image file to generate caption for"),
+    prompt: Optional[str] = Form(None, description="Optional text prompt or question about the image"),
 ) -> CaptionResponse:
-    """Generate caption for uploaded image."""
+    """Generate caption for uploaded image, optionally conditioned on a prompt or question."""
 
     try:
         # Validate image file
@@ -33,16 +38,21 @@ async def generate_caption(
         # Validate generation parameters
         validator.validate_generation_params(MAX_NEW_TOKENS, TEMPERATURE)
 
+        # Validate prompt
+        validator.validate_prompt(prompt)
+
         # Generate caption
         result = await caption_generator.generate_caption(
             image_content=contents,
             max_new_tokens=MAX_NEW_TOKENS,
             temperature=TEMPERATURE,
-            do_sample=DO_SAMPLE
+            do_sample=DO_SAMPLE,
+            prompt=prompt
         )
 
         return CaptionResponse(
             caption=result["caption"],
+            prompt=prompt,
             model_name=result["model_name"],
             processing_time=result["processing_time"]
         )
@@ -51,4 +61,103 @@ async def generate_caption(
         raise
     except Exception as e:
         logger.error(f"Error generating caption: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error during caption generation")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error during caption generation")
+
+@router.post("/caption/stream")
+async def stream_caption(
+    file: UploadFile = File(..., description="Image file to generate caption for"),
+    prompt: Optional[str] = Form(None, description="Optional text prompt or question about the image"),
+) -> StreamingResponse:
+    """
+    Stream the caption of an uploaded image as server-sent events.
+
+    Each "token" event carries the next piece of text; the final "done"
+    event carries the full caption, processing time and time to first
+    token. A failure after the stream started is sent as an "error" event.
+    """
+
+    # Validate image file
+    validator.validate_image_file(file)
+
+    # Read file content
+    contents = await file.read()
+
+    # Validate file size, generation parameters and prompt
+    await validator.validate_file_size(contents)
+    validator.validate_generation_params(MAX_NEW_TOKENS, TEMPERATURE)
+    validator.validate_prompt(prompt)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in caption_generator.stream_caption(
+                image_content=contents,
+                max_new_tokens=MAX_NEW_TOKENS,
+                temperature=TEMPERATURE,
+                do_sample=DO_SAMPLE,
+                prompt=prompt
+            ):
+                yield _format_event(event, data)
+        except Exception as e:
+            logger.error(f"Error streaming caption: {e}")
+            yield _format_event("error", {"detail": "Internal server error during caption generation"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _format_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/caption/batch", response_model=BatchCaptionResponse)
+async def generate_captions(
+    files: List[UploadFile] = File(..., description="Image files to generate captions for"),
+) -> BatchCaptionResponse:
+    """Generate captions for several uploaded images in one request."""
+
+    start_time = time.time()
+
+    try:
+        # Validate batch
+        validator.validate_batch_size(files)
+        validator.validate_generation_params(MAX_NEW_TOKENS, TEMPERATURE)
+
+        # Validate each image; invalid ones are reported without failing the batch
+        items = [BatchCaptionItem(filename=file.filename) for file in files]
+        valid = []
+        for idx, file in enumerate(files):
+            try:
+                validator.validate_image_file(file)
+                contents = await file.read()
+                await validator.validate_file_size(contents)
+            except HTTPException as e:
+                items[idx].error = e.detail
+                continue
+            valid.append((idx, contents))
+
+        # Generate captions
+        results = await caption_generator.generate_captions(
+            image_contents=[contents for _, contents in valid],
+            max_new_tokens=MAX_NEW_TOKENS,
+            temperature=TEMPERATURE,
+            do_sample=DO_SAMPLE
+        )
+        for (idx, _), result in zip(valid, results):
+            items[idx] = BatchCaptionItem(filename=files[idx].filename, **result)
+
+        failed = sum(1 for item in items if item.error is not None)
+        return BatchCaptionResponse(
+            results=items,
+            model_name=MODEL_NAME,
+            processing_time=time.time() - start_time,
+            succeeded=len(items) - failed,
+            failed=failed
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating batch captions: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error during batch caption generation")
@@ -0,0 +1,14 @@
+"""
+Metrics API endpoints.
+"""
+from fastapi import APIRouter
+from typing import Dict, Any
+
+from utils.metrics import metrics
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """Metrics endpoint exposing in-process histograms and counters."""
+    return metrics.snapshot()
@@ -3,12 +3,13 @@ Request and response models for the API.
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class CaptionResponse(BaseModel):
     """Response model for image captioning."""
 
     caption: str = Field(..., description="Generated caption for the image")
+    prompt: Optional[str] = Field(None, description="Prompt or question the caption answers, if any")
     model_name: str = Field(..., description="Model used for generation")
     processing_time: float = Field(..., description="Time taken to process the image")
 
@@ -16,7 +17,39 @@ class CaptionResponse(BaseModel):
         schema_extra = {
             "example": {
                 "caption": "A beautiful sunset over the ocean",
+                "prompt": None,
                 "model_name": "Salesforce/blip2-flan-t5-xl-coco",
                 "processing_time": 2.34
             }
-        }
\ No newline at end of file
+        }
+
+class BatchCaptionItem(BaseModel):
+    """Caption result for one image of a batch."""
+
+    filename: Optional[str] = Field(None, description="Name of the uploaded file")
+    caption: Optional[str] = Field(None, description="Generated caption, if the image succeeded")
+    processing_time: Optional[float] = Field(None, description="Time taken to decode the image and caption its sub-batch")
+    error: Optional[str] = Field(None, description="Why the image failed, if it did")
+
+class BatchCaptionResponse(BaseModel):
+    """Response model for batch image captioning."""
+
+    results: List[BatchCaptionItem] = Field(..., description="One result per uploaded image, in upload order")
+    model_name: str = Field(..., description="Model used for generation")
+    processing_time: float = Field(..., description="Time taken to process the whole batch")
+    succeeded: int = Field(..., description="Number of images that were captioned")
+    failed: int = Field(..., description="Number of images that failed")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "results": [
+                    {"filename": "sunset.jpg", "caption": "A beautiful sunset over the ocean", "processing_time": 1.12, "error": None},
+                    {"filename": "notes.txt", "caption": None, "processing_time": None, "error": "Unsupported image format. Supported formats: image/jpeg, image/png, image/jpg, image/webp"}
+                ],
+                "model_name": "Salesforce/blip2-flan-t5-xl-coco",
+                "processing_time": 1.15,
+                "succeeded": 1,
+                "failed": 1
+            }
+        }
@@ -0,0 +1,148 @@
+"""
+Compare BLIP-2 precisions on a set of images.
+
+Usage:
+    uv run compare_precisions.py --images photos/ --precisions float32,bfloat16,int8
+
+The images are either a directory, which is searched recursively for
+supported image files, or a JSONL manifest whose lines have an "image"
+file path. Captions are generated greedily so precisions can be compared.
+The first precision is the baseline for the reported speedup and caption
+similarity.
+"""
+import argparse
+import asyncio
+import json
+import mimetypes
+import os
+import re
+import statistics
+import time
+from difflib import SequenceMatcher
+from typing import Any, Dict, List
+
+from config.constants import MODEL_PRECISIONS, SUPPORTED_IMAGE_FORMATS
+from config.settings import settings
+from core.embedding_cache import embedding_cache
+from core.generator import caption_generator
+from core.model import model_manager
+from utils.logging import setup_logging
+
+def load_images(path: str) -> List[str]:
+    """List the image files of a directory or JSONL manifest."""
+    if os.path.isdir(path):
+        images = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if mimetypes.guess_type(name)[0] in SUPPORTED_IMAGE_FORMATS:
+                    images.append(os.path.join(root, name))
+        return images
+
+    with open(path) as manifest:
+        return [json.loads(line)["image"] for line in manifest if line.strip()]
+
+def caption_similarity(reference: str, hypothesis: str) -> float:
+    """Word-level similarity ratio of two captions, from 0 to 1."""
+    reference_words = re.findall(r"\w+", reference.lower())
+    hypothesis_words = re.findall(r"\w+", hypothesis.lower())
+    if not reference_words and not hypothesis_words:
+        return 1.0
+    return SequenceMatcher(None, reference_words, hypothesis_words).ratio()
+
+async def evaluate_precision(precision: str, images: List[bytes], max_new_tokens: int) -> Dict[str, Any]:
+    """Caption every image with one precision and measure latency."""
+    model_manager.precision = precision
+    model_manager.device = settings.device
+    await model_manager.initialize()
+
+    try:
+        # Warm up once so lazy initialization is not counted
+        await caption_generator.generate_caption(images[0], max_new_tokens=max_new_tokens, do_sample=False)
+
+        captions = []
+        latencies = []
+        for image in images:
+            start = time.perf_counter()
+            result = await caption_generator.generate_caption(image, max_new_tokens=max_new_tokens, do_sample=False)
+            latencies.append(time.perf_counter() - start)
+            captions.append(result["caption"])
+    finally:
+        await model_manager.cleanup()
+
+    return {
+        "precision": precision,
+        "device": model_manager.get_device(),
+        "dtype": str(model_manager.get_dtype()),
+        "mean_latency_sec": statistics.mean(latencies),
+        "p50_latency_sec": statistics.median(latencies),
+        "p95_latency_sec": sorted(latencies)[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "captions": captions
+    }
+
+async def compare_precisions(images_path: str, precisions: List[str], max_new_tokens: int) -> Dict[str, Any]:
+    """Evaluate each precision and report deltas against the first one."""
+    paths = load_images(images_path)
+    if not paths:
+        raise ValueError("No images found")
+
+    images = []
+    for path in paths:
+        with open(path, "rb") as image_file:
+            images.append(image_file.read())
+
+    # Every timed call has to run the vision encoder
+    embedding_cache.max_bytes = 0
+
+    results = [await evaluate_precision(precision, images, max_new_tokens) for precision in precisions]
+    baseline = results[0]
+
+    for result in results:
+        similarities = [
+            caption_similarity(reference, hypothesis)
+            for reference, hypothesis in zip(baseline["captions"], result["captions"])
+        ]
+        result["speedup"] = baseline["mean_latency_sec"] / result["mean_latency_sec"] if result["mean_latency_sec"] else 0.0
+        result["similarity_vs_baseline"] = statistics.mean(similarities)
+        result["exact_match_vs_baseline"] = sum(
+            reference == hypothesis for reference, hypothesis in zip(baseline["captions"], result["captions"])
+        ) / len(images)
+
+    for result in results:
+        del result["captions"]
+
+    return {"images": images_path, "count": len(images), "baseline": baseline["precision"], "results": results}
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Compare BLIP-2 precisions")
+    parser.add_argument("--images", required=True, help="Directory of images or JSONL file with 'image' paths")
+    parser.add_argument(
+        "--precisions",
+        default="float32,bfloat16,int8",
+        help=f"Comma-separated precisions to compare, baseline first ({', '.join(MODEL_PRECISIONS)})"
+    )
+    parser.add_argument("--max-new-tokens", type=int, default=30, help="Maximum caption length in tokens")
+    parser.add_argument("--output", help="Optional path to write the JSON report")
+    args = parser.parse_args()
+
+    precisions = [precision.strip() for precision in args.precisions.split(",") if precision.strip()]
+    unknown = [precision for precision in precisions if precision not in MODEL_PRECISIONS]
+    if unknown:
+        parser.error(f"Unknown precisions: {', '.join(unknown)}")
+    if settings.device == "cpu" and "float16" in precisions:
+        parser.error("float16 requires a CUDA device")
+    if settings.device != "cpu" and "int8" in precisions:
+        parser.error("int8 is only supported on the CPU; run with DEVICE=cpu")
+
+    setup_logging()
+    report = asyncio.run(compare_precisions(args.images, precisions, args.max_new_tokens))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
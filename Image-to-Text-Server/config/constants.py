@@ -4,14 +4,30 @@ Application constants for BLIP-2 Image-to-Text Service.
 
 # Model Configuration
 MODEL_NAME = "Salesforce/blip2-flan-t5-xl-coco"
-MODEL_PRECISION = "float16" # hard coded for now, can be changed later
+MODEL_PRECISION = "float16"
+CPU_MODEL_PRECISION = "float32"
+MODEL_PRECISIONS = ["float16", "bfloat16", "float32", "int8"]
 MAX_NEW_TOKENS = 256
 TEMPERATURE = 1.0
 DO_SAMPLE = True
+MAX_PROMPT_LENGTH = 500
+DEFAULT_EMBEDDING_CACHE_MB = 256
 
 # Image Configuration
 MAX_IMAGE_SIZE_MB = 10
 SUPPORTED_IMAGE_FORMATS = ["image/jpeg", "image/png", "image/jpg", "image/webp"]
+DEFAULT_PREPROCESS_WORKERS = 4
+PREPROCESS_SECONDS_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+
+# Streaming Configuration
+TIME_TO_FIRST_TOKEN_BUCKETS_SEC = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Batch Configuration
+DEFAULT_CAPTION_BATCH_SIZE = 8
+MAX_BATCH_IMAGES = 64
+DEFAULT_BATCH_MAX_WAIT_MS = 10
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32]
+QUEUE_WAIT_BUCKETS_SEC = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
 
 # Server Configuration
 DEFAULT_HOST = "0.0.0.0"
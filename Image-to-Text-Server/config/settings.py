@@ -6,14 +6,27 @@ import os
 import torch
 from typing import Optional
 
+from config.constants import (
+    DEFAULT_CAPTION_BATCH_SIZE, DEFAULT_BATCH_MAX_WAIT_MS, DEFAULT_PREPROCESS_WORKERS,
+    DEFAULT_EMBEDDING_CACHE_MB, MODEL_PRECISION, CPU_MODEL_PRECISION, MODEL_PRECISIONS
+)
+
 class Settings:
     """Application settings class."""
 
     def __init__(self):
         self.huggingface_token: Optional[str] = os.getenv("HUGGINGFACE_HUB_TOKEN")
         self.cuda_available: bool = self._check_cuda()
-        self.device: str = "cuda" if self.cuda_available else "cpu"
+        self.device: str = os.getenv("DEVICE", "cuda" if self.cuda_available else "cpu").lower()
+        self.model_precision: str = os.getenv(
+            "MODEL_PRECISION", MODEL_PRECISION if self.device.startswith("cuda") else CPU_MODEL_PRECISION
+        ).lower()
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
+        self.caption_batch_size: int = int(os.getenv("CAPTION_BATCH_SIZE", DEFAULT_CAPTION_BATCH_SIZE))
+        self.dynamic_batching: bool = os.getenv("DYNAMIC_BATCHING", "true").lower() == "true"
+        self.batch_max_wait_ms: float = float(os.getenv("BATCH_MAX_WAIT_MS", DEFAULT_BATCH_MAX_WAIT_MS))
+        self.preprocess_workers: int = int(os.getenv("PREPROCESS_WORKERS", DEFAULT_PREPROCESS_WORKERS))
+        self.embedding_cache_mb: float = float(os.getenv("EMBEDDING_CACHE_MB", DEFAULT_EMBEDDING_CACHE_MB))
 
     def _check_cuda(self) -> bool:
         """Check if CUDA is available."""
@@ -26,6 +39,24 @@ class Settings:
         """Validate required settings."""
         if not self.huggingface_token:
             raise RuntimeError("HUGGINGFACE_HUB_TOKEN is not set in the environment")
+        if self.device != "cpu" and not self.device.startswith("cuda"):
+            raise RuntimeError("DEVICE must be 'cpu' or a CUDA device")
+        if self.device.startswith("cuda") and not self.cuda_available:
+            raise RuntimeError("DEVICE is set to CUDA but CUDA is not available")
+        if self.model_precision not in MODEL_PRECISIONS:
+            raise RuntimeError(f"MODEL_PRECISION must be one of: {', '.join(MODEL_PRECISIONS)}")
+        if self.model_precision == "int8" and self.device != "cpu":
+            raise RuntimeError("MODEL_PRECISION int8 is only supported on the CPU")
+        if self.model_precision == "float16" and self.device == "cpu":
+            raise RuntimeError("MODEL_PRECISION float16 requires a CUDA device; use bfloat16, float32 or int8 on the CPU")
+        if self.caption_batch_size < 1:
+            raise RuntimeError("CAPTION_BATCH_SIZE must be at least 1")
+        if self.batch_max_wait_ms < 0:
+            raise RuntimeError("BATCH_MAX_WAIT_MS must not be negative")
+        if self.preprocess_workers < 1:
+            raise RuntimeError("PREPROCESS_WORKERS must be at least 1")
+        if self.embedding_cache_mb < 0:
+            raise RuntimeError("EMBEDDING_CACHE_MB must not be negative")
 
 # Global settings instance
 settings = Settings()
\ No newline at end of file
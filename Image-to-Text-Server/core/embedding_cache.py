@@ -0,0 +1,106 @@
+"""
+Cache of BLIP-2 image embeddings keyed by image content.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import torch
+
+from config.settings import settings
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """
+    Least-recently-used cache of projected Q-Former outputs within a byte budget.
+
+    An entry holds the language-model inputs BLIP-2 derives from one image,
+    i.e. the vision encoder, Q-Former and language projection outputs, so a
+    repeated image only needs the language model. Entries are keyed by the
+    SHA-256 of the uploaded bytes and evicted least recently used first
+    once ``max_bytes`` is exceeded. A budget of 0 disables the cache.
+
+    Args:
+        max_bytes (int): Maximum total size of the cached tensors
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = metrics.counter("caption_embedding_cache_hits_total")
+        self._misses = metrics.counter("caption_embedding_cache_misses_total")
+
+    @staticmethod
+    def key(image_content: bytes) -> str:
+        """Get the cache key of an uploaded image."""
+        return hashlib.sha256(image_content).hexdigest()
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached tensors."""
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[torch.Tensor]:
+        """
+        Look up the embeddings of an image and mark them as recently used.
+
+        Args:
+            key (str): Cache key of the image
+
+        Returns:
+            Optional[torch.Tensor]: Embeddings of shape (1, num_query_tokens, hidden_size), or None on a miss
+        """
+        with self._lock:
+            embeds = self._entries.get(key)
+            if embeds is not None:
+                self._entries.move_to_end(key)
+
+        if embeds is None:
+            self._misses.inc()
+        else:
+            self._hits.inc()
+        return embeds
+
+    def put(self, key: str, embeds: torch.Tensor) -> None:
+        """
+        Store the embeddings of an image, evicting the least recently used entries over budget.
+
+        Args:
+            key (str): Cache key of the image
+            embeds (torch.Tensor): Embeddings of shape (1, num_query_tokens, hidden_size)
+                that do not share storage with a larger batch
+        """
+        size = embeds.numel() * embeds.element_size()
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous.numel() * previous.element_size()
+
+            self._entries[key] = embeds
+            self._size_bytes += size
+
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.numel() * evicted.element_size()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+# Global embedding cache instance
+embedding_cache = EmbeddingCache(int(settings.embedding_cache_mb * 1024 * 1024))
@@ -7,35 +7,227 @@ import time
 import torch
 import logging
 import asyncio
-from typing import Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, NamedTuple, Optional, Tuple
 from PIL import Image
+from transformers import AsyncTextIteratorStreamer, StoppingCriteria, StoppingCriteriaList
 
+from core.embedding_cache import embedding_cache
 from core.model import model_manager
-from config.constants import MODEL_NAME, TEMPERATURE, DO_SAMPLE, MAX_NEW_TOKENS
+from config.constants import (
+    MODEL_NAME, TEMPERATURE, DO_SAMPLE, MAX_NEW_TOKENS,
+    BATCH_SIZE_BUCKETS, QUEUE_WAIT_BUCKETS_SEC,
+    PREPROCESS_SECONDS_BUCKETS, TIME_TO_FIRST_TOKEN_BUCKETS_SEC
+)
+from config.settings import settings
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Prompt and sorted generation settings; only requests with equal keys share a generate call
+GenerationKey = Tuple[Optional[str], Tuple[Tuple[str, Any], ...]]
+
+class CaptionRequest(NamedTuple):
+    """One image waiting for generation, either preprocessed or already embedded."""
+
+    image_hash: str
+    pixel_values: Optional[torch.Tensor]
+    image_embeds: Optional[torch.Tensor]
+
+class StopOnEvent(StoppingCriteria):
+    """Stops generation once an event is set, e.g. when a streaming client disconnects."""
+
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+class BatchScheduler:
+    """
+    Micro-batching scheduler shared by all in-flight caption requests.
+
+    Images submitted by concurrent requests are queued and collected into
+    batches of up to ``max_batch_size`` images, waiting at most
+    ``max_wait_sec`` after the first image arrives. Images are grouped by
+    their prompt and generation settings, and a single worker runs one
+    generate call per group and hands each caption back to its request.
+    """
+
+    def __init__(
+        self,
+        generate_fn: Callable[[List[CaptionRequest], GenerationKey], Awaitable[List[str]]],
+        max_batch_size: int,
+        max_wait_sec: float
+    ):
+        self.generate_fn = generate_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_sec = max_wait_sec
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_size_histogram = metrics.histogram("caption_batch_size", BATCH_SIZE_BUCKETS)
+        self._queue_wait_histogram = metrics.histogram("caption_queue_wait_seconds", QUEUE_WAIT_BUCKETS_SEC)
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the scheduler worker is accepting work."""
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        """Start the batching worker."""
+        if self.is_running:
+            return
+
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Batch scheduler started (max batch size: {self.max_batch_size}, "
+            f"max wait: {self.max_wait_sec * 1000:.0f} ms)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the batching worker and fail any pending requests."""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while self._queue is not None and not self._queue.empty():
+            _, _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+        logger.info("Batch scheduler stopped")
+
+    async def submit(self, request: CaptionRequest, key: GenerationKey) -> str:
+        """
+        Queue a single image and wait for its caption.
+
+        Args:
+            request (CaptionRequest): Image to caption
+            key (GenerationKey): Prompt and generation settings of the request
+
+        Returns:
+            str: Generated caption
+        """
+        if not self.is_running:
+            raise RuntimeError("Batch scheduler is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, key, future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect batches from the queue and process them until cancelled."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_sec
+
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests with different prompts or generation settings cannot share a generate call
+            groups: Dict[GenerationKey, List] = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for key, group in groups.items():
+                await self._process_batch(group, key)
+
+    async def _process_batch(self, queued: List[Tuple[CaptionRequest, GenerationKey, asyncio.Future, float]], key: GenerationKey) -> None:
+        """Run one generate call for a batch and resolve each request's future."""
+        # Skip requests that were cancelled while queued
+        batch = [(request, future, enqueued) for request, _, future, enqueued in queued if not future.done()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._queue_wait_histogram.observe(started - enqueued)
+        self._batch_size_histogram.observe(len(batch))
+
+        try:
+            captions = await self.generate_fn([request for request, _, _ in batch], key)
+            for (_, future, _), caption in zip(batch, captions):
+                if not future.done():
+                    future.set_result(caption)
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} failed: {e}. Retrying individually")
+
+            for request, future, _ in batch:
+                try:
+                    caption = (await self.generate_fn([request], key))[0]
+                    if not future.done():
+                        future.set_result(caption)
+                except Exception as item_error:
+                    if not future.done():
+                        future.set_exception(item_error)
+
 class CaptionGenerator:
     """Handles image captioning operations."""
 
     def __init__(self):
-        pass
+        self.scheduler = BatchScheduler(
+            self._generate_batch,
+            max_batch_size=settings.caption_batch_size,
+            max_wait_sec=settings.batch_max_wait_ms / 1000
+        )
+        # Decoding and preprocessing run here instead of on the event loop
+        self._preprocess_pool = ThreadPoolExecutor(
+            max_workers=settings.preprocess_workers, thread_name_prefix="preprocess"
+        )
+        self._preprocess_histogram = metrics.histogram("caption_preprocess_seconds", PREPROCESS_SECONDS_BUCKETS)
+        self._first_token_histogram = metrics.histogram(
+            "caption_stream_time_to_first_token_seconds", TIME_TO_FIRST_TOKEN_BUCKETS_SEC
+        )
+
+    async def start(self) -> None:
+        """Start the cross-request batch scheduler if dynamic batching is enabled."""
+        if settings.dynamic_batching:
+            await self.scheduler.start()
+
+    async def stop(self) -> None:
+        """Stop the cross-request batch scheduler."""
+        await self.scheduler.stop()
 
     async def generate_caption(
         self, 
         image_content: bytes, 
         max_new_tokens: int = MAX_NEW_TOKENS,
         temperature: float = TEMPERATURE,
-        do_sample: bool = DO_SAMPLE
+        do_sample: bool = DO_SAMPLE,
+        prompt: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate caption for an image.
 
+        The image's embeddings are cached by content, so sending the same
+        image again, e.g. with a follow-up question, only runs the language
+        model.
+
         Args:
             image_content (bytes): The image file content
             max_new_tokens (int): Maximum number of tokens to generate
             temperature (float): Temperature for generation
             do_sample (bool): Whether to use sampling
+            prompt (Optional[str]): Text prompt or question to condition the caption on
 
         Returns:
             Dict[str, Any]: Caption result with metadata
@@ -47,20 +239,21 @@ class CaptionGenerator:
         logger.info("Starting image caption generation")
 
         try:
-            # Load and process image
-            image = self._load_image(image_content)
-
             # Get model and processor
             model = model_manager.get_model()
             processor = model_manager.get_processor()
 
-            # Prepare inputs
-            inputs = processor(image, return_tensors="pt").to("cuda", torch.float16)
+            # Look up or load and prepare image in the preprocessing pool
+            request = await self._run_in_pool(self._build_request, processor, image_content)
 
-            # Generate caption
-            caption = await self._generate_text(
-                model, processor, inputs, max_new_tokens, temperature, do_sample
-            )
+            # Generate caption, batched with concurrent requests when the scheduler runs
+            key = (prompt, tuple(sorted(
+                {"max_new_tokens": max_new_tokens, "temperature": temperature, "do_sample": do_sample}.items()
+            )))
+            if self.scheduler.is_running:
+                caption = await self.scheduler.submit(request, key)
+            else:
+                caption = (await self._generate_batch([request], key))[0]
 
             processing_time = time.time() - start_time
 
@@ -76,45 +269,397 @@ class CaptionGenerator:
             logger.error(f"Caption generation failed: {e}")
             raise
 
-    def _load_image(self, image_content: bytes) -> Image.Image:
-        """Load image from bytes."""
+    async def stream_caption(
+        self,
+        image_content: bytes,
+        max_new_tokens: int = MAX_NEW_TOKENS,
+        temperature: float = TEMPERATURE,
+        do_sample: bool = DO_SAMPLE,
+        prompt: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate caption for an image and yield the text as it is produced.
+
+        Generation runs on a worker thread with a streamer that hands each
+        decoded text increment back to the event loop. Streams are not
+        batched with other requests. If the consumer stops iterating, e.g.
+        because the client disconnected, generation is stopped at the next
+        token.
+
+        Args:
+            image_content (bytes): The image file content
+            max_new_tokens (int): Maximum number of tokens to generate
+            temperature (float): Temperature for generation
+            do_sample (bool): Whether to use sampling
+            prompt (Optional[str]): Text prompt or question to condition the caption on
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: ("token", {"text": ...}) for each text
+            increment, then ("done", ...) with the full caption and timings
+
+        Raises:
+            Exception: If caption generation fails
+        """
+        start_time = time.time()
+        logger.info("Starting streaming image caption generation")
+
+        model = model_manager.get_model()
+        processor = model_manager.get_processor()
+
+        request = await self._run_in_pool(self._build_request, processor, image_content)
+
+        text_inputs = None
+        if prompt is not None:
+            text_inputs = processor(text=[prompt], return_tensors="pt").to(model_manager.get_device())
+
+        cancelled = threading.Event()
+        streamer = AsyncTextIteratorStreamer(processor.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        generate_kwargs = {
+            "max_new_tokens": max_new_tokens,
+            "temperature": temperature,
+            "do_sample": do_sample,
+            "streamer": streamer,
+            "stopping_criteria": StoppingCriteriaList([StopOnEvent(cancelled)])
+        }
+        generation = asyncio.create_task(asyncio.to_thread(
+            self._generate_streaming, model, request, text_inputs, generate_kwargs
+        ))
+
+        pieces = []
+        time_to_first_token = None
         try:
-            image = Image.open(io.BytesIO(image_content)).convert('RGB')
-            return image
+            async for text in streamer:
+                if not text:
+                    continue
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                    self._first_token_histogram.observe(time_to_first_token)
+                pieces.append(text)
+                yield "token", {"text": text}
+
+            # Surface generation errors
+            await generation
         except Exception as e:
-            logger.error(f"Error loading image: {e}")
-            raise ValueError("Invalid image file")
+            logger.error(f"Streaming caption generation failed: {e}")
+            raise
+        finally:
+            cancelled.set()
 
-    async def _generate_text(
-        self, 
-        model, 
-        processor, 
-        inputs, 
-        max_new_tokens: int,
-        temperature: float,
-        do_sample: bool
-    ) -> str:
-        """Generate text using the model."""
+        processing_time = time.time() - start_time
+        logger.info(f"Successfully streamed caption in {processing_time:.2f} seconds")
+
+        yield "done", {
+            "caption": "".join(pieces).strip(),
+            "prompt": prompt,
+            "model_name": MODEL_NAME,
+            "processing_time": processing_time,
+            "time_to_first_token": time_to_first_token if time_to_first_token is not None else processing_time
+        }
+
+    async def generate_captions(
+        self,
+        image_contents: List[bytes],
+        max_new_tokens: int = MAX_NEW_TOKENS,
+        temperature: float = TEMPERATURE,
+        do_sample: bool = DO_SAMPLE,
+        batch_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate captions for several images in sub-batches.
+
+        Images are looked up in the embedding cache or decoded and
+        preprocessed in parallel, then captioned ``batch_size`` at a time,
+        so the vision encoder runs once per sub-batch for the images that
+        miss the cache and the language model once per sub-batch. If a
+        sub-batch fails, its images are retried one by one so only the
+        failing image reports an error.
+
+        Args:
+            image_contents (List[bytes]): The image file contents
+            max_new_tokens (int): Maximum number of tokens to generate
+            temperature (float): Temperature for generation
+            do_sample (bool): Whether to use sampling
+            batch_size (Optional[int]): Images per generate call, defaults to settings.caption_batch_size
+
+        Returns:
+            List[Dict[str, Any]]: One result per image, in input order, with
+            either "caption" and "processing_time" or "error"
+        """
+        batch_size = batch_size or settings.caption_batch_size
+        logger.info(f"Starting caption generation for {len(image_contents)} images in batches of {batch_size}")
+
+        processor = model_manager.get_processor()
+        key = (None, tuple(sorted(
+            {"max_new_tokens": max_new_tokens, "temperature": temperature, "do_sample": do_sample}.items()
+        )))
+
+        # Look up or load and prepare all images in parallel in the preprocessing pool
+        built = await asyncio.gather(
+            *(self._run_in_pool(self._timed_build_request, processor, image_content) for image_content in image_contents),
+            return_exceptions=True
+        )
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(image_contents)
+        pending = []
+        for idx, outcome in enumerate(built):
+            if isinstance(outcome, ValueError):
+                results[idx] = {"error": str(outcome)}
+                continue
+            if isinstance(outcome, BaseException):
+                raise outcome
+            request, load_time = outcome
+            pending.append((idx, request, load_time))
+
+        for batch_start in range(0, len(pending), batch_size):
+            batch = pending[batch_start:batch_start + batch_size]
+            batch_start_time = time.time()
+            try:
+                captions = await self._generate_batch([request for _, request, _ in batch], key)
+            except Exception as e:
+                if len(batch) == 1:
+                    logger.error(f"Caption generation failed for image {batch[0][0]}: {e}")
+                    results[batch[0][0]] = {"error": "Caption generation failed"}
+                    continue
+                logger.warning(f"Batch of {len(batch)} images failed, retrying individually: {e}")
+                for item in batch:
+                    results[item[0]] = await self._caption_single(item, key)
+                continue
+
+            batch_time = time.time() - batch_start_time
+            for (idx, _, load_time), caption in zip(batch, captions):
+                results[idx] = {"caption": caption, "processing_time": load_time + batch_time}
+
+        return results
+
+    async def _caption_single(self, item: Tuple[int, CaptionRequest, float], key: GenerationKey) -> Dict[str, Any]:
+        """Caption one already prepared image of a failed sub-batch."""
+        idx, request, load_time = item
+        start_time = time.time()
         try:
-            # Generate response
-            generated_ids = await asyncio.to_thread(
-                model.generate,
-                **inputs,
-                max_new_tokens=max_new_tokens,
-                temperature=temperature,
-                do_sample=do_sample
-            )
+            caption = (await self._generate_batch([request], key))[0]
+        except Exception as e:
+            logger.error(f"Caption generation failed for image {idx}: {e}")
+            return {"error": "Caption generation failed"}
+        return {"caption": caption, "processing_time": load_time + time.time() - start_time}
 
-            # Decode response
-            generated_text = processor.batch_decode(
-                generated_ids, skip_special_tokens=True
-            )[0].strip()
+    async def _generate_batch(self, requests: List[CaptionRequest], key: GenerationKey) -> List[str]:
+        """Caption a batch of images that share a prompt and generation settings."""
+        model = model_manager.get_model()
+        processor = model_manager.get_processor()
+        prompt, generate_kwargs = key
 
-            return generated_text
+        text_inputs = None
+        if prompt is not None:
+            text_inputs = processor(text=[prompt] * len(requests), return_tensors="pt").to(model_manager.get_device())
 
+        try:
+            generated_ids = await asyncio.to_thread(
+                self._generate_from_requests, model, requests, text_inputs, dict(generate_kwargs)
+            )
+            generated_texts = processor.batch_decode(generated_ids, skip_special_tokens=True)
+            return [text.strip() for text in generated_texts]
         except Exception as e:
             logger.error(f"Error during text generation: {e}")
             raise
 
+    @torch.no_grad()
+    def _generate_from_requests(self, model, requests: List[CaptionRequest], text_inputs, generate_kwargs: Dict[str, Any]) -> torch.Tensor:
+        """
+        Embed the images missing from the cache in one pass and generate from all embeddings.
+
+        Args:
+            model: BLIP-2 model
+            requests (List[CaptionRequest]): Images to caption
+            text_inputs: Tokenized prompt of each image, or None for plain captions
+            generate_kwargs (Dict[str, Any]): Generation settings
+
+        Returns:
+            torch.Tensor: Generated token IDs of each image
+        """
+        image_embeds = [request.image_embeds for request in requests]
+        missing = [idx for idx, embeds in enumerate(image_embeds) if embeds is None]
+        if missing:
+            encoded = self._embed_images(model, torch.cat([requests[idx].pixel_values for idx in missing]))
+            for row, idx in enumerate(missing):
+                # Copy the row so the cache does not keep the whole batch alive
+                image_embeds[idx] = encoded[row:row + 1].clone()
+                embedding_cache.put(requests[idx].image_hash, image_embeds[idx])
+
+        return self._generate_from_embeds(
+            model,
+            torch.cat(image_embeds),
+            text_inputs["input_ids"] if text_inputs is not None else None,
+            text_inputs["attention_mask"] if text_inputs is not None else None,
+            generate_kwargs
+        )
+
+    def _generate_streaming(self, model, request: CaptionRequest, text_inputs, generate_kwargs: Dict[str, Any]) -> torch.Tensor:
+        """Generate for one streamed request, ending the stream if generation fails."""
+        try:
+            return self._generate_from_requests(model, [request], text_inputs, generate_kwargs)
+        except Exception:
+            generate_kwargs["streamer"].end()
+            raise
+
+    @staticmethod
+    def _embed_images(model, pixel_values: torch.Tensor) -> torch.Tensor:
+        """
+        Run the vision encoder, Q-Former and language projection of BLIP-2.
+
+        Args:
+            model: BLIP-2 model
+            pixel_values (torch.Tensor): Preprocessed images of shape (batch, channels, height, width)
+
+        Returns:
+            torch.Tensor: Language model inputs of shape (batch, num_query_tokens, hidden_size)
+        """
+        image_embeds = model.vision_model(pixel_values, return_dict=True).last_hidden_state
+        image_attention_mask = torch.ones(image_embeds.size()[:-1], dtype=torch.long, device=image_embeds.device)
+
+        query_tokens = model.query_tokens.expand(image_embeds.shape[0], -1, -1)
+        query_output = model.qformer(
+            query_embeds=query_tokens,
+            encoder_hidden_states=image_embeds,
+            encoder_attention_mask=image_attention_mask,
+            return_dict=True
+        ).last_hidden_state
+
+        # The Q-Former may be kept in fp32; cast back to the vision dtype like generate does
+        if query_output.dtype != image_embeds.dtype:
+            query_output = query_output.to(image_embeds.dtype)
+
+        return model.language_projection(query_output)
+
+    @staticmethod
+    def _generate_from_embeds(
+        model,
+        language_model_inputs: torch.Tensor,
+        input_ids: Optional[torch.Tensor],
+        attention_mask: Optional[torch.Tensor],
+        generate_kwargs: Dict[str, Any]
+    ) -> torch.Tensor:
+        """
+        Generate from image embeddings the way ``Blip2ForConditionalGeneration.generate`` does.
+
+        Args:
+            model: BLIP-2 model
+            language_model_inputs (torch.Tensor): Image embeddings of shape (batch, num_query_tokens, hidden_size)
+            input_ids (Optional[torch.Tensor]): Tokenized prompts, or None for plain captions
+            attention_mask (Optional[torch.Tensor]): Attention mask of the prompts
+            generate_kwargs (Dict[str, Any]): Generation settings
+
+        Returns:
+            torch.Tensor: Generated token IDs
+        """
+        batch_size = language_model_inputs.shape[0]
+        image_token_id = getattr(model.config, "image_token_id", None)
+
+        if input_ids is None:
+            start_tokens = [model.config.text_config.bos_token_id]
+            if image_token_id is not None:
+                start_tokens = [image_token_id] * model.config.num_query_tokens + start_tokens
+            input_ids = torch.tensor([start_tokens], dtype=torch.long, device=language_model_inputs.device)
+            input_ids = input_ids.repeat(batch_size, 1)
+
+        inputs_embeds = model.get_input_embeddings()(input_ids)
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+
+        # Newer checkpoints reserve image token positions in the prompt; older ones are concatenated
+        if image_token_id is not None:
+            special_image_mask = (input_ids == image_token_id).unsqueeze(-1).expand_as(inputs_embeds)
+            inputs_embeds[special_image_mask] = language_model_inputs.flatten().to(inputs_embeds.dtype)
+        else:
+            language_attention_mask = torch.ones(
+                language_model_inputs.size()[:-1], dtype=torch.long, device=language_model_inputs.device
+            )
+            inputs_embeds = torch.cat([language_model_inputs, inputs_embeds.to(language_model_inputs.device)], dim=1)
+            attention_mask = torch.cat([language_attention_mask, attention_mask.to(language_attention_mask.device)], dim=1)
+
+            # Keep length limits counted on the text tokens, as generate does
+            if not model.language_model.config.is_encoder_decoder:
+                generate_kwargs["max_length"] = generate_kwargs.get("max_length", 20) + language_model_inputs.shape[1] - 1
+                generate_kwargs["min_length"] = generate_kwargs.get("min_length", 0) + language_model_inputs.shape[1]
+
+        inputs = {"inputs_embeds": inputs_embeds, "attention_mask": attention_mask}
+        if not model.language_model.config.is_encoder_decoder:
+            inputs["input_ids"] = input_ids
+
+        return model.language_model.generate(**inputs, **generate_kwargs)
+
+    async def _run_in_pool(self, func: Callable, *args) -> Any:
+        """Run blocking decode or preprocessing work in the preprocessing pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._preprocess_pool, func, *args)
+
+    def _build_request(self, processor, image_content: bytes) -> CaptionRequest:
+        """Look up an image's cached embeddings, or decode and preprocess it on a miss."""
+        image_hash = embedding_cache.key(image_content)
+        image_embeds = embedding_cache.get(image_hash)
+        if image_embeds is not None:
+            return CaptionRequest(image_hash, None, image_embeds)
+        inputs = self._load_inputs(processor, image_content)
+        return CaptionRequest(image_hash, inputs["pixel_values"], None)
+
+    def _load_inputs(self, processor, image_content: bytes):
+        """Decode one image and preprocess it into model inputs."""
+        start_time = time.perf_counter()
+        image = self._load_image(image_content, self._target_size(processor))
+        inputs = self._prepare_inputs(processor, [image])
+        self._preprocess_histogram.observe(time.perf_counter() - start_time)
+        return inputs
+
+    def _timed_build_request(self, processor, image_content: bytes) -> Tuple[CaptionRequest, float]:
+        """Build the request of one image and measure how long it took."""
+        start_time = time.perf_counter()
+        request = self._build_request(processor, image_content)
+        return request, time.perf_counter() - start_time
+
+    def _prepare_inputs(self, processor, images: List[Image.Image]):
+        """Preprocess images into one batch of model inputs."""
+        return processor(images=images, return_tensors="pt").to(model_manager.get_device(), model_manager.get_dtype())
+
+    @staticmethod
+    def _target_size(processor) -> Tuple[int, int]:
+        """Get the (width, height) the image processor resizes images to."""
+        size = processor.image_processor.size
+        if "height" in size:
+            return size["width"], size["height"]
+        return size["shortest_edge"], size["shortest_edge"]
+
+    def _load_image(self, image_content: bytes, target_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+        """
+        Load image from bytes.
+
+        With a target size, large images are decoded close to it instead of at
+        full resolution: JPEGs are decoded at a reduced DCT scale and other
+        formats are box-downscaled by an integer factor. Both sides stay at
+        least as large as the target, so the processor's resize still
+        produces the final size.
+
+        Args:
+            image_content (bytes): The image file content
+            target_size (Optional[Tuple[int, int]]): (width, height) the image will be resized to
+
+        Returns:
+            Image.Image: RGB image
+
+        Raises:
+            ValueError: If the image cannot be decoded
+        """
+        try:
+            image = Image.open(io.BytesIO(image_content))
+            if target_size is not None and image.format == "JPEG":
+                image.draft("RGB", target_size)
+            image = image.convert('RGB')
+
+            if target_size is not None:
+                factor = min(image.width // target_size[0], image.height // target_size[1])
+                if factor >= 2:
+                    image = image.reduce(factor)
+            return image
+        except Exception as e:
+            logger.error(f"Error loading image: {e}")
+            raise ValueError("Invalid image file")
+
 # Global generator instance
 caption_generator = CaptionGenerator()
\ No newline at end of file
@@ -22,6 +22,7 @@ class HealthChecker:
                 "service": "BLIP-2 Image-to-Text Service",
                 "model_name": MODEL_NAME,
                 "device": settings.device,
+                "model_precision": settings.model_precision,
                 "cuda_available": settings.cuda_available,
             }
 
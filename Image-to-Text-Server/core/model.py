@@ -8,7 +8,7 @@ from typing import Optional
 from transformers import Blip2Processor, Blip2ForConditionalGeneration
 from huggingface_hub import login
 
-from config.constants import MODEL_NAME, MODEL_PRECISION
+from config.constants import MODEL_NAME
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,9 @@ class ModelManager:
     def __init__(self):
         self.model: Optional[Blip2ForConditionalGeneration] = None
         self.processor: Optional[Blip2Processor] = None
+        self.precision: str = settings.model_precision
+        self.device: str = settings.device
+        self.dtype: torch.dtype = torch.float32
         self._is_initialized = False
 
     async def initialize(self) -> None:
@@ -52,29 +55,77 @@ class ModelManager:
     async def _initialize_model(self) -> None:
         """Initialize the BLIP-2 model."""
         try:
-            logger.info(f"Initializing BLIP-2 model: {MODEL_NAME} on device: {settings.device}")
+            logger.info(f"Initializing BLIP-2 model: {MODEL_NAME} on device: {self.device} ({self.precision})")
 
             # Load processor
             self.processor = Blip2Processor.from_pretrained(MODEL_NAME)
 
-            # Load model with float16 precision
-            self.model = Blip2ForConditionalGeneration.from_pretrained(
-                MODEL_NAME,
-                torch_dtype=torch.float16,
-                device_map="auto"
-            )
+            # Load model with the configured precision
+            if self.precision == "int8":
+                self.model = self._load_int8_model()
+            else:
+                self.model = self._load_model(self._resolve_dtype())
 
-            logger.info("BLIP-2 model initialized successfully")
+            logger.info(f"BLIP-2 model initialized successfully on {self.device} ({self.dtype})")
         except Exception as e:
             logger.error(f"Failed to initialize model: {e}")
             raise
 
+    def _resolve_dtype(self) -> torch.dtype:
+        """Get the torch dtype of the configured precision, falling back to float32 without bfloat16 support."""
+        if self.precision == "float16":
+            return torch.float16
+        if self.precision != "bfloat16":
+            return torch.float32
+
+        if self.device.startswith("cuda"):
+            supported = torch.cuda.is_bf16_supported()
+        else:
+            supported = torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+
+        if not supported:
+            logger.warning(f"bfloat16 is not supported on this {self.device}; using float32")
+            return torch.float32
+        return torch.bfloat16
+
+    def _load_model(self, dtype: torch.dtype) -> Blip2ForConditionalGeneration:
+        """Load the model in a floating point dtype on the configured device."""
+        self.dtype = dtype
+
+        if self.device == "cpu":
+            return Blip2ForConditionalGeneration.from_pretrained(MODEL_NAME, torch_dtype=dtype).eval()
+
+        # Let accelerate spread the model over the available GPUs unless a specific one is set
+        return Blip2ForConditionalGeneration.from_pretrained(
+            MODEL_NAME,
+            torch_dtype=dtype,
+            device_map="auto" if self.device == "cuda" else {"": self.device}
+        )
+
+    def _load_int8_model(self) -> Blip2ForConditionalGeneration:
+        """Load the model with dynamically quantized int8 Q-Former and language model linear layers (CPU only)."""
+        self.device, self.dtype = "cpu", torch.float32
+        model = Blip2ForConditionalGeneration.from_pretrained(MODEL_NAME, torch_dtype=torch.float32).eval()
+
+        # The vision encoder stays in float32; the Q-Former and T5 hold most of the linear layers
+        for module in (model.qformer, model.language_model):
+            torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+
     def get_model(self) -> Blip2ForConditionalGeneration:
         """Get the initialized model instance."""
         if not self._is_initialized or self.model is None:
             raise RuntimeError("Model not initialized. Call initialize() first.")
         return self.model
 
+    def get_device(self) -> str:
+        """Get the device model inputs have to be moved to."""
+        return self.device
+
+    def get_dtype(self) -> torch.dtype:
+        """Get the floating point dtype model inputs have to be cast to."""
+        return self.dtype
+
     def get_processor(self) -> Blip2Processor:
         """Get the initialized processor instance."""
         if not self._is_initialized or self.processor is None:
@@ -83,10 +134,13 @@ class ModelManager:
 
     async def cleanup(self) -> None:
         """Cleanup model resources."""
-        if self.model:
-            # Clear CUDA cache if using GPU
-            if settings.cuda_available:
-                torch.cuda.empty_cache()
+        self.model = None
+        self.processor = None
+        self._is_initialized = False
+
+        # Clear CUDA cache if using GPU
+        if self.device.startswith("cuda"):
+            torch.cuda.empty_cache()
         logger.info("Model cleanup completed")
 
 # Global model manager instance
@@ -3,7 +3,9 @@ Input validation utilities for image captioning requests.
 """
 
 from fastapi import HTTPException, UploadFile
-from config.constants import MAX_IMAGE_SIZE_MB, SUPPORTED_IMAGE_FORMATS
+from typing import List, Optional
+
+from config.constants import MAX_BATCH_IMAGES, MAX_IMAGE_SIZE_MB, MAX_PROMPT_LENGTH, SUPPORTED_IMAGE_FORMATS
 
 class RequestValidator:
     """Validates image captioning requests."""
@@ -27,6 +29,24 @@ class RequestValidator:
                 detail=f"File size exceeds {MAX_IMAGE_SIZE_MB}MB limit"
             )
 
+    @staticmethod
+    def validate_batch_size(files: List[UploadFile]) -> None:
+        """Validate the number of images in a batch request."""
+        if not files or len(files) > MAX_BATCH_IMAGES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Between 1 and {MAX_BATCH_IMAGES} images must be uploaded"
+            )
+
+    @staticmethod
+    def validate_prompt(prompt: Optional[str]) -> None:
+        """Validate an optional text prompt."""
+        if prompt is not None and (not prompt.strip() or len(prompt) > MAX_PROMPT_LENGTH):
+            raise HTTPException(
+                status_code=400,
+                detail=f"prompt must be between 1 and {MAX_PROMPT_LENGTH} characters"
+            )
+
     @staticmethod
     def validate_generation_params(max_new_tokens: int, temperature: float) -> None:
         """Validate generation parameters."""
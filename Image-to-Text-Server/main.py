@@ -6,8 +6,9 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
+from core.generator import caption_generator
 from core.model import model_manager
-from api.endpoints import caption, health
+from api.endpoints import caption, health, metrics
 from utils.logging import setup_logging
 
 # Configure logging
@@ -21,9 +22,11 @@ async def lifespan(app: FastAPI):
     logger.info("Starting BLIP-2 Image-to-Text Service...")
     setup_logging()
     await model_manager.initialize()
+    await caption_generator.start()
     yield
     # Shutdown
     logger.info("Shutting down BLIP-2 Image-to-Text Service...")
+    await caption_generator.stop()
     await model_manager.cleanup()
 
 def create_app() -> FastAPI:
@@ -39,6 +42,7 @@ def create_app() -> FastAPI:
     # Include routers
     app.include_router(caption.router)
     app.include_router(health.router)
+    app.include_router(metrics.router)
 
     return app
 
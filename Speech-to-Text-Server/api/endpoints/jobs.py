@@ -0,0 +1,62 @@
+"""
+Asynchronous transcription job API endpoints.
+"""
+import logging
+from typing import Optional
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException
+from fastapi.responses import JSONResponse
+
+from api.models.requests import JobSubmissionResponse, JobStatusResponse
+from core.jobs import job_manager
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1", tags=["jobs"])
+
+@router.post("/jobs", response_model=JobSubmissionResponse, status_code=202)
+async def submit_job(file: UploadFile = File(...), model: Optional[str] = Form(None)) -> JSONResponse:
+    """
+    Queue an audio file for background transcription.
+    
+    Args:
+        file: Audio file to transcribe
+        model: Whisper model to use, one of AVAILABLE_MODELS; defaults to MODEL_NAME
+        
+    Returns:
+        JSON response with the job ID to poll
+    """
+    try:
+        job = await job_manager.submit(file, model)
+        
+        response_data = JobSubmissionResponse(job_id=job["job_id"], status=job["status"])
+        
+        return JSONResponse(
+            content=response_data.dict(),
+            status_code=202
+        )
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions as-is
+        raise
+    except Exception as e:
+        logger.error(f"Job submission failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Job submission failed: {str(e)}"
+        )
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str) -> JobStatusResponse:
+    """
+    Report the status, progress and partial transcript of a job.
+    
+    Args:
+        job_id: Job identifier returned on submission
+        
+    Returns:
+        Job status with per-chunk progress
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    
+    return JobStatusResponse(**job)
@@ -0,0 +1,59 @@
+"""
+Streaming speech transcription WebSocket endpoints.
+"""
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from core.streaming import StreamingSession
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1", tags=["streaming"])
+
+@router.websocket("/stream")
+async def stream_transcription(websocket: WebSocket) -> None:
+    """
+    Transcribe a live audio stream.
+    
+    The client sends binary frames of 16 kHz mono 16-bit little-endian PCM
+    and a text frame ``{"event": "end"}`` when it is done. The server sends
+    ``partial`` events with stable and unstable text as the buffer grows and
+    ``final`` events when a segment is complete.
+    """
+    await websocket.accept()
+    session = StreamingSession()
+    decoder = asyncio.create_task(session.run(websocket.send_json))
+    
+    try:
+        while not decoder.done():
+            message = await websocket.receive()
+            
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                session.add_audio(message["bytes"])
+            elif message.get("text"):
+                if json.loads(message["text"]).get("event") == "end":
+                    session.close()
+                    await decoder
+                    await websocket.close()
+                    break
+        
+        # Surface decoder failures to the client
+        if decoder.done() and not decoder.cancelled() and decoder.exception():
+            raise decoder.exception()
+        
+    except WebSocketDisconnect:
+        logger.info("Streaming client disconnected")
+    except Exception as e:
+        logger.error(f"Streaming transcription failed: {e}")
+        try:
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        if not decoder.done():
+            decoder.cancel()
@@ -2,36 +2,54 @@
 Speech transcription API endpoints.
 """
 import logging
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from typing import Optional
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
 
 from api.models.requests import TranscriptionResponse
 from core.transcriber import transcriber
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["transcription"])
 
 @router.post("/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio(file: UploadFile = File(...)) -> JSONResponse:
+async def transcribe_audio(
+    file: UploadFile = File(...),
+    translate: bool = Form(False),
+    detect_language: bool = Form(False),
+    model: Optional[str] = Form(None)
+) -> JSONResponse:
     """
     Transcribe speech from uploaded audio file.
     
+    With ``translate`` or ``detect_language`` set, each chunk is encoded
+    once and the transcription, English translation and language are all
+    decoded from the same encoder outputs.
+    
     Args:
         file: Audio file to transcribe
+        translate: Whether to also return an English translation
+        detect_language: Whether to detect the spoken language and transcribe in it
+        model: Whisper model to use, one of AVAILABLE_MODELS; defaults to MODEL_NAME
         
     Returns:
         JSON response with transcription
     """
     try:
         # Process audio file and get transcription
-        transcription_text = await transcriber.process_audio_file(file)
+        result = await transcriber.process_audio_file(file, translate, detect_language, model)
         
         # Create response
         response_data = TranscriptionResponse(
-            transcription=transcription_text,
+            transcription=result["transcription"],
+            segments=result["segments"],
+            translation=result.get("translation"),
+            language=result.get("language"),
             processing_info={
                 "filename": file.filename,
-                "content_type": file.content_type
+                "content_type": file.content_type,
+                "model": model or settings.model_name
             }
         )
         
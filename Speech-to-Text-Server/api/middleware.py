@@ -0,0 +1,78 @@
+"""
+ASGI middleware for the API.
+"""
+import logging
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.validation import validator
+from config.constants import MAX_FILE_SIZE_MB
+
+logger = logging.getLogger(__name__)
+
+class UploadTooLarge(HTTPException):
+    """Raised when a streamed request body grows past the configured limit."""
+    
+    def __init__(self):
+        super().__init__(
+            status_code=413,
+            detail=f"File size exceeds limit of {MAX_FILE_SIZE_MB}MB"
+        )
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized request bodies before they are buffered.
+    
+    Requests with a declared ``Content-Length`` over the limit are refused
+    without reading the body. Bodies without a declared length (chunked
+    uploads) are counted while they stream in and cut off at the limit.
+    """
+    
+    def __init__(self, app: ASGIApp, max_body_bytes: int):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        
+        try:
+            validator.validate_content_length(
+                content_length.decode("latin-1") if content_length is not None else None,
+                self.max_body_bytes
+            )
+        except HTTPException as e:
+            logger.warning(f"Rejected request before reading body: {e.detail}")
+            await JSONResponse(status_code=e.status_code, content={"detail": e.detail})(scope, receive, send)
+            return
+        
+        received = 0
+        response_started = False
+        
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise UploadTooLarge()
+            return message
+        
+        async def tracked_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except UploadTooLarge as e:
+            # Raised outside of FastAPI's request handling; respond directly
+            logger.warning("Rejected request body exceeding size limit while streaming")
+            if not response_started:
+                await JSONResponse(status_code=e.status_code, content={"detail": e.detail})(scope, receive, send)
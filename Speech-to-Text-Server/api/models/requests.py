@@ -4,9 +4,20 @@ Request and response models for the API.
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 
+class TranscriptionSegment(BaseModel):
+    """Transcription of one model window with its position in the original audio."""
+    start: float = Field(..., description="Start time in seconds in the original audio")
+    end: float = Field(..., description="End time in seconds in the original audio")
+    text: str = Field(..., description="Transcribed text of the segment")
+    translation: Optional[str] = Field(None, description="English translation of the segment, if requested")
+    language: Optional[str] = Field(None, description="Detected language code of the segment, if requested")
+
 class TranscriptionResponse(BaseModel):
     """Response model for transcription endpoint."""
     transcription: str = Field(..., description="Transcribed text from audio")
+    segments: Optional[List[TranscriptionSegment]] = Field(None, description="Per-segment transcriptions with timestamps")
+    translation: Optional[str] = Field(None, description="English translation of the audio, if requested")
+    language: Optional[str] = Field(None, description="Most common detected language code, if requested")
     processing_info: Optional[Dict[str, Any]] = Field(None, description="Additional processing information")
 
 class HealthResponse(BaseModel):
@@ -14,8 +25,35 @@ class HealthResponse(BaseModel):
     status: str
     service: str
     model_name: str
+    assistant_model_name: Optional[str] = None
     device: str
+    inference_backend: str
     cuda_available: bool
     supported_formats: List[str]
     torch_version: str
     model_initialized: bool
+    loaded_models: Dict[str, str] = Field(default_factory=dict, description="On-demand models and the device each resides on")
+
+class JobProgress(BaseModel):
+    """Chunk-level progress of a transcription job."""
+    completed_chunks: int = Field(..., description="Number of transcribed chunks")
+    total_chunks: Optional[int] = Field(None, description="Total number of chunks, once the audio is decoded")
+
+class JobSubmissionResponse(BaseModel):
+    """Response model for job submission endpoint."""
+    job_id: str = Field(..., description="Identifier to poll the job with")
+    status: str = Field(..., description="Job status")
+
+class JobStatusResponse(BaseModel):
+    """Response model for job status endpoint."""
+    job_id: str
+    status: str = Field(..., description="One of queued, running, completed or failed")
+    filename: Optional[str] = None
+    model: Optional[str] = Field(None, description="Whisper model used for the job")
+    created_at: float = Field(..., description="Submission time as a UNIX timestamp")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: JobProgress
+    segments: List[TranscriptionSegment] = Field(default_factory=list, description="Transcribed segments so far")
+    transcription: Optional[str] = Field(None, description="Complete transcription once the job has completed")
+    error: Optional[str] = None
@@ -0,0 +1,312 @@
+"""
+Benchmark audio preprocessing and transcription stages on synthetic audio.
+
+Usage:
+    uv run benchmark.py --signals tone,noise,speech --rates 16000,44100 --channels 1,2
+    uv run benchmark.py --durations 30,300 --formats wav,flac --output report.json
+
+Synthetic files are written for every combination of signal, sample rate,
+channel count, duration and format, then each preprocessing stage and
+feature extraction and generation with a small random-weight Whisper model
+are timed on them. No model download or GPU is needed, so preprocessing and
+batching changes can be measured on a CPU-only machine. The JSON report
+lists the median time, real-time factor (RTF), throughput in audio
+seconds per second and peak traced allocation for every stage.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+import torch
+from scipy.signal import lfilter, sawtooth
+from transformers import WhisperConfig, WhisperFeatureExtractor, WhisperForConditionalGeneration
+
+from config.constants import TARGET_SAMPLE_RATE
+from config.settings import settings
+from core.features import feature_extractor
+from core.preprocessing import preprocessor
+from utils.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+SIGNALS = ["tone", "noise", "speech"]
+FORMATS = {"wav": "PCM_16", "flac": "PCM_16", "ogg": "VORBIS"}
+
+# Whisper architecture with random weights, small enough to run anywhere
+TINY_WHISPER_CONFIG = {
+    "d_model": 64,
+    "encoder_layers": 2,
+    "decoder_layers": 2,
+    "encoder_attention_heads": 2,
+    "decoder_attention_heads": 2,
+    "encoder_ffn_dim": 256,
+    "decoder_ffn_dim": 256
+}
+
+# Vowel-like formant frequencies and bandwidths in Hz
+FORMANTS = [(700, 130), (1220, 70), (2600, 160)]
+
+def synthesize(signal: str, duration_sec: float, sample_rate: int, channels: int, seed: int) -> np.ndarray:
+    """
+    Generate deterministic synthetic audio.
+
+    Args:
+        signal: "tone" for a 440 Hz tone with harmonics, "noise" for white
+            noise or "speech" for a speech-like voiced signal with pauses
+        duration_sec: Duration in seconds
+        sample_rate: Sample rate in Hz
+        channels: Number of channels; extra channels are delayed copies
+        seed: Random seed
+
+    Returns:
+        Audio of shape (frames, channels) in [-1, 1]
+    """
+    rng = np.random.default_rng(seed)
+    frames = int(duration_sec * sample_rate)
+    t = np.arange(frames) / sample_rate
+
+    if signal == "tone":
+        audio = 0.4 * np.sin(2 * np.pi * 440 * t) + 0.1 * np.sin(2 * np.pi * 880 * t)
+    elif signal == "noise":
+        audio = np.clip(0.2 * rng.standard_normal(frames), -1.0, 1.0)
+    else:
+        # Glottal pulse train with a wandering pitch, shaped by formant resonators
+        pitch = 120 + 20 * np.sin(2 * np.pi * 0.5 * t)
+        audio = sawtooth(2 * np.pi * np.cumsum(pitch) / sample_rate)
+        for frequency, bandwidth in FORMANTS:
+            if frequency < sample_rate / 2:
+                radius = np.exp(-np.pi * bandwidth / sample_rate)
+                theta = 2 * np.pi * frequency / sample_rate
+                audio = lfilter([1 - radius], [1, -2 * radius * np.cos(theta), radius ** 2], audio)
+
+        # Syllables at about 4 Hz, with roughly a quarter of the words silent
+        word_frames = int(0.6 * sample_rate)
+        words = rng.random(frames // word_frames + 1) > 0.25
+        envelope = np.sin(np.pi * 4 * t) ** 2 * np.repeat(words, word_frames)[:frames]
+        audio = audio * envelope + 0.005 * rng.standard_normal(frames)
+        audio = 0.5 * audio / max(np.abs(audio).max(), 1e-9)
+
+    return np.stack([np.roll(audio, 17 * channel) * 0.9 ** channel for channel in range(channels)], axis=1)
+
+def build_tiny_whisper(seed: int) -> Tuple[WhisperForConditionalGeneration, WhisperFeatureExtractor]:
+    """Create a random-weight Whisper model and a default feature extractor."""
+    torch.manual_seed(seed)
+    model = WhisperForConditionalGeneration(WhisperConfig(**TINY_WHISPER_CONFIG)).to(settings.device).eval()
+    return model, WhisperFeatureExtractor()
+
+def time_stage(function: Callable[[], Any], repeats: int) -> Tuple[Tuple[float, float], Any]:
+    """
+    Time a stage several times, then measure its peak allocation in one more run.
+
+    The allocation run is traced with tracemalloc, which sees Python and
+    NumPy buffers but not PyTorch tensor storage, and is not timed since
+    tracing slows allocation down.
+
+    Args:
+        function: Stage to run
+        repeats: Number of timed runs
+
+    Returns:
+        Tuple of the median wall time in seconds with the peak allocation in
+        bytes, and the last result
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    del result
+
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (statistics.median(timings), peak_bytes), result
+
+def process_peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process since it started, in MB.
+
+    The value only grows, so it reflects the most demanding case run so
+    far rather than the current one.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+
+def benchmark_case(
+    path: str,
+    duration_sec: float,
+    model: Optional[WhisperForConditionalGeneration],
+    whisper_features: Optional[WhisperFeatureExtractor],
+    args: argparse.Namespace
+) -> Dict[str, Dict[str, float]]:
+    """
+    Time every stage on one synthetic file.
+
+    The decode, downmix, resample and chunk stages run one after another on
+    the whole file. ``load_audio`` is the block-wise path the server uses,
+    which decodes, downmixes and resamples in one pass. Features and
+    generation run in batches of ``settings.batch_size`` windows.
+
+    Args:
+        path: Audio file path
+        duration_sec: Audio duration in seconds
+        model: Whisper model to generate with, or None to skip model stages
+        whisper_features: Feature extractor providing the parameters
+        args: Parsed command-line arguments
+
+    Returns:
+        Dict mapping stage names to their seconds, RTF, throughput and peak allocation
+    """
+    def load_file() -> np.ndarray:
+        with open(path, "rb") as audio_file:
+            return preprocessor.load_audio(audio_file)[0]
+
+    timings = {}
+    timings["decode"], decoded = time_stage(lambda: sf.read(path, dtype="float32", always_2d=True), args.repeats)
+    audio_data, sample_rate = decoded
+    timings["downmix"], mono = time_stage(lambda: preprocessor.convert_stereo_to_mono_if_needed(audio_data), args.repeats)
+    timings["resample"], (resampled, _) = time_stage(lambda: preprocessor.resample_audio_if_needed(mono, sample_rate), args.repeats)
+    timings["chunk"], chunks = time_stage(lambda: preprocessor.chunk_audio(resampled, TARGET_SAMPLE_RATE), args.repeats)
+    timings["load_audio"], _ = time_stage(load_file, args.repeats)
+
+    if model is not None:
+        batches = [chunks[start:start + settings.batch_size] for start in range(0, len(chunks), settings.batch_size)]
+
+        def extract() -> List[torch.Tensor]:
+            if settings.feature_extractor == "torch":
+                return [feature_extractor.extract(batch, whisper_features, settings.device) for batch in batches]
+            return [
+                whisper_features(batch, sampling_rate=TARGET_SAMPLE_RATE, return_tensors="pt").input_features.to(settings.device)
+                for batch in batches
+            ]
+
+        def generate() -> None:
+            # Fixed-length decoding, so random weights always do the same work
+            with torch.inference_mode():
+                for batch_features in features:
+                    model.generate(batch_features, min_new_tokens=args.new_tokens, max_new_tokens=args.new_tokens)
+
+        timings["features"], features = time_stage(extract, args.repeats)
+        timings["generate"], _ = time_stage(generate, args.repeats)
+
+    return {
+        stage: {
+            "seconds": round(seconds, 6),
+            "rtf": seconds / duration_sec,
+            "throughput": duration_sec / seconds if seconds else 0.0,
+            "peak_alloc_mb": round(peak_bytes / (1024 * 1024), 1)
+        }
+        for stage, (seconds, peak_bytes) in timings.items()
+    }
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate every synthetic case and benchmark it."""
+    model, whisper_features = (None, None) if args.no_model else build_tiny_whisper(args.seed)
+    if model is not None:
+        # Warm up once so lazy initialization is not counted
+        warmup = feature_extractor.extract([np.zeros(TARGET_SAMPLE_RATE, dtype=np.float32)], whisper_features, settings.device)
+        with torch.inference_mode():
+            model.generate(warmup, min_new_tokens=1, max_new_tokens=1)
+
+    cases = []
+    with tempfile.TemporaryDirectory(prefix="stt-benchmark-") as work_dir:
+        for signal, sample_rate, channels, duration_sec, audio_format in itertools.product(
+            args.signals, args.rates, args.channels, args.durations, args.formats
+        ):
+            path = os.path.join(work_dir, f"{signal}_{sample_rate}_{channels}_{duration_sec:g}.{audio_format}")
+            audio = synthesize(signal, duration_sec, sample_rate, channels, args.seed)
+            sf.write(path, audio.astype(np.float32), sample_rate, subtype=FORMATS[audio_format])
+            del audio
+
+            stages = benchmark_case(path, duration_sec, model, whisper_features, args)
+            cases.append({
+                "signal": signal,
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "duration_sec": duration_sec,
+                "format": audio_format,
+                "file_bytes": os.path.getsize(path),
+                "stages": stages,
+                "process_peak_rss_mb": round(process_peak_rss_mb(), 1)
+            })
+            os.remove(path)
+            logger.info(
+                f"{os.path.basename(path)}: " + ", ".join(f"{stage} {values['rtf']:.4f}" for stage, values in stages.items())
+            )
+
+    return {
+        "config": {
+            "repeats": args.repeats,
+            "batch_size": settings.batch_size,
+            "new_tokens": None if args.no_model else args.new_tokens,
+            "resample_method": settings.resample_method,
+            "feature_extractor": settings.feature_extractor,
+            "model": None if args.no_model else TINY_WHISPER_CONFIG
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "torch": torch.__version__,
+            "device": settings.device,
+            "torch_threads": torch.get_num_threads()
+        },
+        "cases": cases,
+        "process_peak_rss_mb": round(process_peak_rss_mb(), 1)
+    }
+
+def main() -> None:
+    """Command-line entry point."""
+    def csv(cast: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+        return lambda value: [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing and transcription stages on synthetic audio")
+    parser.add_argument("--signals", type=csv(str), default=SIGNALS, help=f"Comma-separated signals ({', '.join(SIGNALS)})")
+    parser.add_argument("--rates", type=csv(int), default=[16000, 44100], help="Comma-separated sample rates in Hz")
+    parser.add_argument("--channels", type=csv(int), default=[1, 2], help="Comma-separated channel counts")
+    parser.add_argument("--durations", type=csv(float), default=[30.0, 120.0], help="Comma-separated durations in seconds")
+    parser.add_argument("--formats", type=csv(str), default=["wav", "flac"], help=f"Comma-separated formats ({', '.join(FORMATS)})")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per stage; the median is reported")
+    parser.add_argument("--batch-size", type=int, default=settings.batch_size, help="Windows per feature and generate call")
+    parser.add_argument("--new-tokens", type=int, default=32, help="Tokens generated per window")
+    parser.add_argument("--no-model", action="store_true", help="Only benchmark the preprocessing stages")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic audio and model weights")
+    parser.add_argument("--output", help="Optional path to write the JSON report")
+    args = parser.parse_args()
+
+    unknown = [signal for signal in args.signals if signal not in SIGNALS] + [fmt for fmt in args.formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"Unknown signals or formats: {', '.join(unknown)}")
+    if min(args.repeats, args.batch_size, args.new_tokens, *args.rates, *args.channels) < 1 or min(args.durations) <= 0:
+        parser.error("Counts, rates and durations must be positive")
+
+    settings.batch_size = args.batch_size
+
+    setup_logging()
+    # Per-call preprocessing logs would drown out the per-case summaries
+    logging.getLogger("core").setLevel(logging.WARNING)
+
+    report = run_benchmark(args)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Transcribe an archive of audio files offline, without the HTTP server.
+
+Usage:
+    uv run bulk_transcribe.py --input recordings/ --output transcripts.jsonl
+    uv run bulk_transcribe.py --input manifest.jsonl --output transcripts.jsonl --workers 8
+
+The input is either a directory, which is searched recursively for
+supported audio files, or a JSONL manifest whose lines have an "audio"
+file path. Files are decoded and resampled in a process pool while the
+model transcribes windows of earlier files in batches. One JSON line is
+appended to the output per file, so an interrupted run picks up where it
+stopped when started again with the same output.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Set, TextIO, Tuple
+
+import numpy as np
+
+from config.constants import SUPPORTED_AUDIO_FORMATS, TARGET_SAMPLE_RATE
+from config.settings import settings
+from core.model import ModelManager, model_manager
+from core.preprocessing import preprocessor
+from core.transcriber import transcriber
+from core.vad import vad
+from utils.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+def collect_items(input_path: str) -> List[Dict[str, Any]]:
+    """
+    List the files to transcribe.
+
+    Args:
+        input_path: Directory of audio files or JSONL manifest with "audio" paths
+
+    Returns:
+        Items with an "audio" path plus any other manifest fields
+    """
+    if os.path.isdir(input_path):
+        items = []
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in SUPPORTED_AUDIO_FORMATS:
+                    items.append({"audio": os.path.join(root, name)})
+        return items
+
+    with open(input_path) as manifest:
+        return [json.loads(line) for line in manifest if line.strip()]
+
+def load_checkpoint(output_path: str) -> Set[str]:
+    """
+    Read the audio paths already written to the output.
+
+    A partially written last line left by an interrupted run is cut off so
+    that new results are appended after the last complete one.
+
+    Args:
+        output_path: JSONL results file
+
+    Returns:
+        Audio paths of files that already have a result
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    completed = set()
+    valid_bytes = 0
+    with open(output_path, "rb") as output:
+        for line in output:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                completed.add(json.loads(line)["audio"])
+            except (ValueError, KeyError):
+                break
+            valid_bytes += len(line)
+
+    if valid_bytes < os.path.getsize(output_path):
+        logger.warning(f"Discarding incomplete results after byte {valid_bytes} of {output_path}")
+        with open(output_path, "r+b") as output:
+            output.truncate(valid_bytes)
+
+    return completed
+
+def decode_audio(path: str) -> Tuple[List[np.ndarray], List[Tuple[float, float]], float]:
+    """
+    Decode, resample and split one file into model windows in a worker process.
+
+    Args:
+        path: Audio file path
+
+    Returns:
+        Tuple of window arrays, their (start, end) times in seconds and the
+        audio duration in seconds
+    """
+    with open(path, "rb") as audio_file:
+        audio_data, sample_rate = preprocessor.load_audio(audio_file, max_duration_sec=None)
+
+    if settings.vad_enabled:
+        windows = vad.segment(audio_data)
+        chunks = [window.audio for window in windows]
+        spans = [(window.start_sec, window.end_sec) for window in windows]
+    else:
+        chunks = preprocessor.chunk_audio(audio_data, sample_rate)
+        spans = []
+        start = 0
+        for chunk in chunks:
+            spans.append((start / sample_rate, (start + len(chunk)) / sample_rate))
+            start += len(chunk)
+
+    return chunks, spans, len(audio_data) / sample_rate
+
+def write_record(output: TextIO, record: Dict[str, Any]) -> None:
+    """Append one result line and make sure it reaches the disk."""
+    output.write(json.dumps(record) + "\n")
+    output.flush()
+    os.fsync(output.fileno())
+
+async def bulk_transcribe(
+    items: List[Dict[str, Any]],
+    output_path: str,
+    workers: int,
+    prefetch: int,
+    manager: ModelManager
+) -> Dict[str, Any]:
+    """
+    Transcribe files with parallel decoding and batched generation.
+
+    Up to ``prefetch`` files are decoded ahead in the process pool while the
+    model runs. Windows of consecutive files are pooled into batches of
+    ``settings.batch_size``; a partial batch is only run once every file has
+    been decoded, and each file's result is written as soon as its last
+    window is transcribed.
+
+    Args:
+        items: Items with an "audio" path
+        output_path: JSONL file the results are appended to
+        workers: Number of decode processes
+        prefetch: Maximum number of files decoded ahead of the model
+        manager: Model to transcribe with
+
+    Returns:
+        Dict[str, Any]: Summary of the run
+    """
+    loop = asyncio.get_running_loop()
+    batch_size = settings.batch_size
+    queued_items: Iterator[Dict[str, Any]] = iter(items)
+    in_flight: deque = deque()
+    windows: List[Tuple[Dict[str, Any], int, np.ndarray]] = []
+    summary = {"files": 0, "failed": 0, "audio_seconds": 0.0}
+    start_time = time.perf_counter()
+
+    # Spawned workers avoid inheriting the parent's model and CUDA state
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool, \
+            open(output_path, "a") as output:
+
+        def schedule_decodes() -> None:
+            while len(in_flight) < prefetch:
+                item = next(queued_items, None)
+                if item is None:
+                    return
+                in_flight.append((item, loop.run_in_executor(pool, decode_audio, item["audio"])))
+
+        def finish(state: Dict[str, Any]) -> None:
+            write_record(output, {
+                **state["item"],
+                "duration": round(state["duration"], 3),
+                "transcription": " ".join(state["texts"]),
+                "segments": [
+                    {"start": round(start, 3), "end": round(end, 3), "text": text}
+                    for (start, end), text in zip(state["spans"], state["texts"])
+                ]
+            })
+            summary["files"] += 1
+            summary["audio_seconds"] += state["duration"]
+
+        schedule_decodes()
+        while in_flight or windows:
+            # Collect decoded files until a full batch of windows is ready
+            while in_flight and len(windows) < batch_size:
+                item, decoded = in_flight.popleft()
+                try:
+                    chunks, spans, duration = await decoded
+                except BrokenProcessPool:
+                    # A crashed worker is not the file's fault; stop so it is retried on resume
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to decode {item['audio']}: {e}")
+                    write_record(output, {**item, "error": f"Decoding failed: {str(e)}"})
+                    summary["failed"] += 1
+                    continue
+                finally:
+                    schedule_decodes()
+
+                state = {"item": item, "spans": spans, "duration": duration, "texts": [None] * len(chunks), "remaining": len(chunks)}
+                if not chunks:
+                    finish(state)
+                windows.extend((state, idx, chunk) for idx, chunk in enumerate(chunks))
+
+            # Hold back a partial batch while more files are still being decoded
+            take = len(windows) - len(windows) % batch_size if in_flight else len(windows)
+            batch, windows = windows[:take], windows[take:]
+            if not batch:
+                continue
+
+            texts = await transcriber.transcribe_audio_batch(
+                [chunk for _, _, chunk in batch], TARGET_SAMPLE_RATE, manager=manager
+            )
+            for (state, idx, _), text in zip(batch, texts):
+                state["texts"][idx] = text
+                state["remaining"] -= 1
+                if state["remaining"] == 0:
+                    finish(state)
+
+            logger.info(f"Transcribed {summary['files']} files ({summary['audio_seconds']:.0f} seconds of audio)")
+
+    elapsed = time.perf_counter() - start_time
+    summary.update({
+        "audio_seconds": round(summary["audio_seconds"], 3),
+        "processing_seconds": round(elapsed, 3),
+        "rtf": elapsed / summary["audio_seconds"] if summary["audio_seconds"] else 0.0
+    })
+    return summary
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Load the model, skip checkpointed files and transcribe the rest."""
+    items = collect_items(args.input)
+    completed = load_checkpoint(args.output)
+    remaining = [item for item in items if item["audio"] not in completed]
+    logger.info(f"{len(items)} files found, {len(items) - len(remaining)} already transcribed")
+
+    manager = ModelManager(args.model) if args.model and args.model != settings.model_name else model_manager
+    await manager.initialize()
+
+    try:
+        summary = await bulk_transcribe(remaining, args.output, args.workers, args.prefetch, manager)
+    finally:
+        await manager.cleanup()
+
+    return {"input": args.input, "output": args.output, "model": manager.model_name, "skipped": len(items) - len(remaining), **summary}
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Transcribe audio files offline to JSONL")
+    parser.add_argument("--input", required=True, help="Directory of audio files or JSONL manifest with 'audio' paths")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to; existing results are skipped")
+    parser.add_argument("--model", help=f"Whisper model to use (default: {settings.model_name})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of decode processes")
+    parser.add_argument("--prefetch", type=int, help="Files decoded ahead of the model (default: twice the workers)")
+    parser.add_argument("--batch-size", type=int, default=settings.batch_size, help="Windows per generate call")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.batch_size < 1 or (args.prefetch is not None and args.prefetch < 1):
+        parser.error("--workers, --prefetch and --batch-size must be positive")
+    args.prefetch = args.prefetch or 2 * args.workers
+
+    # Generation runs in fixed batches; the cross-request scheduler is not started
+    settings.batch_size = args.batch_size
+
+    setup_logging()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Compare Whisper inference backends on a reference set.
+
+Usage:
+    uv run compare_backends.py --manifest references.jsonl --backends eager,int8,bf16
+
+Each manifest line is a JSON object with an "audio" file path and the
+reference "text". The first backend is the baseline for the reported
+speedup and word-error deltas.
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from config.constants import INFERENCE_BACKENDS
+from core.model import model_manager
+from core.preprocessing import preprocessor
+from core.transcriber import transcriber
+from utils.evaluation import normalize_text, word_error_rate
+from utils.logging import setup_logging
+
+def load_manifest(path: str) -> List[Dict[str, str]]:
+    """Load reference items from a JSONL manifest."""
+    with open(path) as manifest:
+        return [json.loads(line) for line in manifest if line.strip()]
+
+def corpus_wer(references: List[str], hypotheses: List[str]) -> float:
+    """Word error rate over a whole set, weighted by reference length."""
+    total_words = sum(len(normalize_text(reference)) for reference in references)
+    total_errors = sum(
+        word_error_rate(reference, hypothesis) * len(normalize_text(reference))
+        for reference, hypothesis in zip(references, hypotheses)
+    )
+    return total_errors / total_words if total_words else 0.0
+
+async def evaluate_backend(backend: str, items: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Transcribe every reference item with one backend and measure speed and accuracy."""
+    model_manager.backend = backend
+    await model_manager.initialize()
+    
+    try:
+        # Decode and preprocess up front so only inference is timed
+        audio_items = []
+        for item in items:
+            with open(item["audio"], "rb") as audio_file:
+                audio_items.append(preprocessor.load_audio(audio_file))
+        
+        # Warm up once so lazy initialization is not counted
+        warmup_audio, warmup_rate = audio_items[0]
+        await transcriber.transcribe_audio_batch(preprocessor.chunk_audio(warmup_audio, warmup_rate)[:1], warmup_rate)
+        
+        hypotheses = []
+        audio_seconds = 0.0
+        processing_seconds = 0.0
+        for audio_data, sample_rate in audio_items:
+            chunks = preprocessor.chunk_audio(audio_data, sample_rate)
+            start = time.perf_counter()
+            texts = await transcriber.transcribe_audio_batch(chunks, sample_rate)
+            processing_seconds += time.perf_counter() - start
+            audio_seconds += len(audio_data) / sample_rate
+            hypotheses.append(" ".join(texts))
+    finally:
+        await model_manager.cleanup()
+    
+    return {
+        "backend": backend,
+        "device": model_manager.get_device(),
+        "dtype": str(model_manager.get_dtype()),
+        "audio_seconds": audio_seconds,
+        "processing_seconds": processing_seconds,
+        "rtf": processing_seconds / audio_seconds if audio_seconds else 0.0,
+        "wer": corpus_wer([item["text"] for item in items], hypotheses),
+        "hypotheses": hypotheses
+    }
+
+async def compare_backends(manifest: str, backends: List[str]) -> Dict[str, Any]:
+    """Evaluate each backend and report deltas against the first one."""
+    items = load_manifest(manifest)
+    if not items:
+        raise ValueError("Manifest contains no items")
+    
+    results = [await evaluate_backend(backend, items) for backend in backends]
+    baseline = results[0]
+    
+    for result in results:
+        result["speedup"] = baseline["rtf"] / result["rtf"] if result["rtf"] else 0.0
+        result["wer_delta"] = result["wer"] - baseline["wer"]
+        result["wer_vs_baseline_output"] = corpus_wer(baseline["hypotheses"], result["hypotheses"])
+    
+    for result in results:
+        del result["hypotheses"]
+    
+    return {"manifest": manifest, "items": len(items), "baseline": baseline["backend"], "results": results}
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Compare Whisper inference backends")
+    parser.add_argument("--manifest", required=True, help="JSONL file with 'audio' and 'text' fields")
+    parser.add_argument(
+        "--backends",
+        default=",".join(INFERENCE_BACKENDS[:3]),
+        help=f"Comma-separated backends to compare, baseline first ({', '.join(INFERENCE_BACKENDS)})"
+    )
+    parser.add_argument("--output", help="Optional path to write the JSON report")
+    args = parser.parse_args()
+    
+    backends = [backend.strip() for backend in args.backends.split(",") if backend.strip()]
+    unknown = [backend for backend in backends if backend not in INFERENCE_BACKENDS]
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(unknown)}")
+    
+    setup_logging()
+    report = asyncio.run(compare_backends(args.manifest, backends))
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
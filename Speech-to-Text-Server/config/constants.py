@@ -10,17 +10,77 @@ VERSION = "1.0.0"
 # File Upload Configuration
 MAX_FILE_SIZE_MB = 10
 MAX_AUDIO_DURATION_SEC = 600
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
 # Audio Processing Configuration
 TARGET_SAMPLE_RATE = 16000
 SUPPORTED_AUDIO_FORMATS = [".wav", ".mp3", ".flac", ".m4a", ".ogg"]
 CHUNK_DURATION_SEC = 30
+DECODE_BLOCK_FRAMES = 65536
+RESAMPLE_BLOCK_FRAMES = 262144
+MAX_POLYPHASE_FACTOR = 1000
+RESAMPLE_METHODS = ["polyphase", "fft"]
+DEFAULT_RESAMPLE_METHOD = "polyphase"
+FEATURE_EXTRACTORS = ["torch", "processor"]
+DEFAULT_FEATURE_EXTRACTOR = "torch"
+
+# Voice Activity Detection Configuration
+VAD_FRAME_MS = 30
+VAD_MIN_ENERGY_DB = -50.0
+VAD_NOISE_PERCENTILE = 10
+VAD_SPEECH_PERCENTILE = 90
+VAD_ENERGY_MARGIN_DB = 10.0
+VAD_MIN_SPEECH_MS = 240
+VAD_MIN_SILENCE_MS = 300
+VAD_SPEECH_PAD_MS = 150
+
+# Streaming Configuration
+DEFAULT_STREAM_STEP_SEC = 1.0
+STREAM_MAX_BUFFER_SEC = 20
+STREAM_MAX_BACKLOG_SEC = 60
+STREAM_ENDPOINT_SILENCE_MS = 800
+
+# Job Configuration
+DEFAULT_JOB_WORKERS = 1
+DEFAULT_JOB_QUEUE_SIZE = 100
+DEFAULT_JOB_RESULT_TTL_SEC = 3600
+JOB_CLEANUP_INTERVAL_SEC = 60
 
 # Whisper Model Configuration
 MODEL_NAME = "openai/whisper-tiny"
 TASK = "transcribe"
+TRANSLATE_TASK = "translate"
 LANGUAGE = "english"
 MAX_NEW_TOKENS = 444
+ACCEPTANCE_RATE_BUCKETS = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+DEFAULT_COMPILE_BATCH_BUCKETS = "1,2,4,8"
+INFERENCE_BACKENDS = ["eager", "int8", "bf16", "onnx"]
+DEFAULT_INFERENCE_BACKEND = "eager"
+
+# Early Stopping Configuration (disabled by default)
+DEFAULT_REPETITION_NGRAM_SIZE = 4
+DEFAULT_REPETITION_MAX_REPEATS = 0
+DEFAULT_NO_SPEECH_THRESHOLD = 1.0
+DEFAULT_LOGPROB_THRESHOLD = -1.0
+DEFAULT_NO_SPEECH_MIN_TOKENS = 8
+
+# Model Registry Configuration
+DEFAULT_AVAILABLE_MODELS = "openai/whisper-tiny,openai/whisper-base,openai/whisper-small"
+DEFAULT_MODEL_MEMORY_BUDGET_MB = 2048
+DEFAULT_MODEL_OFFLOAD_BUDGET_MB = 4096
+REQUEST_LATENCY_BUCKETS_SEC = [0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0]
+
+# Batching Configuration
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_BATCH_MAX_WAIT_MS = 10
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32]
+INTERACTIVE_PRIORITY = 0
+JOB_PRIORITY = 1
+QUEUE_WAIT_BUCKETS_SEC = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+
+# Pipeline Configuration
+DEFAULT_PIPELINE_QUEUE_SIZE = 8
+PIPELINE_OCCUPANCY_BUCKETS = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
 
 # Server Configuration
 DEFAULT_HOST = "0.0.0.0"
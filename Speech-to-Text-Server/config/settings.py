@@ -2,7 +2,21 @@
 Application settings and environment configuration.
 """
 import os
-from typing import Optional
+from typing import List, Optional
+
+from config.constants import (
+    DEFAULT_BATCH_SIZE, DEFAULT_BATCH_MAX_WAIT_MS,
+    DEFAULT_RESAMPLE_METHOD, RESAMPLE_METHODS,
+    DEFAULT_FEATURE_EXTRACTOR, FEATURE_EXTRACTORS,
+    DEFAULT_STREAM_STEP_SEC,
+    DEFAULT_INFERENCE_BACKEND, INFERENCE_BACKENDS,
+    MODEL_NAME, DEFAULT_COMPILE_BATCH_BUCKETS,
+    DEFAULT_JOB_WORKERS, DEFAULT_JOB_QUEUE_SIZE, DEFAULT_JOB_RESULT_TTL_SEC,
+    DEFAULT_AVAILABLE_MODELS, DEFAULT_MODEL_MEMORY_BUDGET_MB, DEFAULT_MODEL_OFFLOAD_BUDGET_MB,
+    DEFAULT_PIPELINE_QUEUE_SIZE,
+    DEFAULT_REPETITION_NGRAM_SIZE, DEFAULT_REPETITION_MAX_REPEATS,
+    DEFAULT_NO_SPEECH_THRESHOLD, DEFAULT_LOGPROB_THRESHOLD, DEFAULT_NO_SPEECH_MIN_TOKENS
+)
 
 class Settings:
     """Application settings class."""
@@ -13,6 +27,52 @@ class Settings:
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
         self.disable_gradients: bool = os.getenv("DISABLE_GRADIENTS", "true").lower() == "true"
         
+        # Model configuration - use constants for defaults
+        self.model_name: str = os.getenv("MODEL_NAME", MODEL_NAME)
+        self.assistant_model_name: Optional[str] = os.getenv("ASSISTANT_MODEL_NAME") or None
+        self.inference_backend: str = os.getenv("INFERENCE_BACKEND", DEFAULT_INFERENCE_BACKEND).lower()
+        self.static_cache: bool = os.getenv("STATIC_CACHE", "false").lower() == "true"
+        self.compile_batch_buckets: List[int] = sorted(
+            int(bucket) for bucket in os.getenv("COMPILE_BATCH_BUCKETS", DEFAULT_COMPILE_BATCH_BUCKETS).split(",") if bucket.strip()
+        )
+        
+        # Early stopping configuration - use constants for defaults
+        self.repetition_ngram_size: int = int(os.getenv("REPETITION_NGRAM_SIZE", str(DEFAULT_REPETITION_NGRAM_SIZE)))
+        self.repetition_max_repeats: int = int(os.getenv("REPETITION_MAX_REPEATS", str(DEFAULT_REPETITION_MAX_REPEATS)))
+        self.no_speech_threshold: float = float(os.getenv("NO_SPEECH_THRESHOLD", str(DEFAULT_NO_SPEECH_THRESHOLD)))
+        self.logprob_threshold: float = float(os.getenv("LOGPROB_THRESHOLD", str(DEFAULT_LOGPROB_THRESHOLD)))
+        self.no_speech_min_tokens: int = int(os.getenv("NO_SPEECH_MIN_TOKENS", str(DEFAULT_NO_SPEECH_MIN_TOKENS)))
+        
+        # Model registry configuration - the default model is always available
+        self.available_models: List[str] = list(dict.fromkeys([self.model_name] + [
+            name.strip() for name in os.getenv("AVAILABLE_MODELS", DEFAULT_AVAILABLE_MODELS).split(",") if name.strip()
+        ]))
+        self.model_memory_budget_mb: float = float(os.getenv("MODEL_MEMORY_BUDGET_MB", str(DEFAULT_MODEL_MEMORY_BUDGET_MB)))
+        self.model_offload_budget_mb: float = float(os.getenv("MODEL_OFFLOAD_BUDGET_MB", str(DEFAULT_MODEL_OFFLOAD_BUDGET_MB)))
+        
+        # Audio preprocessing configuration - use constants for defaults
+        self.resample_method: str = os.getenv("RESAMPLE_METHOD", DEFAULT_RESAMPLE_METHOD).lower()
+        self.feature_extractor: str = os.getenv("FEATURE_EXTRACTOR", DEFAULT_FEATURE_EXTRACTOR).lower()
+        self.vad_enabled: bool = os.getenv("VAD_ENABLED", "false").lower() == "true"
+        
+        # Streaming configuration - use constants for defaults
+        self.stream_step_sec: float = float(os.getenv("STREAM_STEP_SEC", str(DEFAULT_STREAM_STEP_SEC)))
+        
+        # Job configuration - use constants for defaults
+        self.job_workers: int = int(os.getenv("JOB_WORKERS", str(DEFAULT_JOB_WORKERS)))
+        self.job_queue_size: int = int(os.getenv("JOB_QUEUE_SIZE", str(DEFAULT_JOB_QUEUE_SIZE)))
+        self.job_result_ttl_sec: int = int(os.getenv("JOB_RESULT_TTL_SEC", str(DEFAULT_JOB_RESULT_TTL_SEC)))
+        self.job_store_dir: Optional[str] = os.getenv("JOB_STORE_DIR") or None
+        
+        # Batching configuration - use constants for defaults
+        self.batch_size: int = int(os.getenv("BATCH_SIZE", str(DEFAULT_BATCH_SIZE)))
+        self.dynamic_batching: bool = os.getenv("DYNAMIC_BATCHING", "true").lower() == "true"
+        self.batch_max_wait_ms: float = float(os.getenv("BATCH_MAX_WAIT_MS", str(DEFAULT_BATCH_MAX_WAIT_MS)))
+        
+        # Pipeline configuration - use constants for defaults
+        self.pipeline_enabled: bool = os.getenv("PIPELINE_ENABLED", "true").lower() == "true"
+        self.pipeline_queue_size: int = int(os.getenv("PIPELINE_QUEUE_SIZE", str(DEFAULT_PIPELINE_QUEUE_SIZE)))
+        
     def _check_cuda(self) -> bool:
         """Check if CUDA is available."""
         try:
@@ -23,8 +83,32 @@ class Settings:
     
     def validate(self) -> None:
         """Validate required settings."""
-        # Add any validation logic here if needed
-        pass
+        if self.inference_backend not in INFERENCE_BACKENDS:
+            raise RuntimeError(f"INFERENCE_BACKEND must be one of: {', '.join(INFERENCE_BACKENDS)}")
+        if self.static_cache and (not self.compile_batch_buckets or self.compile_batch_buckets[0] < 1):
+            raise RuntimeError("COMPILE_BATCH_BUCKETS must list positive batch sizes")
+        if self.repetition_ngram_size < 1 or self.repetition_max_repeats < 0:
+            raise RuntimeError("REPETITION_NGRAM_SIZE must be positive and REPETITION_MAX_REPEATS must not be negative")
+        if not 0.0 <= self.no_speech_threshold <= 1.0:
+            raise RuntimeError("NO_SPEECH_THRESHOLD must be between 0 and 1")
+        if self.no_speech_min_tokens < 1:
+            raise RuntimeError("NO_SPEECH_MIN_TOKENS must be a positive integer")
+        if self.model_memory_budget_mb < 0 or self.model_offload_budget_mb < 0:
+            raise RuntimeError("MODEL_MEMORY_BUDGET_MB and MODEL_OFFLOAD_BUDGET_MB must not be negative")
+        if self.resample_method not in RESAMPLE_METHODS:
+            raise RuntimeError(f"RESAMPLE_METHOD must be one of: {', '.join(RESAMPLE_METHODS)}")
+        if self.feature_extractor not in FEATURE_EXTRACTORS:
+            raise RuntimeError(f"FEATURE_EXTRACTOR must be one of: {', '.join(FEATURE_EXTRACTORS)}")
+        if self.stream_step_sec <= 0:
+            raise RuntimeError("STREAM_STEP_SEC must be positive")
+        if self.job_workers < 1 or self.job_queue_size < 1:
+            raise RuntimeError("JOB_WORKERS and JOB_QUEUE_SIZE must be positive integers")
+        if self.batch_size < 1:
+            raise RuntimeError("BATCH_SIZE must be a positive integer")
+        if self.batch_max_wait_ms < 0:
+            raise RuntimeError("BATCH_MAX_WAIT_MS must not be negative")
+        if self.pipeline_queue_size < 1:
+            raise RuntimeError("PIPELINE_QUEUE_SIZE must be a positive integer")
 
 # Global settings instance
 settings = Settings()
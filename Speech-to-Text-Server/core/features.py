@@ -0,0 +1,80 @@
+"""
+Batched log-mel feature extraction for Whisper using torch.
+"""
+import logging
+import threading
+import numpy as np
+import torch
+from typing import Dict, List, Tuple
+from transformers import WhisperFeatureExtractor
+
+logger = logging.getLogger(__name__)
+
+class LogMelFeatureExtractor:
+    """
+    Computes Whisper log-mel spectrograms with torch on the model device.
+    
+    Produces the same features as ``WhisperFeatureExtractor`` for a whole
+    batch of chunks in one call, without the per-chunk NumPy STFT and the
+    host-to-device copy of the resulting features. The Hann window and mel
+    filterbank are cached per device and extractor configuration, so
+    models with different mel counts or FFT sizes get their own.
+    """
+    
+    def __init__(self):
+        self._cache: Dict[Tuple[str, int, int, int], Tuple[torch.Tensor, torch.Tensor]] = {}
+        self._lock = threading.Lock()
+    
+    def _get_window_and_filters(self, feature_extractor: WhisperFeatureExtractor, device: str) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Get the cached STFT window and mel filterbank for a device and extractor configuration."""
+        key = (device, feature_extractor.n_fft, feature_extractor.feature_size, feature_extractor.sampling_rate)
+        with self._lock:
+            if key not in self._cache:
+                window = torch.hann_window(feature_extractor.n_fft, device=device)
+                mel_filters = torch.from_numpy(np.asarray(feature_extractor.mel_filters)).to(device, torch.float32)
+                self._cache[key] = (window, mel_filters)
+                logger.info(
+                    f"Cached STFT window and {feature_extractor.feature_size}-bin mel filterbank "
+                    f"(n_fft {feature_extractor.n_fft}) on {device}"
+                )
+            return self._cache[key]
+    
+    def extract(self, audio_chunks: List[np.ndarray], feature_extractor: WhisperFeatureExtractor, device: str) -> torch.Tensor:
+        """
+        Compute log-mel features for a batch of audio chunks.
+        
+        Args:
+            audio_chunks: Mono audio chunks at the feature extractor sample rate
+            feature_extractor: Whisper feature extractor providing the parameters
+            device: Device to compute the features on
+            
+        Returns:
+            Features of shape (batch, n_mels, frames) on ``device``
+        """
+        window, mel_filters = self._get_window_and_filters(feature_extractor, device)
+        n_samples = feature_extractor.n_samples
+        
+        # Pad or truncate every chunk to Whisper's fixed 30 s input
+        waveform = torch.zeros((len(audio_chunks), n_samples), dtype=torch.float32)
+        for idx, chunk in enumerate(audio_chunks):
+            length = min(len(chunk), n_samples)
+            waveform[idx, :length] = torch.from_numpy(np.asarray(chunk[:length], dtype=np.float32))
+        waveform = waveform.to(device)
+        
+        stft = torch.stft(
+            waveform,
+            feature_extractor.n_fft,
+            feature_extractor.hop_length,
+            window=window,
+            return_complex=True
+        )
+        magnitudes = stft[..., :-1].abs() ** 2
+        
+        mel_spec = mel_filters.T @ magnitudes
+        log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+        max_val = log_spec.amax(dim=(1, 2), keepdim=True)
+        log_spec = torch.maximum(log_spec, max_val - 8.0)
+        return (log_spec + 4.0) / 4.0
+
+# Global feature extractor instance
+feature_extractor = LogMelFeatureExtractor()
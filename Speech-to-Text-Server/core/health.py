@@ -5,7 +5,7 @@ import logging
 import torch
 from typing import Dict, Any
 
-from config.constants import APP_NAME, MODEL_NAME, SUPPORTED_AUDIO_FORMATS
+from config.constants import APP_NAME, SUPPORTED_AUDIO_FORMATS
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -19,8 +19,10 @@ class HealthChecker:
             health_info = {
                 "status": "healthy",
                 "service": APP_NAME,
-                "model_name": MODEL_NAME,
+                "model_name": settings.model_name,
+                "assistant_model_name": settings.assistant_model_name,
                 "device": settings.device,
+                "inference_backend": settings.inference_backend,
                 "cuda_available": settings.cuda_available,
                 "supported_formats": SUPPORTED_AUDIO_FORMATS,
                 "torch_version": torch.__version__
@@ -37,6 +39,13 @@ class HealthChecker:
             except Exception:
                 health_info["model_initialized"] = False
             
+            # Add on-demand models and where they reside
+            try:
+                from core.registry import model_registry
+                health_info["loaded_models"] = model_registry.get_loaded_models()
+            except Exception:
+                health_info["loaded_models"] = {}
+            
             logger.info("Health check completed successfully")
             return health_info
             
@@ -0,0 +1,328 @@
+"""
+Background transcription jobs for long audio files.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from fastapi import HTTPException, UploadFile
+
+from core.registry import model_registry
+from core.transcriber import transcriber
+from core.validation import validator
+from config.constants import JOB_PRIORITY, JOB_CLEANUP_INTERVAL_SEC
+from config.settings import settings
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+class JobManager:
+    """
+    In-process queue and worker pool for asynchronous transcription jobs.
+
+    Uploads are validated and spooled to disk on submission, then a bounded
+    pool of ``settings.job_workers`` workers transcribes them in the
+    background at job priority, so their windows only fill batches that
+    interactive requests leave free. Per-segment progress is recorded as it
+    completes and finished jobs are kept for ``settings.job_result_ttl_sec``.
+    When ``settings.job_store_dir`` is set, job records and audio are kept
+    there so unfinished jobs are resumed after a restart. Resumed jobs go
+    to an unbounded backlog that workers drain before the queue, so any
+    number of them can be restored.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._backlog: Deque[str] = deque()
+        self._workers: List[asyncio.Task] = []
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._spool_dir: Optional[str] = None
+        self._submitted = metrics.counter("stt_jobs_submitted_total")
+        self._completed = metrics.counter("stt_jobs_completed_total")
+        self._failed = metrics.counter("stt_jobs_failed_total")
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker pool is accepting jobs."""
+        return self._queue is not None
+
+    async def start(self) -> None:
+        """Start the worker pool and resume jobs left in the persistent store."""
+        if self.is_running:
+            return
+
+        if settings.job_store_dir:
+            self._spool_dir = settings.job_store_dir
+            os.makedirs(self._spool_dir, exist_ok=True)
+        else:
+            self._spool_dir = tempfile.mkdtemp(prefix="stt-jobs-")
+
+        if settings.job_store_dir:
+            self._restore()
+
+        self._queue = asyncio.Queue(maxsize=settings.job_queue_size)
+        self._workers = [
+            asyncio.create_task(self._run()) for _ in range(settings.job_workers)
+        ]
+        self._cleanup_task = asyncio.create_task(self._cleanup())
+
+        logger.info(f"Job manager started with {settings.job_workers} worker(s)")
+
+    async def stop(self) -> None:
+        """Stop the worker pool; unfinished jobs stay in the persistent store."""
+        if not self.is_running:
+            return
+
+        for task in [*self._workers, self._cleanup_task]:
+            task.cancel()
+        await asyncio.gather(*self._workers, self._cleanup_task, return_exceptions=True)
+
+        self._workers = []
+        self._cleanup_task = None
+        self._queue = None
+        self._backlog.clear()
+        self.jobs.clear()
+
+        if not settings.job_store_dir:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+        self._spool_dir = None
+
+        logger.info("Job manager stopped")
+
+    async def submit(self, file: UploadFile, model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Validate an upload, spool it to disk and queue it for transcription.
+
+        Args:
+            file: Uploaded audio file
+            model: Whisper model to use, or None for the default model
+
+        Returns:
+            Dict[str, Any]: The new job record
+
+        Raises:
+            HTTPException: If the file is invalid or the job queue is full
+        """
+        if not self.is_running:
+            raise HTTPException(status_code=503, detail="Job queue is not running")
+        if self._queue.full():
+            raise HTTPException(status_code=503, detail="Job queue is full, retry later")
+
+        # Validate model, file name, format, size and duration before accepting the job
+        model_registry.validate_model_name(model)
+        await validator.validate_audio_file(file)
+        await validator.validate_audio_header(file)
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": JOB_QUEUED,
+            "filename": file.filename,
+            "model": model or settings.model_name,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "progress": {"completed_chunks": 0, "total_chunks": None},
+            "segments": [],
+            "transcription": None,
+            "error": None
+        }
+
+        await asyncio.to_thread(self._spool_upload, file, self._audio_path(job_id))
+
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            os.remove(self._audio_path(job_id))
+            raise HTTPException(status_code=503, detail="Job queue is full, retry later")
+
+        self.jobs[job_id] = job
+        self._persist(job)
+        self._submitted.inc()
+
+        logger.info(f"Queued transcription job {job_id} for {file.filename}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job by ID.
+
+        Args:
+            job_id: Job identifier returned on submission
+
+        Returns:
+            Optional[Dict[str, Any]]: The job record, or None if unknown or expired
+        """
+        return self.jobs.get(job_id)
+
+    async def _run(self) -> None:
+        """Worker loop transcribing resumed, then queued jobs one at a time."""
+        while True:
+            if self._backlog:
+                job_id = self._backlog.popleft()
+                from_queue = False
+            else:
+                job_id = await self._queue.get()
+                from_queue = True
+
+            job = self.jobs.get(job_id)
+            if job is not None:
+                await self._process(job)
+            if from_queue:
+                self._queue.task_done()
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        """Transcribe one job's audio and record its progress and result."""
+        job["status"] = JOB_RUNNING
+        job["started_at"] = time.time()
+        self._persist(job)
+
+        segments: Dict[int, Dict[str, Any]] = {}
+
+        def on_segment(idx: int, total: int, segment: Dict[str, Any]) -> None:
+            segments[idx] = segment
+            job["progress"] = {"completed_chunks": len(segments), "total_chunks": total}
+            job["segments"] = [segments[key] for key in sorted(segments)]
+
+        try:
+            with open(self._audio_path(job["job_id"]), "rb") as audio_file:
+                result = await transcriber.transcribe_file(
+                    audio_file, on_segment, JOB_PRIORITY, model=job.get("model")
+                )
+
+            job["transcription"] = result["transcription"]
+            job["segments"] = result["segments"]
+            job["progress"]["total_chunks"] = len(result["segments"])
+            job["status"] = JOB_COMPLETED
+            self._completed.inc()
+            logger.info(f"Transcription job {job['job_id']} completed")
+
+        except asyncio.CancelledError:
+            # Shutting down; leave the job to be resumed from the store
+            job["status"] = JOB_QUEUED
+            self._persist(job)
+            raise
+        except HTTPException as e:
+            job["status"] = JOB_FAILED
+            job["error"] = e.detail
+            self._failed.inc()
+            logger.error(f"Transcription job {job['job_id']} rejected: {e.detail}")
+        except Exception as e:
+            job["status"] = JOB_FAILED
+            job["error"] = f"Transcription failed: {str(e)}"
+            self._failed.inc()
+            logger.error(f"Transcription job {job['job_id']} failed: {e}")
+
+        job["finished_at"] = time.time()
+        self._remove_file(self._audio_path(job["job_id"]))
+        self._persist(job)
+
+    async def _cleanup(self) -> None:
+        """Periodically drop finished jobs older than the result TTL."""
+        while True:
+            await asyncio.sleep(JOB_CLEANUP_INTERVAL_SEC)
+
+            cutoff = time.time() - settings.job_result_ttl_sec
+            expired = [
+                job_id for job_id, job in self.jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self.jobs[job_id]
+                self._remove_file(self._record_path(job_id))
+
+            if expired:
+                logger.info(f"Expired {len(expired)} finished transcription job(s)")
+
+    def _restore(self) -> None:
+        """Reload job records from the store and add unfinished jobs to the backlog."""
+        cutoff = time.time() - settings.job_result_ttl_sec
+
+        for name in sorted(os.listdir(self._spool_dir)):
+            if not name.endswith(".json"):
+                continue
+
+            try:
+                with open(os.path.join(self._spool_dir, name)) as record_file:
+                    job = json.load(record_file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable job record {name}: {e}")
+                continue
+
+            job_id = job["job_id"]
+            if job["finished_at"] is not None:
+                if job["finished_at"] < cutoff:
+                    self._remove_file(self._record_path(job_id))
+                else:
+                    self.jobs[job_id] = job
+                continue
+
+            if not os.path.exists(self._audio_path(job_id)):
+                job["status"] = JOB_FAILED
+                job["error"] = "Job audio was lost before transcription"
+                job["finished_at"] = time.time()
+                self.jobs[job_id] = job
+                self._persist(job)
+                continue
+
+            # Restart interrupted jobs from the beginning
+            job.update({
+                "status": JOB_QUEUED,
+                "started_at": None,
+                "progress": {"completed_chunks": 0, "total_chunks": None},
+                "segments": []
+            })
+            self.jobs[job_id] = job
+            self._backlog.append(job_id)
+            logger.info(f"Resumed transcription job {job_id}")
+
+    def _persist(self, job: Dict[str, Any]) -> None:
+        """Write a job record to the persistent store, if configured."""
+        if not settings.job_store_dir:
+            return
+
+        path = self._record_path(job["job_id"])
+        try:
+            with open(f"{path}.tmp", "w") as record_file:
+                json.dump(job, record_file)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"Failed to persist job {job['job_id']}: {e}")
+
+    @staticmethod
+    def _spool_upload(file: UploadFile, path: str) -> None:
+        """Copy an uploaded file to the spool directory."""
+        file.file.seek(0)
+        with open(path, "wb") as audio_file:
+            shutil.copyfileobj(file.file, audio_file)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        """Remove a file if it exists."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _audio_path(self, job_id: str) -> str:
+        """Spooled audio path for a job."""
+        return os.path.join(self._spool_dir, f"{job_id}.audio")
+
+    def _record_path(self, job_id: str) -> str:
+        """Persistent record path for a job."""
+        return os.path.join(self._spool_dir, f"{job_id}.json")
+
+# Global job manager instance
+job_manager = JobManager()
@@ -1,22 +1,38 @@
 """
 Model initialization and management for Whisper Speech-to-Text.
 """
+import asyncio
 import logging
 import torch
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from transformers import WhisperForConditionalGeneration, WhisperProcessor
 
-from config.constants import MODEL_NAME
+from config.constants import LANGUAGE, TASK, MAX_NEW_TOKENS
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 class ModelManager:
-    """Manages the Whisper model lifecycle."""
+    """
+    Manages the Whisper model lifecycle.
     
-    def __init__(self):
+    The default instance serves ``settings.model_name`` with the configured
+    assistant model and static cache. Instances created for another model
+    name are loaded on demand by the model registry and use neither.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None):
         self.model: Optional[WhisperForConditionalGeneration] = None
         self.processor: Optional[WhisperProcessor] = None
+        self.assistant_model: Optional[WhisperForConditionalGeneration] = None
+        self.model_name: str = model_name or settings.model_name
+        self.assistant_model_name: Optional[str] = None if model_name else settings.assistant_model_name
+        self.static_cache: bool = settings.static_cache and not model_name
+        self.backend: str = settings.inference_backend
+        self.device: str = settings.device
+        self.dtype: torch.dtype = torch.float32
+        self.batch_buckets: List[int] = []
+        self._prompt_ids: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
         self._is_initialized = False
     
     async def initialize(self) -> None:
@@ -39,43 +55,217 @@ class ModelManager:
         # Initialize model and processor
         await self._initialize_model()
         
+        # Compile the static-cache generate path for each batch bucket
+        if self.static_cache:
+            await self._compile_static_generate()
+        
         self._is_initialized = True
         logger.info("Model initialization completed successfully")
     
     async def _initialize_model(self) -> None:
-        """Initialize the Whisper model and processor."""
+        """Initialize the Whisper model and processor without blocking the event loop."""
+        await asyncio.to_thread(self._load_model)
+    
+    def _load_model(self) -> None:
+        """Load the Whisper model, processor and optional assistant model."""
         try:
-            logger.info(f"Loading Whisper model: {MODEL_NAME}")
+            logger.info(f"Loading Whisper model: {self.model_name} with {self.backend} backend")
             
             # Load processor
-            self.processor = WhisperProcessor.from_pretrained(MODEL_NAME)
+            self.processor = WhisperProcessor.from_pretrained(self.model_name)
             logger.info("Whisper processor loaded successfully")
             
             # Load model
-            self.model = WhisperForConditionalGeneration.from_pretrained(MODEL_NAME).to(settings.device)
-            logger.info("Whisper model loaded successfully")
+            if self.backend == "int8":
+                self.model = self._load_int8_model()
+            elif self.backend == "bf16":
+                self.model = self._load_bf16_model()
+            elif self.backend == "onnx":
+                self.model = self._load_onnx_model()
+            else:
+                self.device, self.dtype = settings.device, torch.float32
+                self.model = WhisperForConditionalGeneration.from_pretrained(self.model_name).to(self.device)
+            logger.info(f"Whisper model loaded successfully on {self.device} ({self.dtype})")
+            
+            # Load draft model for assisted generation
+            if self.assistant_model_name:
+                self.assistant_model = self._load_assistant_model()
             
         except Exception as e:
             logger.error(f"Failed to initialize model: {e}")
             raise
     
+    def _load_int8_model(self) -> WhisperForConditionalGeneration:
+        """Load the model with dynamically quantized int8 linear layers (CPU only)."""
+        self.device, self.dtype = "cpu", torch.float32
+        model = WhisperForConditionalGeneration.from_pretrained(self.model_name).eval()
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    
+    def _load_bf16_model(self) -> WhisperForConditionalGeneration:
+        """Load the model in bfloat16, falling back to float32 if the device lacks support."""
+        self.device = settings.device
+        
+        if self.device == "cuda":
+            supported = torch.cuda.is_bf16_supported()
+        else:
+            supported = torch.backends.mkldnn.is_available() and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+        
+        if not supported:
+            logger.warning(f"bfloat16 is not supported on this {self.device}; using float32")
+            self.dtype = torch.float32
+        else:
+            self.dtype = torch.bfloat16
+        
+        return WhisperForConditionalGeneration.from_pretrained(self.model_name, torch_dtype=self.dtype).to(self.device)
+    
+    def _load_onnx_model(self):
+        """Export the encoder and decoder to ONNX and load them with ONNX Runtime."""
+        try:
+            from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        except ImportError:
+            raise RuntimeError("The onnx backend requires the 'onnx' extra (optimum[onnxruntime])")
+        
+        provider = "CUDAExecutionProvider" if settings.device == "cuda" else "CPUExecutionProvider"
+        self.device, self.dtype = settings.device, torch.float32
+        return ORTModelForSpeechSeq2Seq.from_pretrained(self.model_name, export=True, provider=provider)
+    
+    async def _compile_static_generate(self) -> None:
+        """
+        Switch generation to a preallocated static KV cache and a compiled forward.
+        
+        Compilation is specialized per batch size, so a warm-up generate runs
+        once per bucket in COMPILE_BATCH_BUCKETS; requests are later padded
+        up to the nearest bucket.
+        """
+        if self.backend not in ("eager", "bf16") or self.assistant_model is not None:
+            logger.warning(f"Static cache mode is not supported with the {self.backend} backend or an assistant model")
+            return
+        
+        self.model.generation_config.cache_implementation = "static"
+        compile_mode = "reduce-overhead" if self.device == "cuda" else "default"
+        self.model.forward = torch.compile(self.model.forward, mode=compile_mode, fullgraph=True)
+        
+        forced_decoder_ids = self.get_decoder_prompt_ids(LANGUAGE, TASK)
+        feature_size = self.processor.feature_extractor.feature_size
+        frames = self.processor.feature_extractor.nb_max_frames
+        
+        for bucket in settings.compile_batch_buckets:
+            logger.info(f"Warming up compiled generate for batch size {bucket}")
+            input_features = torch.zeros((bucket, feature_size, frames), device=self.device, dtype=self.dtype)
+            await asyncio.to_thread(
+                self.model.generate,
+                input_features,
+                max_new_tokens=MAX_NEW_TOKENS,
+                forced_decoder_ids=forced_decoder_ids,
+            )
+        
+        self.batch_buckets = list(settings.compile_batch_buckets)
+        logger.info(f"Static cache generate compiled for batch sizes {self.batch_buckets}")
+    
+    def _load_assistant_model(self) -> WhisperForConditionalGeneration:
+        """Load the small draft model used for assisted generation."""
+        if self.backend not in ("eager", "bf16"):
+            raise RuntimeError(f"Assisted generation is not supported with the {self.backend} backend")
+        
+        logger.info(f"Loading assistant model: {self.assistant_model_name}")
+        assistant_model = WhisperForConditionalGeneration.from_pretrained(
+            self.assistant_model_name, torch_dtype=self.dtype
+        ).to(self.device)
+        
+        # Draft and target must share the feature size and vocabulary
+        if assistant_model.config.num_mel_bins != self.model.config.num_mel_bins:
+            raise RuntimeError("Assistant model must use the same number of mel bins as the main model")
+        if assistant_model.config.vocab_size != self.model.config.vocab_size:
+            raise RuntimeError("Assistant model must use the same vocabulary as the main model")
+        
+        logger.info("Assistant model loaded successfully")
+        return assistant_model
+    
+    def get_memory_bytes(self) -> int:
+        """Get the size of the model's parameters and buffers, or 0 if it is not a torch module."""
+        if not isinstance(self.model, torch.nn.Module):
+            return 0
+        
+        total, seen = 0, set()
+        for value in self.model.state_dict().values():
+            # Quantized linear layers store their weight and bias as a tuple
+            for tensor in value if isinstance(value, tuple) else (value,):
+                if isinstance(tensor, torch.Tensor) and tensor.data_ptr() not in seen:
+                    seen.add(tensor.data_ptr())
+                    total += tensor.numel() * tensor.element_size()
+        return total
+    
+    def can_offload(self) -> bool:
+        """Whether the model can be parked in CPU memory instead of being released."""
+        return isinstance(self.model, torch.nn.Module) and self.device != "cpu"
+    
+    def offload(self) -> None:
+        """Move the model to CPU memory to free device memory."""
+        if self.can_offload():
+            self.model.cpu()
+            logger.info(f"Offloaded {self.model_name} to CPU")
+    
+    def restore(self) -> None:
+        """Move an offloaded model back to its device."""
+        if self.can_offload():
+            self.model.to(self.device)
+            logger.info(f"Restored {self.model_name} to {self.device}")
+    
     def get_model_and_processor(self) -> Tuple[WhisperForConditionalGeneration, WhisperProcessor]:
         """Get the initialized model and processor instances."""
         if not self._is_initialized or self.model is None or self.processor is None:
             raise RuntimeError("Model not initialized. Call initialize() first.")
         return self.model, self.processor
     
+    def get_decoder_prompt_ids(self, language: str, task: str) -> List[Tuple[int, int]]:
+        """
+        Get the forced decoder prompt IDs for a language and task.
+        
+        Prompt IDs are computed once per (language, task) pair and reused
+        for every chunk until the processor is released.
+        
+        Args:
+            language: Whisper language name or code
+            task: Whisper task, "transcribe" or "translate"
+            
+        Returns:
+            List of (position, token ID) pairs
+        """
+        key = (language, task)
+        if key not in self._prompt_ids:
+            if self.processor is None:
+                raise RuntimeError("Model not initialized. Call initialize() first.")
+            self._prompt_ids[key] = self.processor.get_decoder_prompt_ids(language=language, task=task)
+        return self._prompt_ids[key]
+    
+    def get_assistant_model(self) -> Optional[WhisperForConditionalGeneration]:
+        """Get the assistant model for assisted generation, if one is loaded."""
+        return self.assistant_model
+    
+    def get_batch_buckets(self) -> List[int]:
+        """Get the compiled batch sizes, or an empty list if static cache mode is off."""
+        return self.batch_buckets
+    
     def get_device(self) -> str:
         """Get the device being used."""
-        return settings.device
+        return self.device
+    
+    def get_dtype(self) -> torch.dtype:
+        """Get the floating point dtype expected for input features."""
+        return self.dtype
     
     async def cleanup(self) -> None:
         """Cleanup model resources."""
         if self.model:
             # Move model to CPU to free GPU memory
-            self.model.cpu()
+            if isinstance(self.model, torch.nn.Module):
+                self.model.cpu()
             del self.model
             self.model = None
+        if self.assistant_model:
+            self.assistant_model.cpu()
+            del self.assistant_model
+            self.assistant_model = None
         if self.processor:
             del self.processor
             self.processor = None
@@ -84,6 +274,9 @@ class ModelManager:
         if settings.cuda_available:
             torch.cuda.empty_cache()
         
+        self.batch_buckets = []
+        self._prompt_ids.clear()
+        self._is_initialized = False
         logger.info("Model cleanup completed")
 
 # Global model manager instance
@@ -0,0 +1,146 @@
+"""
+Staged processing pipeline with bounded queues between stages.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from config.constants import PIPELINE_OCCUPANCY_BUCKETS
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream in a stage queue
+_END = object()
+
+class PipelineStage:
+    """
+    One processing stage of a pipeline.
+
+    Args:
+        name: Stage name used in logs and metric names
+        process: Coroutine mapping a batch of items to one output per item
+        max_batch_size: Maximum number of queued items processed together
+        fill_batch: Whether to wait for ``max_batch_size`` items, or the end
+            of the stream, instead of taking whatever is queued
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 1,
+        fill_batch: bool = False
+    ):
+        self.name = name
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.fill_batch = fill_batch
+
+class Pipeline:
+    """
+    Runs items from a blocking source through consecutive stages concurrently.
+
+    The source iterator is advanced in a worker thread, and every stage has
+    its own worker that takes whatever items are queued, up to its
+    ``max_batch_size``, as soon as it is free, or waits for a full batch if
+    the stage fills batches. Queues between stages hold at
+    most ``queue_size`` items, so a fast stage cannot run far ahead of a
+    slow one. While the model works on one batch, the next items are being
+    decoded and featurized. The busy share of each stage's wall time is
+    recorded in the ``stt_pipeline_occupancy`` histograms.
+    """
+
+    def __init__(self, source_name: str, stages: List[PipelineStage], queue_size: int):
+        self.source_name = source_name
+        self.stages = stages
+        self.queue_size = queue_size
+
+    async def run(
+        self,
+        source: Iterator[Any],
+        on_output: Optional[Callable[[int, Any], None]] = None
+    ) -> List[Any]:
+        """
+        Process every item of the source through all stages.
+
+        Args:
+            source: Blocking iterator producing the input items
+            on_output: Optional callback receiving each item index and final output
+
+        Returns:
+            Final outputs in source order
+
+        Raises:
+            Exception: The first error raised by the source or a stage
+        """
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        outputs: List[Any] = []
+        busy: Dict[str, float] = {self.source_name: 0.0, **{stage.name: 0.0 for stage in self.stages}}
+
+        async def produce() -> None:
+            while True:
+                start = time.perf_counter()
+                item = await asyncio.to_thread(next, source, _END)
+                busy[self.source_name] += time.perf_counter() - start
+                await queues[0].put(item)
+                if item is _END:
+                    return
+
+        async def work(index: int, stage: PipelineStage) -> None:
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            finished = False
+
+            while not finished:
+                batch = [await inbox.get()]
+                while len(batch) < stage.max_batch_size and batch[-1] is not _END:
+                    if not inbox.empty():
+                        batch.append(inbox.get_nowait())
+                    elif stage.fill_batch:
+                        batch.append(await inbox.get())
+                    else:
+                        break
+                if batch[-1] is _END:
+                    batch.pop()
+                    finished = True
+
+                if batch:
+                    start = time.perf_counter()
+                    results = await stage.process(batch)
+                    busy[stage.name] += time.perf_counter() - start
+
+                    for result in results:
+                        if outbox is not None:
+                            await outbox.put(result)
+                        else:
+                            if on_output:
+                                on_output(len(outputs), result)
+                            outputs.append(result)
+
+            if outbox is not None:
+                await outbox.put(_END)
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(produce())] + [
+            asyncio.create_task(work(index, stage)) for index, stage in enumerate(self.stages)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        elapsed = time.perf_counter() - started
+        if elapsed > 0:
+            for name, seconds in busy.items():
+                metrics.histogram(f'stt_pipeline_occupancy{{stage="{name}"}}', PIPELINE_OCCUPANCY_BUCKETS).observe(seconds / elapsed)
+            logger.info(
+                "Pipeline stage occupancy: " +
+                ", ".join(f"{name} {seconds / elapsed:.0%}" for name, seconds in busy.items())
+            )
+
+        return outputs
@@ -1,15 +1,354 @@
 """
 Audio preprocessing utilities for speech-to-text processing.
 """
+import io
 import logging
+import math
+import struct
+import tempfile
 import numpy as np
-from scipy.signal import resample
-from typing import List, Tuple
+import soundfile as sf
+from contextlib import contextmanager
+from functools import lru_cache
+from scipy.signal import firwin, resample, upfirdn
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
 
-from config.constants import TARGET_SAMPLE_RATE, CHUNK_DURATION_SEC
+from config.constants import (
+    TARGET_SAMPLE_RATE, CHUNK_DURATION_SEC, 
+    DECODE_BLOCK_FRAMES, MAX_AUDIO_DURATION_SEC,
+    MAX_POLYPHASE_FACTOR, RESAMPLE_BLOCK_FRAMES
+)
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=32)
+def _design_polyphase_filter(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """
+    Design the anti-aliasing FIR filter for a rational resampling ratio.
+
+    The design matches ``scipy.signal.resample_poly`` with its default
+    Kaiser window, so results are interchangeable with it. Designs are
+    cached per ratio.
+
+    Args:
+        up: Upsampling factor
+        down: Downsampling factor
+
+    Returns:
+        Tuple of the zero-padded filter taps and the number of leading
+        output samples to drop to compensate for the filter delay
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+
+    # Pad in front so the filter delay is a whole number of output samples
+    n_pre_pad = down - half_len % down
+    n_pre_remove = (half_len + n_pre_pad) // down
+    taps = np.concatenate((np.zeros(n_pre_pad), taps)).astype(np.float32)
+    
+    logger.info(f"Designed polyphase filter for {up}/{down} with {len(taps)} taps")
+    return taps, n_pre_remove
+
+class PolyphaseResampler:
+    """
+    Block-wise rational polyphase resampler with cached filter designs.
+
+    Input blocks of any size can be fed with ``process``; each call returns
+    the output samples that are fully determined so far, and ``flush``
+    returns the tail. The concatenated output equals
+    ``scipy.signal.resample_poly`` applied to the whole signal.
+    """
+
+    def __init__(self, original_sr: int, target_sr: int = TARGET_SAMPLE_RATE):
+        ratio_gcd = math.gcd(original_sr, target_sr)
+        self.up = target_sr // ratio_gcd
+        self.down = original_sr // ratio_gcd
+        self.taps, self._to_skip = _design_polyphase_filter(self.up, self.down)
+
+        # Input history needed to compute an output, rounded up to a multiple
+        # of ``down`` so every processed segment starts on a filter phase boundary
+        history = -(-len(self.taps) // self.up)
+        self.history_len = -(-history // self.down) * self.down
+        self._history = np.zeros(self.history_len, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._consumed = 0
+        self._emitted = 0
+
+    @staticmethod
+    def is_supported(original_sr: int, target_sr: int = TARGET_SAMPLE_RATE) -> bool:
+        """Check whether the rate pair reduces to a small enough rational ratio."""
+        ratio_gcd = math.gcd(original_sr, target_sr)
+        return max(original_sr, target_sr) // ratio_gcd <= MAX_POLYPHASE_FACTOR
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resample the next block of a mono signal.
+
+        Args:
+            block: Next mono input samples
+
+        Returns:
+            Output samples that are complete after this block
+        """
+        pending = np.concatenate((self._pending, np.asarray(block, dtype=np.float32)))
+        usable = len(pending) // self.down * self.down
+        self._pending = pending[usable:]
+        if usable == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        output = self._filter(pending[:usable], usable * self.up // self.down)
+        self._consumed += usable
+        return self._emit(output)
+
+    def flush(self) -> np.ndarray:
+        """
+        Resample the remaining input and end the stream.
+
+        Returns:
+            Final output samples
+        """
+        remaining = len(self._pending)
+        total_in = self._consumed + remaining
+        total_out = -(-total_in * self.up // self.down)
+
+        output = self._filter(self._pending, None)
+        self._consumed = total_in
+        self._pending = np.zeros(0, dtype=np.float32)
+        output = self._emit(output)
+
+        # Trim or pad the tail to the exact output length
+        missing = total_out - self._emitted
+        if missing < 0:
+            output = output[:len(output) + missing]
+        elif missing > 0:
+            output = np.concatenate((output, np.zeros(missing, dtype=np.float32)))
+        self._emitted = total_out
+        return output
+
+    def _filter(self, segment: np.ndarray, count: Optional[int]) -> np.ndarray:
+        """Filter a segment together with its history and keep its own outputs."""
+        padded = np.concatenate((self._history, segment))
+        filtered = upfirdn(self.taps, padded, self.up, self.down)
+        start = self.history_len * self.up // self.down
+        end = None if count is None else start + count
+        self._history = padded[len(padded) - self.history_len:]
+        return filtered[start:end].astype(np.float32, copy=False)
+
+    def _emit(self, output: np.ndarray) -> np.ndarray:
+        """Drop the leading filter delay samples and count emitted output."""
+        if self._to_skip:
+            skipped = min(self._to_skip, len(output))
+            output = output[skipped:]
+            self._to_skip -= skipped
+        self._emitted += len(output)
+        return output
+
+class WavLayout(NamedTuple):
+    """Sample layout of the data chunk of an uncompressed WAV file."""
+    sample_rate: int
+    channels: int
+    dtype: np.dtype
+    scale: float
+    data_offset: int
+    frames: int
+
+def parse_wav_header(file_obj: BinaryIO) -> Optional[WavLayout]:
+    """
+    Locate the sample data of an uncompressed WAV file.
+
+    Walks the RIFF chunks up to the ``data`` chunk. Only 16-bit and 32-bit
+    integer PCM and 32-bit float samples are described; other encodings
+    and non-RIFF files return None so they are decoded with soundfile.
+
+    Args:
+        file_obj: Seekable binary file object; its position is not restored
+
+    Returns:
+        Optional[WavLayout]: Layout of the samples, or None if not supported
+    """
+    file_obj.seek(0)
+    header = file_obj.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+
+    fmt = None
+    while True:
+        chunk_header = file_obj.read(8)
+        if len(chunk_header) < 8:
+            return None
+        chunk_id, chunk_size = chunk_header[:4], struct.unpack("<I", chunk_header[4:])[0]
+
+        if chunk_id == b"fmt ":
+            fmt = file_obj.read(chunk_size)
+            if chunk_size % 2:
+                file_obj.read(1)
+        elif chunk_id == b"data":
+            break
+        else:
+            # Chunks are padded to an even number of bytes
+            file_obj.seek(chunk_size + chunk_size % 2, io.SEEK_CUR)
+
+    if fmt is None or len(fmt) < 16:
+        return None
+
+    format_tag, channels, sample_rate = struct.unpack("<HHI", fmt[:8])
+    bits_per_sample = struct.unpack("<H", fmt[14:16])[0]
+    if format_tag == 0xFFFE and len(fmt) >= 26:
+        # WAVE_FORMAT_EXTENSIBLE keeps the actual format in its sub-format GUID
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+
+    if format_tag == 1 and bits_per_sample == 16:
+        dtype, scale = np.dtype("<i2"), 1.0 / 2**15
+    elif format_tag == 1 and bits_per_sample == 32:
+        dtype, scale = np.dtype("<i4"), 1.0 / 2**31
+    elif format_tag == 3 and bits_per_sample == 32:
+        dtype, scale = np.dtype("<f4"), 1.0
+    else:
+        return None
+
+    if channels < 1 or sample_rate < 1:
+        return None
+
+    data_offset = file_obj.tell()
+    file_size = file_obj.seek(0, io.SEEK_END)
+    # Streamed WAV writers may leave the data size unset
+    data_size = min(chunk_size, file_size - data_offset)
+    frames = data_size // (channels * dtype.itemsize)
+
+    return WavLayout(sample_rate, channels, dtype, scale, data_offset, frames)
+
+class AudioInfo(NamedTuple):
+    """Stream parameters read from an audio file header."""
+    samplerate: int
+    channels: int
+    frames: Optional[int]
+
+def _import_av():
+    """Import PyAV for formats soundfile cannot decode, such as AAC in m4a."""
+    try:
+        import av
+    except ImportError:
+        raise ValueError("Decoding this audio format requires the 'compressed' extra (av)")
+    return av
+
+def probe_audio(file_obj: BinaryIO) -> AudioInfo:
+    """
+    Read the sample rate, channel count and length of an audio file without decoding it.
+
+    Files soundfile cannot open are probed with PyAV, whose containers do
+    not always record a duration.
+
+    Args:
+        file_obj: Seekable binary file object; rewound before returning
+
+    Returns:
+        AudioInfo: Header values; ``frames`` is None if the length is unknown
+
+    Raises:
+        ValueError: If the file cannot be read as audio
+    """
+    try:
+        file_obj.seek(0)
+        try:
+            info = sf.info(file_obj)
+            return AudioInfo(info.samplerate, info.channels, info.frames)
+        except sf.LibsndfileError:
+            pass
+
+        av = _import_av()
+        file_obj.seek(0)
+        try:
+            with av.open(file_obj, mode="r") as container:
+                if not container.streams.audio:
+                    raise ValueError("File has no audio stream")
+                stream = container.streams.audio[0]
+                sample_rate = stream.codec_context.sample_rate
+                if stream.duration is not None and stream.time_base is not None:
+                    duration = float(stream.duration * stream.time_base)
+                elif container.duration is not None:
+                    duration = container.duration / av.time_base
+                else:
+                    duration = None
+                return AudioInfo(
+                    sample_rate,
+                    stream.codec_context.layout.nb_channels,
+                    round(duration * sample_rate) if duration is not None else None
+                )
+        except av.error.FFmpegError as e:
+            raise ValueError(f"Could not read audio file: {e}")
+    finally:
+        file_obj.seek(0)
+
+@contextmanager
+def _open_av_blocks(file_obj: BinaryIO, block_frames: int) -> Iterator[Tuple[int, float, Iterator[np.ndarray]]]:
+    """
+    Demux and decode a compressed audio stream in blocks with PyAV.
+
+    Codec frames (about a thousand samples each) are converted to packed
+    float32 at the stream's own rate and layout and gathered into blocks of
+    ``block_frames``, so downmixing and resampling happen per block
+    downstream exactly as for soundfile. Decoding stops as soon as the
+    consumer stops reading.
+
+    Args:
+        file_obj: Seekable binary file object
+        block_frames: Number of frames per block
+
+    Yields:
+        Tuple of the sample rate, a scale of 1.0 and an iterator over
+        (frames, channels) float32 blocks
+
+    Raises:
+        ValueError: If PyAV is missing or the stream cannot be decoded
+    """
+    av = _import_av()
+    file_obj.seek(0)
+    try:
+        container = av.open(file_obj, mode="r")
+    except av.error.FFmpegError as e:
+        raise ValueError(f"Could not decode audio file: {e}")
+
+    with container:
+        if not container.streams.audio:
+            raise ValueError("File has no audio stream")
+        stream = container.streams.audio[0]
+        sample_rate = stream.codec_context.sample_rate
+        layout = stream.codec_context.layout
+        converter = av.AudioResampler(format="flt", layout=layout, rate=sample_rate)
+
+        def blocks() -> Iterator[np.ndarray]:
+            pending_frames = []
+            pending_count = 0
+            try:
+                for frame in container.decode(stream):
+                    for converted in converter.resample(frame):
+                        pending_frames.append(converted.to_ndarray().reshape(-1, layout.nb_channels))
+                        pending_count += converted.samples
+                    if pending_count >= block_frames:
+                        yield np.concatenate(pending_frames)
+                        pending_frames, pending_count = [], 0
+                for converted in converter.resample(None):
+                    pending_frames.append(converted.to_ndarray().reshape(-1, layout.nb_channels))
+            except av.error.FFmpegError as e:
+                raise ValueError(f"Could not decode audio file: {e}")
+            if pending_frames:
+                yield np.concatenate(pending_frames)
+
+        logger.info(f"Decoding {stream.codec_context.name} audio with PyAV")
+        yield sample_rate, 1.0, blocks()
+
+def _is_on_disk(file_obj: BinaryIO) -> bool:
+    """Check whether a file object is backed by a file descriptor that can be memory-mapped."""
+    if isinstance(file_obj, tempfile.SpooledTemporaryFile) and not file_obj._rolled:
+        return False
+    try:
+        file_obj.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+    return True
+
 class AudioPreprocessor:
     """Handles audio preprocessing operations."""
     
@@ -18,6 +357,10 @@ class AudioPreprocessor:
         """
         Resample audio data to the target sample rate if original sample rate differs.
 
+        Mono audio is resampled block by block with a cached polyphase filter
+        when the rate ratio is a small rational number. Other inputs, or
+        RESAMPLE_METHOD=fft, use the FFT-based ``scipy.signal.resample``.
+
         Args:
             audio_data: The original audio signal data
             original_sr: The original sample rate of the audio data
@@ -27,9 +370,25 @@ class AudioPreprocessor:
             Tuple of resampled audio data and target sample rate
         """
         if original_sr != target_sr:
-            number_of_samples = round(len(audio_data) * float(target_sr) / original_sr)
-            audio_data = resample(audio_data, number_of_samples)
-            logger.info(f"Resampling from {original_sr} Hz to {target_sr} Hz")
+            use_polyphase = (
+                settings.resample_method == "polyphase"
+                and audio_data.ndim == 1
+                and PolyphaseResampler.is_supported(original_sr, target_sr)
+            )
+            
+            if use_polyphase:
+                resampler = PolyphaseResampler(original_sr, target_sr)
+                blocks = [
+                    resampler.process(audio_data[start:start + RESAMPLE_BLOCK_FRAMES])
+                    for start in range(0, len(audio_data), RESAMPLE_BLOCK_FRAMES)
+                ]
+                blocks.append(resampler.flush())
+                audio_data = np.concatenate(blocks)
+                logger.info(f"Polyphase resampling from {original_sr} Hz to {target_sr} Hz")
+            else:
+                number_of_samples = round(len(audio_data) * float(target_sr) / original_sr)
+                audio_data = resample(audio_data, number_of_samples).astype(np.float32, copy=False)
+                logger.info(f"Resampling from {original_sr} Hz to {target_sr} Hz")
         return audio_data, target_sr
 
     @staticmethod
@@ -44,7 +403,7 @@ class AudioPreprocessor:
             Mono audio data
         """
         if len(audio_data.shape) > 1:
-            audio_data = np.mean(audio_data, axis=1)
+            audio_data = np.mean(audio_data, axis=1, dtype=np.float32)
             logger.info('Converting stereo to mono')
         return audio_data
 
@@ -70,6 +429,9 @@ class AudioPreprocessor:
         """
         Complete audio preprocessing pipeline.
 
+        Audio is downmixed to mono before resampling so only one channel
+        has to be resampled.
+
         Args:
             audio_data: Raw audio data
             sample_rate: Original sample rate
@@ -77,18 +439,199 @@ class AudioPreprocessor:
         Returns:
             Tuple of processed audio data and final sample rate
         """
-        # Resample if needed
-        audio_data, sample_rate = self.resample_audio_if_needed(audio_data, sample_rate)
-        
         # Convert to mono if needed
         audio_data = self.convert_stereo_to_mono_if_needed(audio_data)
         
-        # Ensure mono (additional safety check)
-        if len(audio_data.shape) > 1:
-            audio_data = np.mean(audio_data, axis=1)
+        # Resample if needed
+        audio_data, sample_rate = self.resample_audio_if_needed(audio_data, sample_rate)
         
         logger.info("Audio preprocessing completed")
         return audio_data, sample_rate
 
+    def iter_audio_blocks(
+        self,
+        file_obj: BinaryIO,
+        block_frames: int = DECODE_BLOCK_FRAMES,
+        max_duration_sec: Optional[float] = MAX_AUDIO_DURATION_SEC
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode an audio file in blocks and yield mono audio at the target rate.
+
+        Each decoded block is downmixed to mono float32 and, when a polyphase
+        filter applies or no resampling is needed, yielded straight away, so
+        neither the multi-channel nor the original-rate signal is held in
+        memory. Other rates are resampled once the whole file is decoded.
+        Uncompressed WAV files on disk are memory-mapped and read block by
+        block in their stored sample format instead of being decoded.
+        Compressed formats soundfile cannot open, such as m4a, are decoded
+        frame by frame with PyAV. Decoding stops as soon as the audio exceeds ``max_duration_sec``,
+        even if the header under-reports its length.
+
+        Args:
+            file_obj: Seekable binary file object positioned anywhere
+            block_frames: Number of frames decoded per block
+            max_duration_sec: Maximum audio duration, or None for no limit
+
+        Yields:
+            Consecutive mono float32 blocks at TARGET_SAMPLE_RATE
+
+        Raises:
+            ValueError: If the decoded audio exceeds the maximum duration
+        """
+        pending_blocks = []
+        decoded_frames = 0
+
+        with self._open_blocks(file_obj, block_frames) as (sample_rate, scale, blocks):
+            max_frames = max_duration_sec * sample_rate if max_duration_sec is not None else None
+
+            resampler = None
+            if (
+                sample_rate != TARGET_SAMPLE_RATE
+                and settings.resample_method == "polyphase"
+                and PolyphaseResampler.is_supported(sample_rate)
+            ):
+                resampler = PolyphaseResampler(sample_rate)
+
+            for block in blocks:
+                decoded_frames += len(block)
+                if max_frames is not None and decoded_frames > max_frames:
+                    raise ValueError(f"Audio exceeds maximum duration of {max_duration_sec} seconds")
+                if block.shape[1] > 1:
+                    mono_block = block.mean(axis=1, dtype=np.float32)
+                else:
+                    mono_block = block[:, 0].astype(np.float32, copy=False)
+                if scale != 1.0:
+                    mono_block *= np.float32(scale)
+
+                if resampler:
+                    yield resampler.process(mono_block)
+                elif sample_rate == TARGET_SAMPLE_RATE:
+                    yield mono_block
+                else:
+                    pending_blocks.append(mono_block)
+
+        logger.info(f"Decoded {decoded_frames} frames in blocks of {block_frames}")
+
+        if resampler:
+            yield resampler.flush()
+            logger.info(f"Polyphase resampling from {sample_rate} Hz to {TARGET_SAMPLE_RATE} Hz")
+        elif pending_blocks:
+            # Resample the mono signal if it could not be done while decoding
+            audio_data, _ = self.resample_audio_if_needed(np.concatenate(pending_blocks), sample_rate)
+            yield audio_data
+
+    @staticmethod
+    @contextmanager
+    def _open_blocks(file_obj: BinaryIO, block_frames: int) -> Iterator[Tuple[int, float, Iterator[np.ndarray]]]:
+        """
+        Open an audio file for block-wise reading.
+
+        Uncompressed WAV files that are spooled to disk are memory-mapped and
+        yield (frames, channels) views in their stored sample format, which
+        the caller scales to [-1, 1). Other files are decoded to float32
+        blocks with soundfile, or with PyAV if soundfile cannot open them.
+
+        Args:
+            file_obj: Seekable binary file object
+            block_frames: Number of frames per block
+
+        Yields:
+            Tuple of the sample rate, the scale to apply to samples and an
+            iterator over (frames, channels) blocks
+        """
+        layout = parse_wav_header(file_obj) if _is_on_disk(file_obj) else None
+
+        if layout is not None:
+            samples = np.memmap(
+                file_obj, dtype=layout.dtype, mode="r",
+                offset=layout.data_offset, shape=(layout.frames, layout.channels)
+            ) if layout.frames else np.zeros((0, layout.channels), dtype=layout.dtype)
+            logger.info(f"Memory-mapped {layout.frames} frames of {layout.dtype.name} WAV data")
+            try:
+                yield layout.sample_rate, layout.scale, (
+                    samples[start:start + block_frames] for start in range(0, layout.frames, block_frames)
+                )
+            finally:
+                del samples
+            return
+
+        file_obj.seek(0)
+        try:
+            audio_file = sf.SoundFile(file_obj)
+        except sf.LibsndfileError:
+            # Containers libsndfile cannot demux, such as m4a
+            with _open_av_blocks(file_obj, block_frames) as opened:
+                yield opened
+            return
+
+        with audio_file:
+            yield audio_file.samplerate, 1.0, audio_file.blocks(blocksize=block_frames, dtype="float32", always_2d=True)
+
+    def iter_chunks(
+        self,
+        file_obj: BinaryIO,
+        block_frames: int = DECODE_BLOCK_FRAMES,
+        chunk_duration_sec: int = CHUNK_DURATION_SEC
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode an audio file and yield fixed-length chunks as soon as each is complete.
+
+        Args:
+            file_obj: Seekable binary file object positioned anywhere
+            block_frames: Number of frames decoded per block
+            chunk_duration_sec: Duration of each chunk in seconds
+
+        Yields:
+            Mono float32 chunks at TARGET_SAMPLE_RATE; the last one may be shorter
+
+        Raises:
+            ValueError: If the decoded audio exceeds the maximum duration
+        """
+        chunk_size = int(chunk_duration_sec * TARGET_SAMPLE_RATE)
+        pending_blocks = []
+        pending_frames = 0
+
+        for block in self.iter_audio_blocks(file_obj, block_frames):
+            pending_blocks.append(block)
+            pending_frames += len(block)
+            if pending_frames < chunk_size:
+                continue
+
+            buffer = np.concatenate(pending_blocks)
+            full_frames = len(buffer) - len(buffer) % chunk_size
+            for start in range(0, full_frames, chunk_size):
+                yield buffer[start:start + chunk_size]
+            pending_blocks = [buffer[full_frames:]]
+            pending_frames = len(buffer) - full_frames
+
+        if pending_frames:
+            yield np.concatenate(pending_blocks)
+
+    def load_audio(
+        self,
+        file_obj: BinaryIO,
+        block_frames: int = DECODE_BLOCK_FRAMES,
+        max_duration_sec: Optional[float] = MAX_AUDIO_DURATION_SEC
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Decode an audio file in blocks and preprocess it to mono at the target rate.
+
+        Args:
+            file_obj: Seekable binary file object positioned anywhere
+            block_frames: Number of frames decoded per block
+            max_duration_sec: Maximum audio duration, or None for no limit
+
+        Returns:
+            Tuple of mono float32 audio data and final sample rate
+
+        Raises:
+            ValueError: If the decoded audio exceeds the maximum duration
+        """
+        mono_blocks = list(self.iter_audio_blocks(file_obj, block_frames, max_duration_sec))
+        audio_data = np.concatenate(mono_blocks) if mono_blocks else np.zeros(0, dtype=np.float32)
+
+        logger.info("Audio preprocessing completed")
+        return audio_data, TARGET_SAMPLE_RATE
+
 # Global preprocessor instance
 preprocessor = AudioPreprocessor()
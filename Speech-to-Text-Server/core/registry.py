@@ -0,0 +1,216 @@
+"""
+Registry of on-demand Whisper models with LRU residency.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+from fastapi import HTTPException
+
+from core.model import ModelManager, model_manager
+from config.settings import settings
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """
+    Lazily loads the Whisper models a request asks for and keeps them resident.
+    
+    The default model is always served by the global ``model_manager``.
+    Other models listed in ``settings.available_models`` are loaded on first
+    use and kept on the device while their total size fits
+    ``settings.model_memory_budget_mb``. Beyond that, the least recently used
+    idle models are moved to CPU memory, up to
+    ``settings.model_offload_budget_mb``, and dropped after that. Models
+    that are in use by a request are never moved or dropped.
+    
+    A cold model is loaded outside the registry lock, so requests for
+    resident models are not held up by it; concurrent requests for the
+    same cold model wait for a single load.
+    """
+    
+    def __init__(self):
+        self._entries: "OrderedDict[str, ModelManager]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._offloaded: Set[str] = set()
+        self._in_use: Dict[str, int] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+    
+    @asynccontextmanager
+    async def use(self, model_name: Optional[str] = None) -> AsyncIterator[ModelManager]:
+        """
+        Get a loaded model for the duration of a request.
+        
+        Args:
+            model_name: Requested model, or None for the default model
+            
+        Yields:
+            ModelManager: Manager of the loaded model
+            
+        Raises:
+            HTTPException: If the model is not available
+        """
+        if not model_name or model_name == model_manager.model_name:
+            yield model_manager
+            return
+        
+        manager = await self._acquire(model_name)
+        try:
+            yield manager
+        finally:
+            # The registry may have been cleaned up while the request ran
+            if self._entries.get(model_name) is manager:
+                self._in_use[model_name] -= 1
+    
+    def validate_model_name(self, model_name: Optional[str]) -> None:
+        """
+        Check that a requested model may be served.
+        
+        Args:
+            model_name: Requested model, or None for the default model
+            
+        Raises:
+            HTTPException: If the model is not in AVAILABLE_MODELS
+        """
+        if model_name and model_name not in settings.available_models:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown model {model_name}. Available models: {', '.join(settings.available_models)}"
+            )
+    
+    async def _acquire(self, model_name: str) -> ModelManager:
+        """Load or restore a model, mark it as in use and enforce the budgets."""
+        self.validate_model_name(model_name)
+        
+        while True:
+            async with self._lock:
+                manager = self._entries.get(model_name)
+                if manager is not None:
+                    if model_name in self._offloaded:
+                        await asyncio.to_thread(manager.restore)
+                        self._offloaded.discard(model_name)
+                    await self._mark_used(model_name)
+                    return manager
+                
+                loading = self._loading.get(model_name)
+                if loading is None:
+                    loading = asyncio.get_running_loop().create_future()
+                    self._loading[model_name] = loading
+                    break
+            
+            # Another request is loading this model; use its result, or retry if it gave up
+            await asyncio.shield(loading)
+        
+        return await self._load(model_name, loading)
+    
+    async def _load(self, model_name: str, loading: asyncio.Future) -> ModelManager:
+        """Load a cold model without holding the lock, then register it as in use."""
+        start_time = time.time()
+        manager = ModelManager(model_name)
+        try:
+            await manager.initialize()
+        except Exception as e:
+            self._loading.pop(model_name, None)
+            loading.set_exception(e)
+            # Waiters re-raise the error; mark it retrieved in case there are none
+            loading.exception()
+            raise
+        except BaseException:
+            # Cancelled while loading; let a waiting request load the model itself
+            self._loading.pop(model_name, None)
+            loading.set_result(None)
+            raise
+        
+        async with self._lock:
+            self._entries[model_name] = manager
+            self._sizes[model_name] = manager.get_memory_bytes()
+            self._in_use[model_name] = 0
+            metrics.counter(f'stt_model_loads_total{{model="{model_name}"}}').inc()
+            logger.info(
+                f"Loaded {model_name} on demand in {time.time() - start_time:.2f} seconds "
+                f"({self._sizes[model_name] / 1024**2:.1f} MB)"
+            )
+            
+            await self._mark_used(model_name)
+            self._loading.pop(model_name, None)
+            loading.set_result(None)
+        
+        return manager
+    
+    async def _mark_used(self, model_name: str) -> None:
+        """Mark a held model as most recently used and in use, then enforce the budgets."""
+        self._entries.move_to_end(model_name)
+        self._in_use[model_name] += 1
+        await self._enforce_budgets()
+    
+    async def _enforce_budgets(self) -> None:
+        """Offload, then drop, least recently used idle models until both budgets are met."""
+        device_budget = settings.model_memory_budget_mb * 1024**2
+        offload_budget = settings.model_offload_budget_mb * 1024**2
+        
+        # Least recently used entries come first
+        for model_name in list(self._entries):
+            if self._resident_bytes(offloaded=False) <= device_budget:
+                break
+            if model_name in self._offloaded or self._in_use[model_name]:
+                continue
+            
+            manager = self._entries[model_name]
+            if manager.can_offload() and self._sizes[model_name] <= offload_budget:
+                await asyncio.to_thread(manager.offload)
+                self._offloaded.add(model_name)
+                metrics.counter(f'stt_model_offloads_total{{model="{model_name}"}}').inc()
+            else:
+                await self._evict(model_name)
+        
+        for model_name in list(self._entries):
+            if self._resident_bytes(offloaded=True) <= offload_budget:
+                break
+            if model_name in self._offloaded:
+                await self._evict(model_name)
+        
+        if self._resident_bytes(offloaded=False) > device_budget:
+            logger.warning("On-demand models in use exceed MODEL_MEMORY_BUDGET_MB")
+    
+    async def _evict(self, model_name: str) -> None:
+        """Release a model entirely."""
+        manager = self._entries.pop(model_name)
+        self._sizes.pop(model_name)
+        self._offloaded.discard(model_name)
+        self._in_use.pop(model_name)
+        
+        await manager.cleanup()
+        metrics.counter(f'stt_model_evictions_total{{model="{model_name}"}}').inc()
+        logger.info(f"Evicted {model_name}")
+    
+    def _resident_bytes(self, offloaded: bool) -> int:
+        """Total size of the models on the device, or of the offloaded ones."""
+        return sum(
+            size for model_name, size in self._sizes.items()
+            if (model_name in self._offloaded) == offloaded
+        )
+    
+    def get_loaded_models(self) -> Dict[str, str]:
+        """Get the on-demand models currently held, mapped to where they reside."""
+        return {
+            model_name: "cpu" if model_name in self._offloaded else manager.get_device()
+            for model_name, manager in self._entries.items()
+        }
+    
+    async def cleanup(self) -> None:
+        """Release every on-demand model."""
+        async with self._lock:
+            for manager in self._entries.values():
+                await manager.cleanup()
+            
+            self._entries.clear()
+            self._sizes.clear()
+            self._offloaded.clear()
+            self._in_use.clear()
+
+# Global model registry instance
+model_registry = ModelRegistry()
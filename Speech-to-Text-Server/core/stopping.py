@@ -0,0 +1,283 @@
+"""
+Early stopping for Whisper generation on looping or silent windows.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+import torch
+from transformers import (
+    LogitsProcessor, LogitsProcessorList, StoppingCriteria, StoppingCriteriaList,
+    WhisperForConditionalGeneration
+)
+
+from config.settings import settings
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class RepetitionStoppingCriteria(StoppingCriteria):
+    """
+    Stops rows that end in ``max_repeats`` back-to-back copies of their latest n-gram.
+
+    Whisper tends to loop on a phrase for noisy windows until it reaches
+    MAX_NEW_TOKENS; such rows end as soon as the loop is detected. Only
+    consecutive repeats count, so a phrase that recurs with other text in
+    between does not stop a row. Rows that already finished are padded and
+    never counted.
+
+    Args:
+        ngram_size: Number of tokens in the n-gram
+        max_repeats: Consecutive copies of the latest n-gram that stop a row
+        pad_token_id: Token appended to rows that have finished
+    """
+
+    def __init__(self, ngram_size: int, max_repeats: int, pad_token_id: int):
+        self.ngram_size = ngram_size
+        self.max_repeats = max_repeats
+        self.pad_token_id = pad_token_id
+        self.fired: Optional[torch.Tensor] = None
+
+    def __call__(self, input_ids: torch.LongTensor, scores: Any, **kwargs) -> torch.BoolTensor:
+        if self.fired is None:
+            self.fired = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+        span = self.ngram_size * self.max_repeats
+        if input_ids.shape[1] < span:
+            return torch.zeros_like(self.fired)
+
+        # Split the trailing max_repeats n-grams into copies and compare each with the latest
+        copies = input_ids[:, -span:].reshape(input_ids.shape[0], self.max_repeats, self.ngram_size)
+        repeated = (copies == copies[:, -1:]).all(dim=-1).all(dim=-1)
+
+        done = repeated & (input_ids[:, -1] != self.pad_token_id)
+        self.fired |= done
+        return done
+
+class NoSpeechStoppingCriteria(StoppingCriteria):
+    """
+    Stops rows that are most likely silence once enough of their tokens are low-confidence.
+
+    Applies Whisper's silence rule: a window whose no-speech probability is
+    above ``no_speech_threshold`` and whose mean token log-probability is
+    below ``logprob_threshold`` is silence. While decoding, a row is only
+    stopped once it has at least ``min_tokens`` tokens, so a single unsure
+    first token does not end real speech; whether a row is silence is
+    decided by ``is_silent`` on the finished sequence. The means are
+    updated by ``recorder``, which has to run as the last logits processor
+    so it sees the scores the greedy token is picked from.
+
+    Args:
+        no_speech_probs: No-speech probability of each row
+        no_speech_threshold: Probability above which a row may be silence
+        logprob_threshold: Mean log-probability below which it is silence
+        min_tokens: Tokens a row needs before it can be stopped
+        eos_token_id: Token that ends a row
+        pad_token_id: Token appended to rows that have finished
+    """
+
+    def __init__(
+        self,
+        no_speech_probs: torch.Tensor,
+        no_speech_threshold: float,
+        logprob_threshold: float,
+        min_tokens: int,
+        eos_token_id: int,
+        pad_token_id: int
+    ):
+        self.candidates = no_speech_probs > no_speech_threshold
+        self.logprob_threshold = logprob_threshold
+        self.min_tokens = min_tokens
+        self.eos_token_id = eos_token_id
+        self.pad_token_id = pad_token_id
+        self.logprob_sum = torch.zeros_like(no_speech_probs, dtype=torch.float32)
+        self.token_count = torch.zeros_like(no_speech_probs, dtype=torch.long)
+        self.recorder = _TokenLogprobRecorder(self)
+
+    def observe(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> None:
+        """Add the log-probability of each unfinished row's greedy token to the running sums."""
+        last = input_ids[:, -1]
+        active = (last != self.eos_token_id) & (last != self.pad_token_id)
+        logprobs = scores.float().log_softmax(dim=-1).amax(dim=-1)
+        self.logprob_sum += torch.where(active, logprobs, torch.zeros_like(logprobs))
+        self.token_count += active.long()
+
+    def mean_logprob(self) -> torch.Tensor:
+        """Mean log-probability of each row's tokens so far."""
+        return self.logprob_sum / self.token_count.clamp(min=1)
+
+    def is_silent(self) -> torch.BoolTensor:
+        """Whether each row is silence by Whisper's rule, applied to the tokens generated so far."""
+        return self.candidates & (self.token_count > 0) & (self.mean_logprob() < self.logprob_threshold)
+
+    def __call__(self, input_ids: torch.LongTensor, scores: Any, **kwargs) -> torch.BoolTensor:
+        return self.is_silent() & (self.token_count >= self.min_tokens) & (input_ids[:, -1] != self.pad_token_id)
+
+class _TokenLogprobRecorder(LogitsProcessor):
+    """Passes scores through unchanged while feeding them to a no-speech criterion."""
+
+    def __init__(self, criteria: NoSpeechStoppingCriteria):
+        self.criteria = criteria
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        self.criteria.observe(input_ids, scores)
+        return scores
+
+class EarlyStopping:
+    """
+    Stopping criteria of one generate call.
+
+    Args:
+        repetition: Repetition criterion, or None if disabled
+        no_speech: No-speech criterion, or None if disabled or no row may be silence
+        pad_token_id: Token that fills the rows found to be silence
+    """
+
+    def __init__(
+        self,
+        repetition: Optional[RepetitionStoppingCriteria],
+        no_speech: Optional[NoSpeechStoppingCriteria],
+        pad_token_id: int
+    ):
+        self.repetition = repetition
+        self.no_speech = no_speech
+        self.pad_token_id = pad_token_id
+
+    def generate_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments that add the criteria to ``model.generate``."""
+        kwargs: Dict[str, Any] = {}
+        criteria = [criterion for criterion in (self.repetition, self.no_speech) if criterion is not None]
+        if criteria:
+            kwargs["stopping_criteria"] = StoppingCriteriaList(criteria)
+        if self.no_speech is not None:
+            kwargs["logits_processor"] = LogitsProcessorList([self.no_speech.recorder])
+        return kwargs
+
+    def finish(self, sequences: torch.Tensor) -> torch.Tensor:
+        """
+        Blank the rows that are silence and count how often each criterion fired.
+
+        Silence is judged on the finished sequences, so a row that ended
+        confidently keeps its text even if it started with unsure tokens.
+
+        Args:
+            sequences: Generated token IDs of shape (batch, tokens)
+
+        Returns:
+            Token IDs where silent rows hold only padding
+        """
+        if self.repetition is not None and self.repetition.fired is not None:
+            early_stopper.repetition_stops.inc(int(self.repetition.fired.sum()))
+
+        if self.no_speech is not None:
+            silent = self.no_speech.is_silent().to(sequences.device)
+            if silent.any():
+                sequences = sequences.masked_fill(silent.unsqueeze(1), self.pad_token_id)
+                early_stopper.no_speech_stops.inc(int(silent.sum()))
+
+        return sequences
+
+class EarlyStopper:
+    """
+    Builds the stopping criteria for Whisper generate calls from settings.
+
+    A row stops once it ends in ``settings.repetition_max_repeats``
+    back-to-back copies of its latest
+    ``settings.repetition_ngram_size``-gram, and a row whose window is
+    probably silence stops once at least
+    ``settings.no_speech_min_tokens`` tokens average below
+    ``settings.logprob_threshold``, and returns no text if its finished
+    sequence still does. Stops are counted per reason in
+    ``stt_early_stops_total``.
+    """
+
+    def __init__(self):
+        self.repetition_stops = metrics.counter('stt_early_stops_total{reason="repetition"}')
+        self.no_speech_stops = metrics.counter('stt_early_stops_total{reason="no_speech"}')
+
+    def needs_encoder_outputs(self, model: Any) -> bool:
+        """
+        Whether silence detection applies to a model and needs its encoder outputs.
+
+        Args:
+            model: Model generate will be called on
+
+        Returns:
+            bool: True if the no-speech check is enabled and supported by the model
+        """
+        return (
+            settings.no_speech_threshold < 1.0
+            and isinstance(model, WhisperForConditionalGeneration)
+            and getattr(model.generation_config, "no_timestamps_token_id", None) is not None
+        )
+
+    def prepare(self, model: Any, encoder_hidden: Optional[torch.Tensor] = None) -> EarlyStopping:
+        """
+        Create the stopping criteria for one generate call.
+
+        Args:
+            model: Model generate will be called on
+            encoder_hidden: Encoder hidden states of the batch, needed for
+                the no-speech check; without them only repetition is checked
+
+        Returns:
+            EarlyStopping: Criteria to pass to generate and apply to its output
+        """
+        generation_config = model.generation_config
+        eos_token_id = generation_config.eos_token_id
+        pad_token_id = generation_config.pad_token_id
+        if pad_token_id is None:
+            pad_token_id = eos_token_id
+
+        repetition = None
+        if settings.repetition_max_repeats > 0:
+            repetition = RepetitionStoppingCriteria(
+                settings.repetition_ngram_size, settings.repetition_max_repeats, pad_token_id
+            )
+
+        no_speech = None
+        if encoder_hidden is not None and self.needs_encoder_outputs(model):
+            no_speech_probs = self._no_speech_probs(model, encoder_hidden)
+            if (no_speech_probs > settings.no_speech_threshold).any():
+                no_speech = NoSpeechStoppingCriteria(
+                    no_speech_probs,
+                    settings.no_speech_threshold,
+                    settings.logprob_threshold,
+                    settings.no_speech_min_tokens,
+                    eos_token_id,
+                    pad_token_id
+                )
+
+        return EarlyStopping(repetition, no_speech, pad_token_id)
+
+    @staticmethod
+    def _no_speech_probs(model: WhisperForConditionalGeneration, encoder_hidden: torch.Tensor) -> torch.Tensor:
+        """
+        Probability of the no-speech token after the start-of-transcript token for each row.
+
+        Args:
+            model: Whisper model
+            encoder_hidden: Encoder hidden states of shape (batch, frames, d_model)
+
+        Returns:
+            No-speech probabilities of shape (batch,)
+        """
+        generation_config = model.generation_config
+        decoder_input_ids = torch.full(
+            (len(encoder_hidden), 1),
+            generation_config.decoder_start_token_id,
+            dtype=torch.long,
+            device=encoder_hidden.device
+        )
+
+        with torch.no_grad():
+            hidden = model.get_decoder()(
+                input_ids=decoder_input_ids,
+                encoder_hidden_states=encoder_hidden,
+                use_cache=False
+            ).last_hidden_state
+            logits = model.get_output_embeddings()(hidden[:, -1])
+
+        # Whisper's no-speech token precedes the no-timestamps token
+        return logits.float().softmax(dim=-1)[:, generation_config.no_timestamps_token_id - 1]
+
+# Global early stopper instance
+early_stopper = EarlyStopper()
@@ -0,0 +1,172 @@
+"""
+Streaming speech transcription over a rolling audio buffer.
+"""
+import asyncio
+import logging
+import numpy as np
+from typing import Any, Awaitable, Callable, Dict, List
+
+from core.transcriber import transcriber
+from core.vad import vad
+from config.constants import (
+    TARGET_SAMPLE_RATE, STREAM_MAX_BUFFER_SEC, STREAM_MAX_BACKLOG_SEC, STREAM_ENDPOINT_SILENCE_MS
+)
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class StreamingSession:
+    """
+    Rolling-buffer transcription state for one streaming connection.
+    
+    Incoming 16 kHz 16-bit PCM frames are queued and appended to a buffer
+    that Whisper re-runs on every ``settings.stream_step_sec`` of new audio.
+    Words that two consecutive hypotheses agree on are reported as stable.
+    The buffer is finalized and cleared when speech is followed by a pause,
+    and cut at a pause when it reaches STREAM_MAX_BUFFER_SEC. Frames that
+    would hold more than STREAM_MAX_BACKLOG_SEC of audio, e.g. while a slow
+    decode is in flight, are rejected, so memory stays bounded.
+    """
+    
+    def __init__(self, sample_rate: int = TARGET_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._pending: List[np.ndarray] = []
+        self._pending_samples = 0
+        self._buffer_start = 0
+        self._received = 0
+        self._last_decoded = 0
+        self._previous_words: List[str] = []
+        self._stable_words: List[str] = []
+        self._new_audio = asyncio.Event()
+        self._closed = False
+    
+    def add_audio(self, pcm: bytes) -> None:
+        """
+        Queue little-endian 16-bit mono PCM samples for the buffer.
+        
+        Args:
+            pcm: Raw PCM bytes
+            
+        Raises:
+            ValueError: If the payload is not a whole number of samples, or
+                the session already holds STREAM_MAX_BACKLOG_SEC of audio
+        """
+        if len(pcm) % 2:
+            raise ValueError("PCM frames must contain 16-bit samples")
+        
+        num_samples = len(pcm) // 2
+        if len(self._buffer) + self._pending_samples + num_samples > STREAM_MAX_BACKLOG_SEC * self.sample_rate:
+            raise ValueError("Audio is arriving faster than it can be transcribed")
+        
+        self._pending.append(np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0)
+        self._pending_samples += num_samples
+        self._received += num_samples
+        self._new_audio.set()
+    
+    def close(self) -> None:
+        """Mark the end of the audio stream."""
+        self._closed = True
+        self._new_audio.set()
+    
+    async def run(self, send: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """
+        Decode the buffer as audio arrives until the stream is closed.
+        
+        Args:
+            send: Coroutine used to deliver partial and final events
+        """
+        step = int(settings.stream_step_sec * self.sample_rate)
+        
+        while True:
+            await self._new_audio.wait()
+            self._new_audio.clear()
+            
+            if self._closed:
+                break
+            if self._received - self._last_decoded < step:
+                continue
+            
+            for event in await self._update():
+                await send(event)
+        
+        # Flush whatever is left once the client ends the stream
+        self._collect()
+        for event in await self._finalize(len(self._buffer)):
+            await send(event)
+    
+    async def _update(self) -> List[Dict[str, Any]]:
+        """Re-run Whisper on the buffer and report partial or final text."""
+        self._collect()
+        self._last_decoded = self._received
+        endpoint_samples = int(self.sample_rate * STREAM_ENDPOINT_SILENCE_MS / 1000)
+        regions = vad.detect_speech(self._buffer)
+        
+        # Drop leading silence without running the model
+        if not regions:
+            if len(self._buffer) > endpoint_samples:
+                self._advance(len(self._buffer) - endpoint_samples)
+            return []
+        
+        # Speech followed by a long enough pause ends the segment
+        if len(self._buffer) - regions[-1][1] >= endpoint_samples:
+            return await self._finalize(len(self._buffer))
+        
+        # Keep the buffer bounded by finalizing up to a pause
+        max_samples = int(STREAM_MAX_BUFFER_SEC * self.sample_rate)
+        if len(self._buffer) >= max_samples:
+            energy_db = vad.frame_energy_db(self._buffer)
+            cut = vad.find_pause(energy_db, max_samples // 2, max_samples)
+            return await self._finalize(cut)
+        
+        words = (await transcriber.transcribe_audio_chunk(self._buffer, self.sample_rate)).split()
+        
+        # Commit the prefix that two consecutive hypotheses agree on
+        agreed = 0
+        for previous, current in zip(self._previous_words, words):
+            if previous != current:
+                break
+            agreed += 1
+        if agreed > len(self._stable_words):
+            self._stable_words = words[:agreed]
+        self._previous_words = words
+        
+        unstable_words = words[len(self._stable_words):]
+        return [{
+            "type": "partial",
+            "text": " ".join(self._stable_words + unstable_words),
+            "stable": " ".join(self._stable_words),
+            "unstable": " ".join(unstable_words),
+            "start": self._buffer_start / self.sample_rate,
+            "end": (self._buffer_start + len(self._buffer)) / self.sample_rate
+        }]
+    
+    async def _finalize(self, cut: int) -> List[Dict[str, Any]]:
+        """Transcribe the buffer up to ``cut`` as a final segment and drop it."""
+        head = self._buffer[:cut]
+        start = self._buffer_start / self.sample_rate
+        end = (self._buffer_start + cut) / self.sample_rate
+        
+        events = []
+        if len(head) and vad.detect_speech(head):
+            text = await transcriber.transcribe_audio_chunk(head, self.sample_rate)
+            if text:
+                events.append({"type": "final", "text": text, "start": start, "end": end})
+                logger.info(f"Finalized streaming segment {start:.2f}-{end:.2f} s")
+        
+        self._advance(cut)
+        return events
+    
+    def _collect(self) -> None:
+        """Append the frames queued since the last decode to the buffer in one copy."""
+        if self._pending:
+            self._buffer = np.concatenate([self._buffer, *self._pending])
+            self._pending = []
+            self._pending_samples = 0
+    
+    def _advance(self, samples: int) -> None:
+        """Drop samples from the front of the buffer and reset hypotheses."""
+        self._buffer = self._buffer[samples:]
+        self._buffer_start += samples
+        self._previous_words = []
+        self._stable_words = []
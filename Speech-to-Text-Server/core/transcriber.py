@@ -2,30 +2,206 @@
 Core speech transcription functionality.
 """
 import asyncio
+import itertools
+import threading
 import time
 import logging
+from collections import Counter
+import torch
 import numpy as np
-import soundfile as sf
-from typing import List
-from fastapi import UploadFile
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from transformers import WhisperForConditionalGeneration
+from transformers.modeling_outputs import BaseModelOutput
 
-from core.model import model_manager
+from core.features import feature_extractor
+from core.model import ModelManager, model_manager
+from core.pipeline import Pipeline, PipelineStage
 from core.preprocessing import preprocessor
+from core.registry import model_registry
+from core.stopping import early_stopper
 from core.validation import validator
-from config.constants import MAX_NEW_TOKENS, LANGUAGE, TASK
+from core.vad import vad
+from config.constants import (
+    MAX_NEW_TOKENS, LANGUAGE, TASK, TRANSLATE_TASK, TARGET_SAMPLE_RATE,
+    BATCH_SIZE_BUCKETS, QUEUE_WAIT_BUCKETS_SEC, ACCEPTANCE_RATE_BUCKETS,
+    INTERACTIVE_PRIORITY, REQUEST_LATENCY_BUCKETS_SEC
+)
+from config.settings import settings
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+class BatchScheduler:
+    """
+    Dynamic batching scheduler shared by all in-flight requests.
+    
+    Feature windows submitted by concurrent requests are queued and collected
+    into batches of up to ``max_batch_size`` items, waiting at most
+    ``max_wait_sec`` after the first item arrives. A single worker runs one
+    generate call per batch and hands each window's predicted token IDs back
+    to its request.
+    Windows with a lower priority value are batched first, so background
+    jobs only fill capacity that interactive requests leave free.
+    """
+    
+    def __init__(
+        self,
+        generate_fn: Callable[[torch.Tensor], Awaitable[List[torch.Tensor]]],
+        max_batch_size: int,
+        max_wait_sec: float
+    ):
+        self.generate_fn = generate_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_sec = max_wait_sec
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_size_histogram = metrics.histogram("stt_batch_size", BATCH_SIZE_BUCKETS)
+        self._queue_wait_histogram = metrics.histogram("stt_queue_wait_seconds", QUEUE_WAIT_BUCKETS_SEC)
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the scheduler worker is accepting work."""
+        return self._worker is not None and not self._worker.done()
+    
+    async def start(self) -> None:
+        """Start the batching worker."""
+        if self.is_running:
+            return
+        
+        self._queue = asyncio.PriorityQueue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Batch scheduler started (max batch size: {self.max_batch_size}, "
+            f"max wait: {self.max_wait_sec * 1000:.0f} ms)"
+        )
+    
+    async def stop(self) -> None:
+        """Stop the batching worker and fail any pending requests."""
+        if self._worker is None:
+            return
+        
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        
+        while self._queue is not None and not self._queue.empty():
+            _, _, _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+        
+        logger.info("Batch scheduler stopped")
+    
+    async def submit(self, input_features: torch.Tensor, priority: int = INTERACTIVE_PRIORITY) -> torch.Tensor:
+        """
+        Queue a single feature window and wait for its generated tokens.
+        
+        Args:
+            input_features: Log-mel features of shape (1, n_mels, frames)
+            priority: Scheduling priority; lower values are served first
+            
+        Returns:
+            Predicted token IDs of the window
+        """
+        if not self.is_running:
+            raise RuntimeError("Batch scheduler is not running")
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((priority, next(self._sequence), input_features, future, time.perf_counter()))
+        return await future
+    
+    async def _run(self) -> None:
+        """Collect batches from the queue and process them until cancelled."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_sec
+            
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._process_batch(batch)
+    
+    async def _process_batch(self, queued: List[Tuple[int, int, torch.Tensor, asyncio.Future, float]]) -> None:
+        """Run one generate call for a batch and resolve each request's future."""
+        # Skip requests that were cancelled while queued
+        batch = [(features, future, enqueued) for _, _, features, future, enqueued in queued if not future.done()]
+        if not batch:
+            return
+        
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            self._queue_wait_histogram.observe(started - enqueued)
+        self._batch_size_histogram.observe(len(batch))
+        
+        try:
+            sequences = await self.generate_fn(torch.cat([features for features, _, _ in batch]))
+            for (_, future, _), predicted_ids in zip(batch, sequences):
+                if not future.done():
+                    future.set_result(predicted_ids)
+        except Exception as e:
+            logger.error(f"Batch of {len(batch)} failed: {e}. Retrying individually")
+            
+            for features, future, _ in batch:
+                try:
+                    predicted_ids = (await self.generate_fn(features))[0]
+                    if not future.done():
+                        future.set_result(predicted_ids)
+                except Exception as item_error:
+                    if not future.done():
+                        future.set_exception(item_error)
+
 class SpeechTranscriber:
     """Handles speech transcription operations."""
     
-    async def transcribe_audio_chunk(self, audio_array: np.ndarray, sampling_rate: int) -> str:
+    def __init__(self):
+        self._assisted_lock = threading.Lock()
+        self._draft_tokens_counter = metrics.counter("stt_assisted_draft_tokens")
+        self._accepted_tokens_counter = metrics.counter("stt_assisted_accepted_tokens")
+        self._acceptance_rate_histogram = metrics.histogram("stt_assisted_acceptance_rate", ACCEPTANCE_RATE_BUCKETS)
+        self.scheduler = BatchScheduler(
+            self._predict,
+            max_batch_size=settings.batch_size,
+            max_wait_sec=settings.batch_max_wait_ms / 1000
+        )
+    
+    async def start(self) -> None:
+        """Start the cross-request batch scheduler if dynamic batching is enabled."""
+        if settings.dynamic_batching:
+            await self.scheduler.start()
+    
+    async def stop(self) -> None:
+        """Stop the cross-request batch scheduler."""
+        await self.scheduler.stop()
+    
+    async def transcribe_audio_chunk(
+        self,
+        audio_array: np.ndarray,
+        sampling_rate: int,
+        manager: ModelManager = model_manager
+    ) -> str:
         """
         Transcribe a single audio chunk using the Whisper model.
         
         Args:
             audio_array: Audio data as numpy array
             sampling_rate: Sample rate of the audio
+            manager: Model to transcribe with; defaults to the default model
             
         Returns:
             Transcribed text
@@ -36,107 +212,991 @@ class SpeechTranscriber:
         start_time = time.time()
         
         try:
-            model, processor = model_manager.get_model_and_processor()
-            device = model_manager.get_device()
-            
             # Process audio features
-            input_features = processor(
-                audio_array, 
-                sampling_rate=sampling_rate, 
-                return_tensors="pt"
-            ).input_features.to(device)
-
-            # Get decoder prompt IDs
-            forced_decoder_ids = processor.get_decoder_prompt_ids(
-                language=LANGUAGE, 
-                task=TASK
-            )
+            input_features = await asyncio.to_thread(self._extract_features, [audio_array], sampling_rate, manager)
+
+            # Generate and decode transcription
+            if self._uses_scheduler(manager):
+                text = self._detokenize([await self.scheduler.submit(input_features)], manager)[0]
+            else:
+                text = (await self._generate(input_features, manager))[0]
+            
+            processing_time = time.time() - start_time
+            logger.info(f"Chunk transcription completed in {processing_time:.2f} seconds")
+            
+            return text
+            
+        except Exception as e:
+            logger.error(f"Transcription failed for audio chunk: {e}")
+            raise
+
+    async def transcribe_audio_batch(
+        self,
+        audio_chunks: List[np.ndarray],
+        sampling_rate: int,
+        on_chunk: Optional[Callable[[int, str], None]] = None,
+        priority: int = INTERACTIVE_PRIORITY,
+        manager: ModelManager = model_manager
+    ) -> List[str]:
+        """
+        Transcribe several audio chunks with batched Whisper generation.
+        
+        Features for all chunks are extracted in one processor call. With
+        dynamic batching enabled, windows for the default model are handed to
+        the shared scheduler so they can be batched with windows of other
+        requests; otherwise ``model.generate`` runs on batches of
+        ``settings.batch_size``. When a batch fails, only its items are
+        retried one at a time.
+        
+        Args:
+            audio_chunks: List of audio chunk arrays
+            sampling_rate: Sample rate of the audio
+            on_chunk: Optional callback receiving each chunk index and text as it completes
+            priority: Scheduling priority when dynamic batching is enabled
+            manager: Model to transcribe with; defaults to the default model
+            
+        Returns:
+            List of transcriptions in chunk order; failed chunks are "[Error in chunk]"
+        """
+        if not audio_chunks:
+            return []
+        
+        start_time = time.time()
+        # Process audio features for every chunk at once
+        input_features = await asyncio.to_thread(self._extract_features, audio_chunks, sampling_rate, manager)
+        
+        if self._uses_scheduler(manager):
+            async def transcribe_window(idx: int) -> str:
+                try:
+                    predicted_ids = await self.scheduler.submit(input_features[idx:idx + 1], priority)
+                    text = self._detokenize([predicted_ids], manager)[0]
+                except Exception as e:
+                    logger.error(f"Error processing chunk {idx + 1}: {e}")
+                    text = "[Error in chunk]"
+                if on_chunk:
+                    on_chunk(idx, text)
+                return text
+            
+            transcriptions = list(await asyncio.gather(
+                *(transcribe_window(idx) for idx in range(len(audio_chunks)))
+            ))
+            
+            processing_time = time.time() - start_time
+            logger.info(f"Scheduled transcription of {len(audio_chunks)} chunks completed in {processing_time:.2f} seconds")
+            return transcriptions
+        
+        transcriptions: List[str] = []
+        batch_size = settings.batch_size
+        
+        for start in range(0, len(audio_chunks), batch_size):
+            batch_features = input_features[start:start + batch_size]
+            end = start + len(batch_features)
+            logger.info(f"Processing chunks {start + 1}-{end}/{len(audio_chunks)}")
+            
+            try:
+                batch_texts = await self._generate(batch_features, manager)
+            except Exception as e:
+                logger.error(f"Error processing chunks {start + 1}-{end}: {e}. Retrying individually")
+                batch_texts = await self._retry_individually(batch_features, start, manager)
+            
+            transcriptions.extend(batch_texts)
+            if on_chunk:
+                for idx, text in enumerate(batch_texts, start=start):
+                    on_chunk(idx, text)
+        
+        processing_time = time.time() - start_time
+        logger.info(f"Batch transcription of {len(audio_chunks)} chunks completed in {processing_time:.2f} seconds")
+        
+        return transcriptions
+
+    def _uses_scheduler(self, manager: ModelManager) -> bool:
+        """Whether windows for a model go through the cross-request scheduler."""
+        return self.scheduler.is_running and manager is model_manager
+
+    def _extract_features(
+        self,
+        audio_chunks: List[np.ndarray],
+        sampling_rate: int,
+        manager: ModelManager = model_manager
+    ) -> torch.Tensor:
+        """
+        Compute Whisper log-mel features for a batch of audio chunks.
+        
+        Args:
+            audio_chunks: List of audio chunk arrays
+            sampling_rate: Sample rate of the audio
+            manager: Model whose feature extractor settings are used
+            
+        Returns:
+            Features of shape (batch, n_mels, frames)
+        """
+        _, processor = manager.get_model_and_processor()
+        
+        if settings.feature_extractor == "torch" and sampling_rate == processor.feature_extractor.sampling_rate:
+            return feature_extractor.extract(audio_chunks, processor.feature_extractor, manager.get_device())
+        
+        return processor(
+            audio_chunks,
+            sampling_rate=sampling_rate,
+            return_tensors="pt"
+        ).input_features
+
+    async def _generate(self, input_features: torch.Tensor, manager: ModelManager = model_manager) -> List[str]:
+        """
+        Run Whisper generation on a batch of input features and decode the texts.
+        
+        Args:
+            input_features: Log-mel features of shape (batch, n_mels, frames)
+            manager: Model to generate with; defaults to the default model
+            
+        Returns:
+            List of decoded texts, one per batch item
+        """
+        return self._detokenize(await self._predict(input_features, manager), manager)
 
-            # Generate transcription
+    async def _predict(self, input_features: torch.Tensor, manager: ModelManager = model_manager) -> List[torch.Tensor]:
+        """
+        Run Whisper generation on a batch of input features.
+        
+        Args:
+            input_features: Log-mel features of shape (batch, n_mels, frames)
+            manager: Model to generate with; defaults to the default model
+            
+        Returns:
+            List of predicted token ID sequences, one per batch item
+        """
+        model, _ = manager.get_model_and_processor()
+        device = manager.get_device()
+        
+        # Get decoder prompt IDs
+        forced_decoder_ids = manager.get_decoder_prompt_ids(LANGUAGE, TASK)
+
+        input_features = input_features.to(device, dtype=manager.get_dtype())
+        assistant_model = manager.get_assistant_model()
+
+        # Generate transcription
+        if assistant_model is not None:
             predicted_ids = await asyncio.to_thread(
-                model.generate,
+                self._assisted_generate,
+                model,
+                assistant_model,
                 input_features,
+                forced_decoder_ids
+            )
+        elif manager.get_batch_buckets():
+            predicted_ids = await asyncio.to_thread(
+                self._bucketed_generate,
+                model,
+                input_features,
+                forced_decoder_ids,
+                manager.get_batch_buckets()
+            )
+        else:
+            predicted_ids = await asyncio.to_thread(
+                self._generate_ids,
+                model,
+                input_features,
+                forced_decoder_ids
+            )
+
+        return list(predicted_ids)
+
+    def _detokenize(self, predicted_ids: List[torch.Tensor], manager: ModelManager = model_manager) -> List[str]:
+        """
+        Decode predicted token IDs to text.
+        
+        Args:
+            predicted_ids: Predicted token ID sequences
+            manager: Model whose tokenizer is used
+            
+        Returns:
+            List of decoded texts without special tokens
+        """
+        _, processor = manager.get_model_and_processor()
+        texts = processor.batch_decode(predicted_ids, skip_special_tokens=True)
+        return [text.strip() for text in texts]
+
+    def _bucketed_generate(
+        self,
+        model: WhisperForConditionalGeneration,
+        input_features: torch.Tensor,
+        forced_decoder_ids: List[Tuple[int, int]],
+        buckets: List[int],
+        encoder_hidden_states: bool = False
+    ) -> List[torch.Tensor]:
+        """
+        Run compiled static-cache generation on batches padded to a compiled bucket size.
+        
+        Batches larger than the largest bucket are split, and smaller ones
+        are padded with silent rows so no new compilation is triggered.
+        
+        Args:
+            model: Whisper model with a compiled forward and static cache
+            input_features: Log-mel features of shape (batch, n_mels, frames),
+                or encoder hidden states if ``encoder_hidden_states`` is set
+            forced_decoder_ids: Decoder prompt IDs
+            buckets: Compiled batch sizes in ascending order
+            encoder_hidden_states: Whether ``input_features`` holds precomputed encoder outputs
+            
+        Returns:
+            List of predicted token ID sequences, one per batch item
+        """
+        sequences = []
+        
+        for start in range(0, len(input_features), buckets[-1]):
+            batch = input_features[start:start + buckets[-1]]
+            bucket = next(size for size in buckets if size >= len(batch))
+            
+            if bucket > len(batch):
+                padding = batch.new_zeros((bucket - len(batch),) + tuple(batch.shape[1:]))
+                batch = torch.cat([batch, padding])
+            
+            predicted_ids = self._generate_ids(model, batch, forced_decoder_ids, encoder_hidden_states)
+            sequences.extend(predicted_ids[:min(len(input_features) - start, buckets[-1])])
+        
+        return sequences
+
+    def _generate_ids(
+        self,
+        model: WhisperForConditionalGeneration,
+        inputs: torch.Tensor,
+        forced_decoder_ids: List[Tuple[int, int]],
+        encoder_hidden_states: bool = False
+    ) -> torch.Tensor:
+        """
+        Run greedy generation from log-mel features or precomputed encoder outputs.
+        
+        Rows that start looping on an n-gram, or whose window is likely
+        silence, stop before MAX_NEW_TOKENS; silent rows come back without
+        text. The silence check needs the encoder outputs, so features are
+        encoded here first when it is enabled.
+        
+        Args:
+            model: Whisper model
+            inputs: Log-mel features, or encoder hidden states if ``encoder_hidden_states`` is set
+            forced_decoder_ids: Decoder prompt IDs
+            encoder_hidden_states: Whether ``inputs`` holds precomputed encoder outputs
+            
+        Returns:
+            Predicted token IDs of shape (batch, tokens)
+        """
+        if not encoder_hidden_states and early_stopper.needs_encoder_outputs(model):
+            with torch.no_grad():
+                inputs = model.get_encoder()(inputs).last_hidden_state
+            encoder_hidden_states = True
+        
+        stopping = early_stopper.prepare(model, inputs if encoder_hidden_states else None)
+        
+        if encoder_hidden_states:
+            predicted_ids = model.generate(
+                encoder_outputs=BaseModelOutput(last_hidden_state=inputs),
+                max_new_tokens=MAX_NEW_TOKENS,
+                forced_decoder_ids=forced_decoder_ids,
+                **stopping.generate_kwargs()
+            )
+        else:
+            predicted_ids = model.generate(
+                inputs,
                 max_new_tokens=MAX_NEW_TOKENS,
                 forced_decoder_ids=forced_decoder_ids,
+                **stopping.generate_kwargs()
             )
+        
+        return stopping.finish(predicted_ids)
 
-            # Decode the prediction
-            text = processor.batch_decode(predicted_ids, skip_special_tokens=True)[0]
+    def _multitask_generate(
+        self,
+        manager: ModelManager,
+        input_features: torch.Tensor,
+        tasks: List[str],
+        detect_language: bool
+    ) -> Dict[str, List[Any]]:
+        """
+        Run the encoder once and decode every requested task from its outputs.
+        
+        The encoder outputs are reused for language identification and for
+        each task. Chunks are decoded in groups of the same language, with
+        the prompt IDs of each (language, task) pair computed only once.
+        
+        Args:
+            manager: Model to generate with
+            input_features: Log-mel features of shape (batch, n_mels, frames)
+            tasks: Whisper tasks to decode, e.g. ["transcribe", "translate"]
+            detect_language: Whether to identify the language of each chunk
+                instead of using the configured language
             
-            processing_time = time.time() - start_time
-            logger.info(f"Chunk transcription completed in {processing_time:.2f} seconds")
+        Returns:
+            Dict mapping "language" and each task to per-chunk values
+        """
+        model, processor = manager.get_model_and_processor()
+        
+        with torch.no_grad():
+            encoder_hidden = model.get_encoder()(input_features).last_hidden_state
+        
+        if detect_language:
+            languages = self._detect_languages(model, encoder_hidden)
+        else:
+            languages = [LANGUAGE] * len(input_features)
+        
+        outputs: Dict[str, List[Any]] = {"language": languages}
+        for task in tasks:
+            sequences: List[Optional[torch.Tensor]] = [None] * len(languages)
             
-            return text.strip()
+            for language in dict.fromkeys(languages):
+                rows = [idx for idx, chunk_language in enumerate(languages) if chunk_language == language]
+                forced_decoder_ids = manager.get_decoder_prompt_ids(language, task)
+                
+                if manager.get_batch_buckets():
+                    predicted_ids = self._bucketed_generate(
+                        model, encoder_hidden[rows], forced_decoder_ids, manager.get_batch_buckets(),
+                        encoder_hidden_states=True
+                    )
+                else:
+                    predicted_ids = self._generate_ids(
+                        model, encoder_hidden[rows], forced_decoder_ids, encoder_hidden_states=True
+                    )
+                
+                for row, predicted in zip(rows, predicted_ids):
+                    sequences[row] = predicted
             
-        except Exception as e:
-            logger.error(f"Transcription failed for audio chunk: {e}")
-            raise
+            texts = processor.batch_decode(sequences, skip_special_tokens=True)
+            outputs[task] = [text.strip() for text in texts]
+        
+        return outputs
 
-    async def process_audio_file(self, file: UploadFile) -> str:
+    def _detect_languages(self, model: WhisperForConditionalGeneration, encoder_hidden: torch.Tensor) -> List[str]:
+        """
+        Identify the spoken language of each chunk from its encoder outputs.
+        
+        Runs a single decoder step from the start-of-transcript token and
+        picks the most likely language token.
+        
+        Args:
+            model: Multilingual Whisper model
+            encoder_hidden: Encoder hidden states of shape (batch, frames, d_model)
+            
+        Returns:
+            List of language codes, one per chunk
+        """
+        lang_to_id = model.generation_config.lang_to_id
+        
+        decoder_input_ids = torch.full(
+            (len(encoder_hidden), 1),
+            model.generation_config.decoder_start_token_id,
+            dtype=torch.long,
+            device=encoder_hidden.device
+        )
+        
+        with torch.no_grad():
+            hidden = model.get_decoder()(
+                input_ids=decoder_input_ids,
+                encoder_hidden_states=encoder_hidden,
+                use_cache=False
+            ).last_hidden_state
+            logits = model.get_output_embeddings()(hidden[:, -1])
+        
+        language_tokens = list(lang_to_id.keys())
+        language_ids = torch.tensor(list(lang_to_id.values()), device=logits.device)
+        best = logits[:, language_ids].argmax(dim=-1).tolist()
+        
+        return [language_tokens[idx].strip("<|>") for idx in best]
+
+    async def transcribe_audio_multitask(
+        self,
+        audio_chunks: List[np.ndarray],
+        sampling_rate: int,
+        translate: bool = False,
+        detect_language: bool = False,
+        manager: ModelManager = model_manager
+    ) -> Dict[str, List[Any]]:
+        """
+        Transcribe, and optionally translate and identify the language of, several chunks.
+        
+        Each batch of ``settings.batch_size`` chunks goes through the encoder
+        once and all outputs are decoded from the shared encoder states. These
+        requests bypass the cross-request scheduler, which decodes a single
+        task per window. When a batch fails, its items are retried one at a time.
+        
+        Args:
+            audio_chunks: List of audio chunk arrays
+            sampling_rate: Sample rate of the audio
+            translate: Whether to also translate each chunk to English
+            detect_language: Whether to identify the language of each chunk
+            manager: Model to transcribe with; defaults to the default model
+            
+        Returns:
+            Dict mapping "language" and each decoded task to per-chunk values;
+            failed chunks are "[Error in chunk]"
+            
+        Raises:
+            ValueError: If the requested outputs are not supported by the loaded model
+        """
+        if manager.backend == "onnx":
+            raise ValueError("Translation and language detection are not supported with the onnx backend")
+        
+        model, _ = manager.get_model_and_processor()
+        if detect_language and not getattr(model.generation_config, "lang_to_id", None):
+            raise ValueError("Language detection requires a multilingual Whisper model")
+        
+        tasks = [TASK] + ([TRANSLATE_TASK] if translate else [])
+        outputs: Dict[str, List[Any]] = {key: [] for key in ["language", *tasks]}
+        if not audio_chunks:
+            return outputs
+        
+        start_time = time.time()
+        input_features = await asyncio.to_thread(self._extract_features, audio_chunks, sampling_rate, manager)
+        input_features = input_features.to(manager.get_device(), dtype=manager.get_dtype())
+        batch_size = settings.batch_size
+        
+        for start in range(0, len(audio_chunks), batch_size):
+            batch_features = input_features[start:start + batch_size]
+            end = start + len(batch_features)
+            logger.info(f"Processing chunks {start + 1}-{end}/{len(audio_chunks)} for tasks {', '.join(tasks)}")
+            
+            try:
+                batch_outputs = [await asyncio.to_thread(
+                    self._multitask_generate, manager, batch_features, tasks, detect_language
+                )]
+            except Exception as e:
+                logger.error(f"Error processing chunks {start + 1}-{end}: {e}. Retrying individually")
+                batch_outputs = []
+                for idx in range(len(batch_features)):
+                    try:
+                        batch_outputs.append(await asyncio.to_thread(
+                            self._multitask_generate, manager, batch_features[idx:idx + 1], tasks, detect_language
+                        ))
+                    except Exception as item_error:
+                        logger.error(f"Error processing chunk {start + idx + 1}: {item_error}")
+                        batch_outputs.append({"language": [None], **{task: ["[Error in chunk]"] for task in tasks}})
+            
+            for batch_output in batch_outputs:
+                for key, values in batch_output.items():
+                    outputs[key].extend(values)
+        
+        processing_time = time.time() - start_time
+        logger.info(f"Multi-task transcription of {len(audio_chunks)} chunks completed in {processing_time:.2f} seconds")
+        
+        return outputs
+
+    def _assisted_generate(
+        self,
+        model: WhisperForConditionalGeneration,
+        assistant_model: WhisperForConditionalGeneration,
+        input_features: torch.Tensor,
+        forced_decoder_ids: List[Tuple[int, int]]
+    ) -> List[torch.Tensor]:
+        """
+        Run greedy assisted generation with a draft model and record its acceptance rate.
+        
+        Assisted generation only supports a batch size of one, so items are
+        generated in turn. Every verification round is one forward pass of
+        the main decoder and every draft token one forward pass of the
+        assistant decoder, which gives the accepted share of draft tokens.
+        
+        Args:
+            model: Main Whisper model
+            assistant_model: Draft Whisper model sharing the vocabulary
+            input_features: Log-mel features of shape (batch, n_mels, frames)
+            forced_decoder_ids: Decoder prompt IDs
+            
+        Returns:
+            List of predicted token ID sequences, one per batch item
+        """
+        counts = {"target": 0, "draft": 0}
+        
+        def counter(key: str) -> Callable:
+            def hook(*args) -> None:
+                counts[key] += 1
+            return hook
+        
+        sequences = []
+        with self._assisted_lock:
+            handles = [
+                model.get_decoder().register_forward_hook(counter("target")),
+                assistant_model.get_decoder().register_forward_hook(counter("draft"))
+            ]
+            try:
+                for idx in range(len(input_features)):
+                    counts["target"] = counts["draft"] = 0
+                    predicted_ids = model.generate(
+                        input_features[idx:idx + 1],
+                        assistant_model=assistant_model,
+                        do_sample=False,
+                        num_beams=1,
+                        max_new_tokens=MAX_NEW_TOKENS,
+                        forced_decoder_ids=forced_decoder_ids,
+                    )[0]
+                    sequences.append(predicted_ids)
+                    
+                    # Generated tokens exclude the decoder prompt if it is echoed back
+                    generated = len(predicted_ids)
+                    if generated and predicted_ids[0] == model.generation_config.decoder_start_token_id:
+                        generated -= 1 + len(forced_decoder_ids)
+                    accepted = max(generated - counts["target"], 0)
+                    
+                    self._draft_tokens_counter.inc(counts["draft"])
+                    self._accepted_tokens_counter.inc(accepted)
+                    if counts["draft"]:
+                        self._acceptance_rate_histogram.observe(accepted / counts["draft"])
+            finally:
+                for handle in handles:
+                    handle.remove()
+        
+        return sequences
+
+    async def _retry_individually(
+        self,
+        batch_features: torch.Tensor,
+        offset: int,
+        manager: ModelManager = model_manager
+    ) -> List[str]:
+        """
+        Retry a failed batch one item at a time to isolate bad chunks.
+        
+        Args:
+            batch_features: Input features of the failed batch
+            offset: Index of the first item of the batch within the file
+            manager: Model to generate with
+            
+        Returns:
+            List of transcriptions; chunks that fail again are "[Error in chunk]"
+        """
+        transcriptions = []
+        
+        for idx in range(len(batch_features)):
+            try:
+                text = (await self._generate(batch_features[idx:idx + 1], manager))[0]
+                transcriptions.append(text)
+            except Exception as e:
+                logger.error(f"Error processing chunk {offset + idx + 1}: {e}")
+                transcriptions.append("[Error in chunk]")
+        
+        return transcriptions
+
+    async def process_audio_file(
+        self,
+        file: UploadFile,
+        translate: bool = False,
+        detect_language: bool = False,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Process an uploaded audio file and return transcription.
         
         Args:
             file: Uploaded audio file
+            translate: Whether to also return an English translation
+            detect_language: Whether to identify the spoken language and
+                transcribe in it instead of the configured language
+            model: Whisper model to use, or None for the default model
             
         Returns:
-            Complete transcription text
+            Dict[str, Any]: Complete transcription text and per-segment
+            transcriptions with their start/end times in the original audio,
+            plus the translation and language when requested
             
         Raises:
             HTTPException: If file processing fails
         """
-        # Validate file
+        # Validate model name, file name, format and size
+        model_registry.validate_model_name(model)
         await validator.validate_audio_file(file)
         
+        # Validate duration from the header before decoding any samples
+        await validator.validate_audio_header(file)
+        
+        return await self.transcribe_file(
+            file.file, translate=translate, detect_language=detect_language, model=model
+        )
+
+    async def transcribe_file(
+        self,
+        file_obj: BinaryIO,
+        on_segment: Optional[Callable[[int, int, Dict[str, Any]], None]] = None,
+        priority: int = INTERACTIVE_PRIORITY,
+        translate: bool = False,
+        detect_language: bool = False,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Decode, preprocess and transcribe an already validated audio file.
+        
+        Args:
+            file_obj: Seekable binary file object with the audio
+            on_segment: Optional callback receiving the segment index, the
+                number of segments decoded so far and the segment as each
+                one completes
+            priority: Scheduling priority when dynamic batching is enabled
+            translate: Whether to also return an English translation
+            detect_language: Whether to identify the spoken language and
+                transcribe in it instead of the configured language
+            model: Whisper model to use, or None for the default model
+            
+        Returns:
+            Dict[str, Any]: Complete transcription text and per-segment
+            transcriptions with their start/end times in the original audio,
+            plus the translation and language when requested
+            
+        Raises:
+            HTTPException: If the audio cannot be decoded or is too long, or
+            the model is not available
+        """
+        start_time = time.time()
+        
         try:
-            # Read audio file
-            file.file.seek(0)
-            audio_data, sample_rate = await asyncio.to_thread(sf.read, file.file)
+            if settings.pipeline_enabled and not (translate or detect_language):
+                async with model_registry.use(model) as manager:
+                    result = await self._transcribe_pipelined(file_obj, on_segment, priority, manager)
+                
+                metrics.histogram(
+                    f'stt_request_latency_seconds{{model="{manager.model_name}"}}', REQUEST_LATENCY_BUCKETS_SEC
+                ).observe(time.time() - start_time)
+                
+                logger.info(f"File transcription with {manager.model_name} completed. Total chunks: {len(result['segments'])}")
+                return result
             
-            # Validate audio duration
-            validator.validate_audio_duration(audio_data, sample_rate)
+            # Decode in blocks straight into mono/resample preprocessing
+            audio_data, sample_rate = await asyncio.to_thread(preprocessor.load_audio, file_obj)
             
-            # Preprocess audio
-            audio_data, sample_rate = preprocessor.preprocess_audio(audio_data, sample_rate)
+            # Validate decoded audio duration
+            validator.validate_audio_duration(audio_data, sample_rate)
             
             # Split into chunks
-            audio_chunks = preprocessor.chunk_audio(audio_data, sample_rate)
+            audio_chunks, spans = self._segment_audio(audio_data, sample_rate)
             
-            # Transcribe each chunk
-            transcriptions = await self._transcribe_chunks(audio_chunks, sample_rate)
+            async with model_registry.use(model) as manager:
+                if translate or detect_language:
+                    result = await self._transcribe_multitask(
+                        audio_chunks, spans, sample_rate, translate, detect_language, manager
+                    )
+                else:
+                    result = await self._transcribe_file_chunks(
+                        audio_chunks, spans, sample_rate, on_segment, priority, manager
+                    )
             
-            # Combine transcriptions
-            final_transcription = " ".join(transcriptions)
+            metrics.histogram(
+                f'stt_request_latency_seconds{{model="{manager.model_name}"}}', REQUEST_LATENCY_BUCKETS_SEC
+            ).observe(time.time() - start_time)
             
-            logger.info(f"File transcription completed. Total chunks: {len(audio_chunks)}")
-            return final_transcription
+            logger.info(f"File transcription with {manager.model_name} completed. Total chunks: {len(audio_chunks)}")
+            return result
             
+        except ValueError as e:
+            logger.error(f"Audio file rejected during decoding: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Audio file processing failed: {e}")
             raise
 
-    async def _transcribe_chunks(self, audio_chunks: List[np.ndarray], sample_rate: int) -> List[str]:
+    async def _transcribe_pipelined(
+        self,
+        file_obj: BinaryIO,
+        on_segment: Optional[Callable[[int, int, Dict[str, Any]], None]],
+        priority: int,
+        manager: ModelManager
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a file through overlapping decode, feature, generate and detokenize stages.
+        
+        Chunks are handed on as soon as they are decoded, so the next chunks
+        are decoded and featurized while the model generates the current
+        batch. The generate stage waits for a full batch of
+        ``settings.batch_size`` windows, or the end of the file. Items that
+        fail in a stage are retried one at a time and reported as
+        "[Error in chunk]" if they fail again.
+        
+        Args:
+            file_obj: Seekable binary file object with the audio
+            on_segment: Optional callback receiving each completed segment
+            priority: Scheduling priority when dynamic batching is enabled
+            manager: Model to transcribe with
+            
+        Returns:
+            Dict[str, Any]: Transcription of the file with per-segment values
+        """
+        spans: List[Tuple[float, float]] = []
+        
+        async def extract(chunks: List[np.ndarray]) -> List[Optional[torch.Tensor]]:
+            try:
+                features = await asyncio.to_thread(self._extract_features, chunks, TARGET_SAMPLE_RATE, manager)
+                return [features[idx:idx + 1] for idx in range(len(chunks))]
+            except Exception as e:
+                logger.error(f"Feature extraction failed for {len(chunks)} chunks: {e}. Retrying individually")
+            
+            rows = []
+            for chunk in chunks:
+                try:
+                    rows.append(await asyncio.to_thread(self._extract_features, [chunk], TARGET_SAMPLE_RATE, manager))
+                except Exception as e:
+                    logger.error(f"Feature extraction failed for a chunk: {e}")
+                    rows.append(None)
+            return rows
+        
+        async def generate(rows: List[Optional[torch.Tensor]]) -> List[Optional[torch.Tensor]]:
+            valid = [row for row in rows if row is not None]
+            results = iter(await self._predict_rows(valid, priority, manager) if valid else [])
+            return [next(results) if row is not None else None for row in rows]
+        
+        async def detokenize(sequences: List[Optional[torch.Tensor]]) -> List[str]:
+            valid = [predicted_ids for predicted_ids in sequences if predicted_ids is not None]
+            texts = iter(await asyncio.to_thread(self._detokenize, valid, manager) if valid else [])
+            return [next(texts) if predicted_ids is not None else "[Error in chunk]" for predicted_ids in sequences]
+        
+        def on_text(idx: int, text: str) -> None:
+            if on_segment:
+                start, end = spans[idx]
+                on_segment(idx, len(spans), {"start": round(start, 3), "end": round(end, 3), "text": text})
+        
+        pipeline = Pipeline(
+            "decode",
+            [
+                PipelineStage("features", extract, settings.batch_size),
+                PipelineStage("generate", generate, settings.batch_size, fill_batch=True),
+                PipelineStage("detokenize", detokenize, settings.batch_size)
+            ],
+            settings.pipeline_queue_size
+        )
+        transcriptions = await pipeline.run(self._iter_windows(file_obj, spans), on_text)
+        
+        return {
+            "transcription": " ".join(transcriptions),
+            "segments": [
+                {"start": round(start, 3), "end": round(end, 3), "text": text}
+                for (start, end), text in zip(spans, transcriptions)
+            ]
+        }
+
+    async def _predict_rows(
+        self,
+        rows: List[torch.Tensor],
+        priority: int,
+        manager: ModelManager
+    ) -> List[Optional[torch.Tensor]]:
+        """
+        Generate tokens for feature windows, isolating windows that fail.
+        
+        Windows for the default model go through the cross-request scheduler
+        when it is running; otherwise they are generated as one batch.
+        
+        Args:
+            rows: Log-mel features of shape (1, n_mels, frames) per window
+            priority: Scheduling priority when dynamic batching is enabled
+            manager: Model to generate with
+            
+        Returns:
+            Predicted token IDs per window, or None where generation failed
+        """
+        if self._uses_scheduler(manager):
+            results = await asyncio.gather(
+                *(self.scheduler.submit(row, priority) for row in rows),
+                return_exceptions=True
+            )
+        else:
+            try:
+                return await self._predict(torch.cat(rows), manager)
+            except Exception as e:
+                logger.error(f"Error processing {len(rows)} chunks: {e}. Retrying individually")
+            
+            results = []
+            for row in rows:
+                try:
+                    results.append((await self._predict(row, manager))[0])
+                except Exception as item_error:
+                    results.append(item_error)
+        
+        predicted = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error processing chunk: {result}")
+                predicted.append(None)
+            else:
+                predicted.append(result)
+        return predicted
+
+    def _iter_windows(self, file_obj: BinaryIO, spans: List[Tuple[float, float]]) -> Iterator[np.ndarray]:
+        """
+        Decode a file and yield model windows, recording each window's span.
+        
+        Fixed-length chunks are yielded as soon as they are decoded. With VAD
+        enabled, the whole file is decoded and segmented first.
+        
+        Args:
+            file_obj: Seekable binary file object with the audio
+            spans: List that receives the (start, end) time of each window
+                before it is yielded
+            
+        Yields:
+            Mono float32 windows at TARGET_SAMPLE_RATE
+            
+        Raises:
+            ValueError: If the decoded audio exceeds the maximum duration
+        """
+        if settings.vad_enabled:
+            audio_data, sample_rate = preprocessor.load_audio(file_obj)
+            audio_chunks, window_spans = self._segment_audio(audio_data, sample_rate)
+            spans.extend(window_spans)
+            yield from audio_chunks
+            return
+        
+        start = 0
+        for chunk in preprocessor.iter_chunks(file_obj):
+            spans.append((start / TARGET_SAMPLE_RATE, (start + len(chunk)) / TARGET_SAMPLE_RATE))
+            start += len(chunk)
+            yield chunk
+
+    async def _transcribe_file_chunks(
+        self,
+        audio_chunks: List[np.ndarray],
+        spans: List[Tuple[float, float]],
+        sample_rate: int,
+        on_segment: Optional[Callable[[int, int, Dict[str, Any]], None]],
+        priority: int,
+        manager: ModelManager
+    ) -> Dict[str, Any]:
+        """
+        Transcribe chunks and assemble the file result.
+        
+        Args:
+            audio_chunks: List of audio chunk arrays
+            spans: Start/end time of each chunk in the original audio
+            sample_rate: Sample rate of the audio
+            on_segment: Optional callback receiving each completed segment
+            priority: Scheduling priority when dynamic batching is enabled
+            manager: Model to transcribe with
+            
+        Returns:
+            Dict[str, Any]: Transcription of the file with per-segment values
+        """
+        def on_chunk(idx: int, text: str) -> None:
+            start, end = spans[idx]
+            on_segment(idx, len(audio_chunks), {"start": round(start, 3), "end": round(end, 3), "text": text})
+        
+        # Transcribe each chunk
+        transcriptions = await self._transcribe_chunks(
+            audio_chunks, sample_rate, on_chunk if on_segment else None, priority, manager
+        )
+        
+        # Combine transcriptions
+        return {
+            "transcription": " ".join(transcriptions),
+            "segments": [
+                {"start": round(start, 3), "end": round(end, 3), "text": text}
+                for (start, end), text in zip(spans, transcriptions)
+            ]
+        }
+
+    async def _transcribe_multitask(
+        self,
+        audio_chunks: List[np.ndarray],
+        spans: List[Tuple[float, float]],
+        sample_rate: int,
+        translate: bool,
+        detect_language: bool,
+        manager: ModelManager
+    ) -> Dict[str, Any]:
+        """
+        Transcribe chunks with a shared encoder pass and assemble the file result.
+        
+        Args:
+            audio_chunks: List of audio chunk arrays
+            spans: Start/end time of each chunk in the original audio
+            sample_rate: Sample rate of the audio
+            translate: Whether to also translate each chunk to English
+            detect_language: Whether to identify the language of each chunk
+            manager: Model to transcribe with
+            
+        Returns:
+            Dict[str, Any]: Transcription, translation and language of the file
+            with per-segment values
+        """
+        outputs = await self.transcribe_audio_multitask(audio_chunks, sample_rate, translate, detect_language, manager)
+        
+        segments = []
+        for idx, (start, end) in enumerate(spans):
+            segment = {"start": round(start, 3), "end": round(end, 3), "text": outputs[TASK][idx]}
+            if translate:
+                segment["translation"] = outputs[TRANSLATE_TASK][idx]
+            if detect_language:
+                segment["language"] = outputs["language"][idx]
+            segments.append(segment)
+        
+        result = {"transcription": " ".join(outputs[TASK]), "segments": segments}
+        if translate:
+            result["translation"] = " ".join(outputs[TRANSLATE_TASK])
+        if detect_language:
+            detected = Counter(language for language in outputs["language"] if language)
+            result["language"] = detected.most_common(1)[0][0] if detected else None
+        
+        return result
+
+    def _segment_audio(self, audio_data: np.ndarray, sample_rate: int) -> Tuple[List[np.ndarray], List[Tuple[float, float]]]:
+        """
+        Split preprocessed audio into model windows.
+        
+        With VAD enabled, silence is dropped and speech is packed into windows
+        at natural pauses; otherwise the audio is cut into fixed chunks.
+        
+        Args:
+            audio_data: Mono audio at the target sample rate
+            sample_rate: Sample rate of the audio
+            
+        Returns:
+            Tuple of chunk arrays and their (start, end) times in seconds
+            in the original audio
+        """
+        if settings.vad_enabled:
+            windows = vad.segment(audio_data)
+            return [window.audio for window in windows], [(window.start_sec, window.end_sec) for window in windows]
+        
+        audio_chunks = preprocessor.chunk_audio(audio_data, sample_rate)
+        spans = []
+        start = 0
+        for chunk in audio_chunks:
+            spans.append((start / sample_rate, (start + len(chunk)) / sample_rate))
+            start += len(chunk)
+        return audio_chunks, spans
+
+    async def _transcribe_chunks(
+        self,
+        audio_chunks: List[np.ndarray],
+        sample_rate: int,
+        on_chunk: Optional[Callable[[int, str], None]] = None,
+        priority: int = INTERACTIVE_PRIORITY,
+        manager: ModelManager = model_manager
+    ) -> List[str]:
         """
         Transcribe multiple audio chunks.
         
         Args:
             audio_chunks: List of audio chunk arrays
             sample_rate: Sample rate of the audio
+            on_chunk: Optional callback receiving each chunk index and text as it completes
+            priority: Scheduling priority when dynamic batching is enabled
+            manager: Model to transcribe with; defaults to the default model
             
         Returns:
             List of transcription strings
         """
+        try:
+            return await self.transcribe_audio_batch(audio_chunks, sample_rate, on_chunk, priority, manager)
+        except Exception as e:
+            # Feature extraction failed for the whole file; fall back to per-chunk processing
+            logger.error(f"Batched transcription failed: {e}. Falling back to per-chunk processing")
+        
         transcriptions = []
         
         for idx, chunk in enumerate(audio_chunks):
             logger.info(f"Processing chunk {idx + 1}/{len(audio_chunks)}")
             
             try:
-                text = await self.transcribe_audio_chunk(chunk, sample_rate)
-                transcriptions.append(text)
+                text = await self.transcribe_audio_chunk(chunk, sample_rate, manager)
             except Exception as e:
                 logger.error(f"Error processing chunk {idx + 1}: {e}")
-                transcriptions.append("[Error in chunk]")
+                text = "[Error in chunk]"
+            
+            transcriptions.append(text)
+            if on_chunk:
+                on_chunk(idx, text)
         
         return transcriptions
 
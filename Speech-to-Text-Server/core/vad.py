@@ -0,0 +1,208 @@
+"""
+Energy-based voice activity detection and speech window packing.
+"""
+import logging
+import numpy as np
+from typing import List, Tuple
+
+from config.constants import (
+    TARGET_SAMPLE_RATE, CHUNK_DURATION_SEC,
+    VAD_FRAME_MS, VAD_MIN_ENERGY_DB, VAD_NOISE_PERCENTILE, VAD_SPEECH_PERCENTILE, VAD_ENERGY_MARGIN_DB,
+    VAD_MIN_SPEECH_MS, VAD_MIN_SILENCE_MS, VAD_SPEECH_PAD_MS
+)
+
+logger = logging.getLogger(__name__)
+
+class SpeechWindow:
+    """
+    A window of speech audio of at most CHUNK_DURATION_SEC seconds.
+    
+    The window audio is the concatenation of one or more speech regions of
+    the original signal with the silence between them removed. ``regions``
+    keeps, for each region, its offset within the window and its span in
+    the original audio, which gives the position of the window.
+    """
+    
+    def __init__(self, audio: np.ndarray, regions: List[Tuple[int, int, int]], sample_rate: int):
+        self.audio = audio
+        self.regions = regions
+        self.sample_rate = sample_rate
+    
+    @property
+    def start_sec(self) -> float:
+        """Start of the window in the original audio, in seconds."""
+        return self.regions[0][1] / self.sample_rate
+    
+    @property
+    def end_sec(self) -> float:
+        """End of the window in the original audio, in seconds."""
+        return self.regions[-1][2] / self.sample_rate
+
+class VoiceActivityDetector:
+    """Detects speech regions from short-time frame energy."""
+    
+    def __init__(self, sample_rate: int = TARGET_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * VAD_FRAME_MS / 1000)
+    
+    def frame_energy_db(self, audio_array: np.ndarray) -> np.ndarray:
+        """
+        Compute the energy of consecutive non-overlapping frames in dBFS.
+        
+        Args:
+            audio_array: Mono audio at the detector sample rate
+            
+        Returns:
+            Energy per frame in dB; a trailing partial frame is included
+        """
+        num_frames = -(-len(audio_array) // self.frame_size)
+        padded = np.zeros(num_frames * self.frame_size, dtype=np.float32)
+        padded[:len(audio_array)] = audio_array
+        frames = padded.reshape(num_frames, self.frame_size)
+        power = np.mean(np.square(frames, dtype=np.float32), axis=1)
+        return 10.0 * np.log10(power + 1e-12)
+    
+    def detect_speech(self, audio_array: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Find speech regions in the audio.
+        
+        A frame is speech when its energy is above both an absolute floor
+        and an adaptive threshold between the estimated noise floor and the
+        typical speech level. Short pauses are bridged, very short bursts
+        dropped and regions padded.
+        
+        Args:
+            audio_array: Mono audio at the detector sample rate
+            
+        Returns:
+            List of (start_sample, end_sample) speech regions
+        """
+        if len(audio_array) == 0:
+            return []
+        
+        energy_db = self.frame_energy_db(audio_array)
+        noise_floor = np.percentile(energy_db, VAD_NOISE_PERCENTILE)
+        speech_level = np.percentile(energy_db, VAD_SPEECH_PERCENTILE)
+        threshold = max(
+            VAD_MIN_ENERGY_DB,
+            min(noise_floor + VAD_ENERGY_MARGIN_DB, speech_level - VAD_ENERGY_MARGIN_DB)
+        )
+        is_speech = energy_db > threshold
+        
+        # Collect runs of speech frames
+        runs = []
+        run_start = None
+        for idx, speech in enumerate(is_speech):
+            if speech and run_start is None:
+                run_start = idx
+            elif not speech and run_start is not None:
+                runs.append([run_start, idx])
+                run_start = None
+        if run_start is not None:
+            runs.append([run_start, len(is_speech)])
+        
+        # Bridge short pauses
+        min_silence_frames = VAD_MIN_SILENCE_MS // VAD_FRAME_MS
+        merged = []
+        for run in runs:
+            if merged and run[0] - merged[-1][1] < min_silence_frames:
+                merged[-1][1] = run[1]
+            else:
+                merged.append(run)
+        
+        # Drop short bursts and pad the remaining regions
+        min_speech_frames = VAD_MIN_SPEECH_MS // VAD_FRAME_MS
+        pad = int(self.sample_rate * VAD_SPEECH_PAD_MS / 1000)
+        regions = []
+        for start_frame, end_frame in merged:
+            if end_frame - start_frame < min_speech_frames:
+                continue
+            start = max(start_frame * self.frame_size - pad, 0)
+            end = min(end_frame * self.frame_size + pad, len(audio_array))
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        
+        speech_samples = sum(end - start for start, end in regions)
+        logger.info(
+            f"VAD found {len(regions)} speech regions "
+            f"({100.0 * speech_samples / len(audio_array):.1f}% of audio, threshold {threshold:.1f} dB)"
+        )
+        return regions
+    
+    def segment(self, audio_array: np.ndarray, window_duration_sec: int = CHUNK_DURATION_SEC) -> List[SpeechWindow]:
+        """
+        Drop non-speech and pack speech regions into windows.
+        
+        Regions are packed greedily into windows of at most
+        ``window_duration_sec`` seconds. A region longer than a window is
+        split at the quietest frame in the second half of the window so cuts
+        fall on natural pauses.
+        
+        Args:
+            audio_array: Mono audio at the detector sample rate
+            window_duration_sec: Maximum window duration in seconds
+            
+        Returns:
+            List of speech windows in time order
+        """
+        max_window = int(window_duration_sec * self.sample_rate)
+        energy_db = self.frame_energy_db(audio_array)
+        
+        pieces = []
+        for start, end in self.detect_speech(audio_array):
+            while end - start > max_window:
+                cut = self.find_pause(energy_db, start + max_window // 2, start + max_window)
+                pieces.append((start, cut))
+                start = cut
+            pieces.append((start, end))
+        
+        windows = []
+        current: List[Tuple[int, int]] = []
+        current_length = 0
+        for start, end in pieces:
+            if current and current_length + (end - start) > max_window:
+                windows.append(self._build_window(audio_array, current))
+                current, current_length = [], 0
+            current.append((start, end))
+            current_length += end - start
+        if current:
+            windows.append(self._build_window(audio_array, current))
+        
+        logger.info(f"Packed speech into {len(windows)} windows of up to {window_duration_sec} seconds")
+        return windows
+    
+    def find_pause(self, energy_db: np.ndarray, search_start: int, search_end: int) -> int:
+        """
+        Find a natural cut point within a range of samples.
+        
+        Args:
+            energy_db: Frame energies from ``frame_energy_db``
+            search_start: First sample of the search range
+            search_end: Last sample of the search range
+            
+        Returns:
+            Sample index of the start of the quietest frame in the range
+        """
+        first_frame = search_start // self.frame_size
+        last_frame = max(search_end // self.frame_size, first_frame + 1)
+        quietest = first_frame + int(np.argmin(energy_db[first_frame:last_frame]))
+        return min(quietest * self.frame_size, search_end)
+    
+    def _build_window(self, audio_array: np.ndarray, spans: List[Tuple[int, int]]) -> SpeechWindow:
+        """Concatenate speech spans into a window and record their offsets."""
+        regions = []
+        offset = 0
+        for start, end in spans:
+            regions.append((offset, start, end))
+            offset += end - start
+        
+        if len(spans) == 1:
+            audio = audio_array[spans[0][0]:spans[0][1]]
+        else:
+            audio = np.concatenate([audio_array[start:end] for start, end in spans])
+        return SpeechWindow(audio, regions, self.sample_rate)
+
+# Global voice activity detector instance
+vad = VoiceActivityDetector()
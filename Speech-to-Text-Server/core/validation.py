@@ -3,6 +3,8 @@ Input validation utilities for speech-to-text requests.
 """
 import asyncio
 import logging
+import os
+from typing import Optional
 from fastapi import HTTPException, UploadFile
 import numpy as np
 
@@ -10,6 +12,7 @@ from config.constants import (
     MAX_FILE_SIZE_MB, SUPPORTED_AUDIO_FORMATS, 
     MAX_AUDIO_DURATION_SEC, MAX_FILENAME_LENGTH
 )
+from core.preprocessing import AudioInfo, probe_audio
 
 logger = logging.getLogger(__name__)
 
@@ -46,19 +49,94 @@ class RequestValidator:
                 detail=f"Unsupported audio format. Supported formats: {', '.join(SUPPORTED_AUDIO_FORMATS)}"
             )
         
-        # Validate file size
-        contents = await file.read()
-        if len(contents) > MAX_FILE_SIZE_MB * 1024 * 1024:
+        # Validate file size without reading the upload into memory
+        file_size = file.size
+        if file_size is None:
+            file_size = file.file.seek(0, os.SEEK_END)
+            file.file.seek(0)
+        
+        if file_size > MAX_FILE_SIZE_MB * 1024 * 1024:
             raise HTTPException(
                 status_code=400,
                 detail=f"File size exceeds limit of {MAX_FILE_SIZE_MB}MB"
             )
         
-        # Reset file position for later reading
-        file.file.seek(0)
-        
         logger.info(f"File validation passed for: {file.filename}")
     
+    def validate_content_length(self, content_length: Optional[str], max_body_bytes: int) -> None:
+        """
+        Validate the declared request body size before the body is read.
+        
+        Args:
+            content_length: Value of the Content-Length header, if present
+            max_body_bytes: Maximum accepted body size in bytes
+            
+        Raises:
+            HTTPException: If the header is malformed or exceeds the limit
+        """
+        if content_length is None:
+            return
+        
+        try:
+            length = int(content_length)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid Content-Length header"
+            )
+        
+        if length > max_body_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size exceeds limit of {MAX_FILE_SIZE_MB}MB"
+            )
+    
+    async def validate_audio_header(self, file: UploadFile) -> AudioInfo:
+        """
+        Validate audio duration from the file header without decoding samples.
+        
+        Containers without a recorded duration pass; decoding still stops
+        once the audio exceeds the maximum duration.
+        
+        Args:
+            file: Uploaded audio file
+            
+        Returns:
+            AudioInfo: Audio header information (sample rate, channels, frames)
+            
+        Raises:
+            HTTPException: If the header cannot be read or audio is too long
+        """
+        try:
+            info = await asyncio.to_thread(probe_audio, file.file)
+        except Exception as e:
+            logger.error(f"Could not read audio header: {e}")
+            raise HTTPException(
+                status_code=400,
+                detail="Could not read audio file header"
+            )
+        
+        if info.samplerate <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid sample rate in audio file header"
+            )
+        
+        if info.frames is None:
+            logger.info(f"Audio header has no duration: {info.samplerate} Hz, {info.channels} channel(s)")
+            return info
+        
+        duration_seconds = info.frames / info.samplerate
+        
+        if duration_seconds > MAX_AUDIO_DURATION_SEC:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Audio too long. Maximum duration is {MAX_AUDIO_DURATION_SEC} seconds"
+            )
+        
+        logger.info(f"Audio header validation passed: {duration_seconds:.2f} seconds, {info.samplerate} Hz, {info.channels} channel(s)")
+        return info
+    
     def validate_audio_duration(self, audio_data: np.ndarray, sample_rate: int) -> None:
         """
         Validate audio duration.
@@ -5,9 +5,16 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from core.model import model_manager
-from api.endpoints import transcription, health
+from core.registry import model_registry
+from core.transcriber import transcriber
+from core.jobs import job_manager
+from api.endpoints import transcription, streaming, jobs, health, metrics
+from api.middleware import UploadSizeLimitMiddleware
 from utils.logging import setup_logging
-from config.constants import APP_NAME, DESCRIPTION, VERSION
+from config.constants import (
+    APP_NAME, DESCRIPTION, VERSION, 
+    MAX_FILE_SIZE_MB, MULTIPART_OVERHEAD_BYTES
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -15,8 +22,13 @@ async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
     await model_manager.initialize()
+    await transcriber.start()
+    await job_manager.start()
     yield
     # Shutdown
+    await job_manager.stop()
+    await transcriber.stop()
+    await model_registry.cleanup()
     await model_manager.cleanup()
 
 def create_app() -> FastAPI:
@@ -29,9 +41,18 @@ def create_app() -> FastAPI:
         root_path="/transcribe"
     )
     
+    # Reject oversized uploads before they are buffered
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        max_body_bytes=MAX_FILE_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+    )
+    
     # Include routers
     app.include_router(transcription.router)
+    app.include_router(streaming.router)
+    app.include_router(jobs.router)
     app.include_router(health.router)
+    app.include_router(metrics.router)
     
     return app
 
@@ -0,0 +1,39 @@
+"""
+Tests for the torch log-mel feature extractor.
+"""
+import numpy as np
+import pytest
+import torch
+from transformers import WhisperFeatureExtractor
+
+from core.features import LogMelFeatureExtractor
+
+def make_chunks(count: int, seconds: float = 3.0, sample_rate: int = 16000):
+    """Generate noisy tone chunks of different lengths."""
+    rng = np.random.default_rng(0)
+    chunks = []
+    for idx in range(count):
+        t = np.arange(int((seconds + idx) * sample_rate)) / sample_rate
+        chunks.append((0.3 * np.sin(2 * np.pi * 220 * (idx + 1) * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32))
+    return chunks
+
+def test_extractors_with_different_mel_counts_do_not_share_filters():
+    extractor = LogMelFeatureExtractor()
+    chunks = make_chunks(3)
+
+    for feature_size in (80, 128):
+        reference_extractor = WhisperFeatureExtractor(feature_size=feature_size)
+        features = extractor.extract(chunks, reference_extractor, "cpu")
+        reference = reference_extractor(chunks, sampling_rate=16000, return_tensors="pt").input_features
+
+        assert features.shape == reference.shape == (3, feature_size, 3000)
+        assert torch.allclose(features, reference, atol=1e-3)
+
+def test_filters_are_cached_per_configuration():
+    extractor = LogMelFeatureExtractor()
+    first = extractor._get_window_and_filters(WhisperFeatureExtractor(feature_size=80), "cpu")
+    again = extractor._get_window_and_filters(WhisperFeatureExtractor(feature_size=80), "cpu")
+    other = extractor._get_window_and_filters(WhisperFeatureExtractor(feature_size=128), "cpu")
+
+    assert first[1] is again[1]
+    assert other[1].shape[1] == 128
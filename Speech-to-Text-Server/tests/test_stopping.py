@@ -0,0 +1,75 @@
+"""
+Tests for the Whisper early stopping criteria.
+"""
+import torch
+
+from core.stopping import EarlyStopping, NoSpeechStoppingCriteria, RepetitionStoppingCriteria
+
+VOCAB_SIZE = 10
+EOS = 9
+PAD = 9
+
+def confident_scores(token: int) -> torch.Tensor:
+    """Scores that put almost all probability on one token."""
+    scores = torch.full((VOCAB_SIZE,), -20.0)
+    scores[token] = 20.0
+    return scores
+
+def unsure_scores() -> torch.Tensor:
+    """Scores that spread probability evenly (log-probability about -2.3)."""
+    return torch.zeros(VOCAB_SIZE)
+
+def decode(criteria: NoSpeechStoppingCriteria, steps):
+    """Run recorder and criterion over per-step scores of each row, like generate does."""
+    input_ids = torch.zeros((len(steps[0]), 1), dtype=torch.long)
+    stopped_at = [None] * len(steps[0])
+    for step, row_scores in enumerate(steps):
+        scores = torch.stack(row_scores)
+        scores = criteria.recorder(input_ids, scores)
+        tokens = scores.argmax(dim=-1)
+        input_ids = torch.cat([input_ids, tokens[:, None]], dim=1)
+        for row, done in enumerate(criteria(input_ids, scores).tolist()):
+            if done and stopped_at[row] is None:
+                stopped_at[row] = step + 1
+    return input_ids, stopped_at
+
+def test_one_unsure_first_token_does_not_erase_a_row():
+    criteria = NoSpeechStoppingCriteria(torch.tensor([0.9]), 0.6, -1.0, min_tokens=8, eos_token_id=EOS, pad_token_id=PAD)
+    steps = [[unsure_scores()]] + [[confident_scores(token)] for token in (1, 2, 3, 4, 5, 6)] + [[confident_scores(EOS)]]
+
+    sequences, stopped_at = decode(criteria, steps)
+    finished = EarlyStopping(None, criteria, PAD).finish(sequences)
+
+    assert stopped_at == [None]
+    assert torch.equal(finished, sequences)
+
+def test_low_confidence_candidate_is_stopped_and_blanked():
+    criteria = NoSpeechStoppingCriteria(torch.tensor([0.9, 0.1]), 0.6, -1.0, min_tokens=4, eos_token_id=EOS, pad_token_id=PAD)
+    steps = [[unsure_scores(), unsure_scores()] for _ in range(6)]
+
+    sequences, stopped_at = decode(criteria, steps)
+    finished = EarlyStopping(None, criteria, PAD).finish(sequences)
+
+    # Only the row that may be silence stops, and not before min_tokens
+    assert stopped_at == [4, None]
+    assert (finished[0] == PAD).all()
+    assert torch.equal(finished[1], sequences[1])
+
+def test_repetition_fires_on_back_to_back_copies():
+    criteria = RepetitionStoppingCriteria(ngram_size=2, max_repeats=3, pad_token_id=PAD)
+
+    assert not criteria(torch.tensor([[1, 2, 1, 2, 1]]), None).any()
+    assert criteria(torch.tensor([[1, 2, 1, 2, 1, 2]]), None).all()
+    assert criteria(torch.tensor([[5, 5, 1, 1, 1, 1, 1, 1]]), None).all()
+
+def test_non_adjacent_repeats_do_not_stop():
+    criteria = RepetitionStoppingCriteria(ngram_size=4, max_repeats=5, pad_token_id=PAD)
+    phrase = [1, 2, 3, 4]
+
+    # The phrase recurs five times with other words in between, as real speech can
+    tokens = []
+    for filler in range(5):
+        tokens += phrase + [5 + filler % 3]
+    tokens += phrase
+    for length in range(1, len(tokens) + 1):
+        assert not criteria(torch.tensor([tokens[:length]]), None).any()
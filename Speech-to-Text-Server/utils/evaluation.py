@@ -0,0 +1,48 @@
+"""
+Transcription quality evaluation utilities.
+"""
+import re
+from typing import List
+
+def normalize_text(text: str) -> List[str]:
+    """
+    Normalize a transcript into a list of words for scoring.
+    
+    Args:
+        text: Raw transcript
+        
+    Returns:
+        Lower-cased words with punctuation removed
+    """
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Compute the word error rate of a hypothesis against a reference.
+    
+    Args:
+        reference: Reference transcript
+        hypothesis: Hypothesis transcript
+        
+    Returns:
+        (substitutions + deletions + insertions) / reference words
+    """
+    ref_words = normalize_text(reference)
+    hyp_words = normalize_text(hypothesis)
+    
+    if not ref_words:
+        return 0.0 if not hyp_words else 1.0
+    
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp_words) + 1))
+    for i, ref_word in enumerate(ref_words, start=1):
+        current = [i] + [0] * len(hyp_words)
+        for j, hyp_word in enumerate(hyp_words, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    
+    return previous[-1] / len(ref_words)
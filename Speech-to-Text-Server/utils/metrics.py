@@ -0,0 +1,88 @@
+"""
+In-process metrics collection utilities.
+"""
+import threading
+from typing import Dict, Any, Sequence
+
+class Histogram:
+    """Cumulative histogram over fixed bucket upper bounds."""
+    
+    def __init__(self, name: str, buckets: Sequence[float]):
+        self.name = name
+        self.buckets = sorted(buckets)
+        self._counts = [0] * len(self.buckets)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[idx] += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current histogram state."""
+        with self._lock:
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "mean": self._sum / self._count if self._count else 0.0,
+                "buckets": {f"le_{bound:g}": count for bound, count in zip(self.buckets, self._counts)}
+            }
+
+class Counter:
+    """Monotonically increasing counter."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter."""
+        with self._lock:
+            self._value += amount
+    
+    @property
+    def value(self) -> float:
+        """Current counter value."""
+        return self._value
+
+class MetricsRegistry:
+    """Holds all named metrics of the service."""
+    
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+    
+    def histogram(self, name: str, buckets: Sequence[float]) -> Histogram:
+        """Get or create a histogram."""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, buckets)
+            return self._histograms[name]
+    
+    def counter(self, name: str) -> Counter:
+        """Get or create a counter."""
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name)
+            return self._counters[name]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current state of all metrics."""
+        with self._lock:
+            histograms = list(self._histograms.values())
+            counters = list(self._counters.values())
+        return {
+            "histograms": {histogram.name: histogram.snapshot() for histogram in histograms},
+            "counters": {counter.name: counter.value for counter in counters}
+        }
+
+# Global metrics registry instance
+metrics = MetricsRegistry()